@@ -1,12 +1,27 @@
 from jijmodeling_transpiler_quantum.core import ising_qubo as ising_qubo
 from jijmodeling_transpiler_quantum.core import qrac as qrac
-from .ising_qubo import qubo_to_ising, IsingModel
-from .qrac import greedy_graph_coloring
+from jijmodeling_transpiler_quantum.core import cache as cache
+from jijmodeling_transpiler_quantum.core import pauli as pauli
+from jijmodeling_transpiler_quantum.core import qaoa as qaoa
+from jijmodeling_transpiler_quantum.core import sampling as sampling
+from .ising_qubo import qubo_to_ising, qubo_to_ising_arrays, IsingModel, IsingArrays
+from .qrac import ColoringStrategy, greedy_graph_coloring
+from .pauli import PauliIR
+from .qaoa import DiagonalQAOASimulator
 
 __all__ = [
     "ising_qubo",
     "qrac",
+    "cache",
+    "pauli",
+    "qaoa",
+    "sampling",
     "qubo_to_ising",
+    "qubo_to_ising_arrays",
     "IsingModel",
+    "IsingArrays",
+    "ColoringStrategy",
     "greedy_graph_coloring",
+    "PauliIR",
+    "DiagonalQAOASimulator",
 ]
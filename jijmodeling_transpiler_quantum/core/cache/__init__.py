@@ -0,0 +1,18 @@
+"""
+This module provides caches of the Hamiltonians and the graph colorings built by the builders.
+"""
+
+from .coloring_cache import ColoringCache, graph_fingerprint
+from .hamiltonian_cache import HamiltonianCache, cached_hamiltonian, canonical_key
+from .lru_cache import CacheInfo, LRUCache, estimate_nbytes
+
+__all__ = [
+    "CacheInfo",
+    "ColoringCache",
+    "HamiltonianCache",
+    "LRUCache",
+    "cached_hamiltonian",
+    "canonical_key",
+    "estimate_nbytes",
+    "graph_fingerprint",
+]
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import typing as typ
+
+import numpy as np
+
+from .lru_cache import LRUCache
+
+
+def graph_fingerprint(
+    graph: typ.Iterable[tuple[int, int]],
+    max_color_group_size: int,
+    coloring_strategy: typ.Any = "greedy",
+) -> str:
+    """Stable hash of the sparsity pattern of an interaction graph.
+
+    The edges are undirected and sorted, and duplicated edges and self-loops are ignored as in `greedy_graph_coloring`,
+    so that the fingerprint depends only on the edge set, `max_color_group_size` and `coloring_strategy`.
+
+    Args:
+        graph (typ.Iterable[tuple[int, int]]): edges.
+        max_color_group_size (int): the maximum size of a color group.
+        coloring_strategy (typ.Any, optional): coloring strategy. An enum is represented by its value. Defaults to "greedy".
+
+    Returns:
+        str: SHA-256 hex digest.
+
+    Examples:
+        >>> graph_fingerprint([(0, 1), (2, 1)], 3) == graph_fingerprint([(1, 2), (1, 0), (0, 1)], 3)
+        True
+        >>> graph_fingerprint([(0, 1), (2, 1)], 3) == graph_fingerprint([(0, 1), (2, 1)], 2)
+        False
+
+    """
+    edges = np.array(list(graph), dtype=np.int64).reshape(-1, 2)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    edges = np.unique(np.sort(edges, axis=1), axis=0)
+    strategy = getattr(coloring_strategy, "value", coloring_strategy)
+    digest = hashlib.sha256(f"{max_color_group_size}|{strategy}|".encode())
+    digest.update(np.ascontiguousarray(edges, dtype="<i8").tobytes())
+    return digest.hexdigest()
+
+
+class ColoringCache(LRUCache):
+    """Bounded LRU cache of graph colorings keyed by `graph_fingerprint`.
+
+    If `path` is given, every coloring is also stored as a JSON file in the directory,
+    and a coloring missing in memory is loaded from it, so that the colorings survive the process.
+    The cached color groups are returned as they are, so they must not be modified in place.
+
+    Examples:
+        >>> cache = ColoringCache()
+        >>> key = graph_fingerprint([(0, 1), (1, 2)], 3)
+        >>> cache.put(key, {0: [0, 2], 1: [1]})
+        >>> cache.get(key)
+        {0: [0, 2], 1: [1]}
+
+    """
+
+    def __init__(
+        self,
+        max_size: typ.Optional[int] = 128,
+        max_bytes: typ.Optional[int] = None,
+        path: typ.Optional[typ.Union[str, os.PathLike]] = None,
+    ):
+        """Create an empty cache.
+
+        Args:
+            max_size (typ.Optional[int], optional): the maximum number of entries in memory. None means no limit. Defaults to 128.
+            max_bytes (typ.Optional[int], optional): the maximum estimated memory of the entries. None means no limit. Defaults to None.
+            path (typ.Optional[typ.Union[str, os.PathLike]], optional): directory of the JSON files. None means memory only. Defaults to None.
+        """
+        super().__init__(max_size=max_size, max_bytes=max_bytes)
+        self.path = None if path is None else pathlib.Path(path)
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+
+    def _file(self, key: str) -> pathlib.Path:
+        return self.path / f"{key}.json"
+
+    def get(self, key: str) -> typ.Optional[dict[int, list[int]]]:
+        """Return the cached color group from memory or from the disk, or None."""
+        color_group = super().get(key)
+        if color_group is not None or self.path is None:
+            return color_group
+        file = self._file(key)
+        if not file.exists():
+            return None
+        with open(file) as f:
+            color_group = {
+                int(color): [int(i) for i in group] for color, group in json.load(f)
+            }
+        # The miss in memory is a hit on the disk.
+        self.misses -= 1
+        self.hits += 1
+        super().put(key, color_group)
+        return color_group
+
+    def put(
+        self,
+        key: str,
+        value: dict[int, list[int]],
+        nbytes: typ.Optional[int] = None,
+    ):
+        """Store a color group in memory and, if `path` is given, on the disk."""
+        super().put(key, value, nbytes)
+        if self.path is None:
+            return
+        # A list of pairs keeps the order and the integer colors of the color group.
+        temporary = self._file(key).with_suffix(f".{os.getpid()}.tmp")
+        with open(temporary, "w") as f:
+            json.dump([[color, list(group)] for color, group in value.items()], f)
+        os.replace(temporary, self._file(key))
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import numbers
+import typing as typ
+
+import numpy as np
+
+from .lru_cache import LRUCache
+
+
+def _canonical(obj: typ.Any) -> str:
+    if obj is None:
+        return "None"
+    if isinstance(obj, str):
+        return repr(obj)
+    if isinstance(obj, dict):
+        items = sorted(f"{_canonical(k)}:{_canonical(v)}" for k, v in obj.items())
+        return "{" + ",".join(items) + "}"
+    if isinstance(obj, (tuple, list, np.ndarray)):
+        return "(" + ",".join(_canonical(v) for v in obj) + ")"
+    if isinstance(obj, numbers.Real):
+        # 1 and 1.0 (or np.float64(1.0)) are the same multiplier
+        return repr(float(obj))
+    raise TypeError(f"{type(obj).__name__} cannot be a part of a cache key.")
+
+
+def canonical_key(
+    multipliers: typ.Optional[dict[str, float]] = None,
+    detail_parameters: typ.Optional[
+        dict[str, dict[tuple[int, ...], tuple[float, float]]]
+    ] = None,
+    **arguments: typ.Any,
+) -> str:
+    """Canonical hash of the arguments of `get_hamiltonian`.
+
+    The key does not depend on the order of the dictionaries or on the numeric types of the values.
+
+    Args:
+        multipliers (typ.Optional[dict[str, float]], optional): a multiplier for each penalty. Defaults to None.
+        detail_parameters (typ.Optional[ dict[str, dict[tuple[int, ...], tuple[float, float]]] ], optional): detail parameters for each penalty. Defaults to None.
+        **arguments: the other arguments of `get_hamiltonian`, if any.
+
+    Returns:
+        str: SHA-256 hex digest.
+
+    Examples:
+        >>> canonical_key({"a": 1, "b": 2.0}) == canonical_key({"b": 2.0, "a": 1.0})
+        True
+        >>> canonical_key({"a": 1.0}) == canonical_key({"a": 1.5})
+        False
+        >>> canonical_key({"a": 1.0}) == canonical_key({"a": 1.0}, scale=2.0)
+        False
+
+    """
+    text = _canonical(multipliers) + "|" + _canonical(detail_parameters)
+    if arguments:
+        text += "|" + _canonical(arguments)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class HamiltonianCache(LRUCache):
+    """Bounded LRU cache of Hamiltonians keyed by `canonical_key`.
+
+    The least recently used entries are evicted when there are more than `max_size` entries
+    or when the estimated memory of the entries exceeds `max_bytes`.
+    The cached objects are returned as they are, so they must not be modified in place.
+
+    Examples:
+        >>> cache = HamiltonianCache(max_size=1)
+        >>> key = canonical_key({"a": 1.0})
+        >>> cache.get(key) is None
+        True
+        >>> cache.put(key, ("hamiltonian", 0.5))
+        >>> cache.get(key)
+        ('hamiltonian', 0.5)
+        >>> cache.hits, cache.misses
+        (1, 1)
+
+    """
+
+
+def cached_hamiltonian(method: typ.Callable) -> typ.Callable:
+    """Cache `get_hamiltonian` of a builder in `self.hamiltonian_cache`.
+
+    The arguments are forwarded to the method as they are.
+    The key is `canonical_key` of all the arguments bound to the signature of the method with their defaults,
+    so the same call written with positional or keyword arguments hits the same entry.
+    If `self.hamiltonian_cache` is None, the method is called every time.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache: typ.Optional[HamiltonianCache] = getattr(
+            self, "hamiltonian_cache", None
+        )
+        if cache is None:
+            return method(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        # the first parameter is `self`
+        arguments.pop(next(iter(signature.parameters)))
+        key = canonical_key(
+            arguments.pop("multipliers", None),
+            arguments.pop("detail_parameters", None),
+            **arguments,
+        )
+        hamiltonian = cache.get(key)
+        if hamiltonian is None:
+            hamiltonian = method(self, *args, **kwargs)
+            cache.put(key, hamiltonian)
+        return hamiltonian
+
+    return wrapper
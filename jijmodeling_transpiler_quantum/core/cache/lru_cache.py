@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import collections
+import dataclasses
+import numbers
+import sys
+import typing as typ
+
+import numpy as np
+
+
+def estimate_nbytes(obj: typ.Any) -> int:
+    """Rough memory footprint of an object.
+
+    NumPy arrays count their buffers, and containers and the attributes of objects are followed recursively.
+
+    Args:
+        obj (typ.Any): object.
+
+    Returns:
+        int: estimated number of bytes.
+    """
+    seen: set[int] = set()
+    stack = [obj]
+    nbytes = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        if isinstance(item, np.ndarray):
+            nbytes += item.nbytes
+            continue
+        nbytes += sys.getsizeof(item)
+        if isinstance(item, (str, bytes, numbers.Number)):
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        if hasattr(item, "__dict__"):
+            stack.extend(vars(item).values())
+    return nbytes
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheInfo:
+    hits: int
+    misses: int
+    max_size: typ.Optional[int]
+    max_bytes: typ.Optional[int]
+    size: int
+    nbytes: int
+
+
+class LRUCache:
+    """Bounded LRU cache of the objects built by the builders.
+
+    The least recently used entries are evicted when there are more than `max_size` entries
+    or when the estimated memory of the entries exceeds `max_bytes`.
+    The cached objects are returned as they are, so they must not be modified in place.
+
+    Examples:
+        >>> cache = LRUCache(max_size=1)
+        >>> cache.get("a") is None
+        True
+        >>> cache.put("a", 1.0)
+        >>> cache.put("b", 2.0)
+        >>> "a" in cache, cache.get("b")
+        (False, 2.0)
+        >>> cache.hits, cache.misses
+        (1, 1)
+
+    """
+
+    def __init__(
+        self, max_size: typ.Optional[int] = 128, max_bytes: typ.Optional[int] = None
+    ):
+        """Create an empty cache.
+
+        Args:
+            max_size (typ.Optional[int], optional): the maximum number of entries. None means no limit. Defaults to 128.
+            max_bytes (typ.Optional[int], optional): the maximum estimated memory of the entries. None means no limit. Defaults to None.
+        """
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._entries: collections.OrderedDict[
+            str, tuple[typ.Any, int]
+        ] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> typ.Optional[typ.Any]:
+        """Return the cached value and mark it as the most recently used, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: str, value: typ.Any, nbytes: typ.Optional[int] = None):
+        """Store a value and evict the least recently used entries beyond the limits.
+
+        Args:
+            key (str): key.
+            value (typ.Any): value.
+            nbytes (typ.Optional[int], optional): memory of the value. Defaults to `estimate_nbytes(value)`.
+        """
+        if self.max_size == 0:
+            return
+        if nbytes is None:
+            nbytes = estimate_nbytes(value)
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            return
+        self.invalidate(key)
+        self._entries[key] = (value, nbytes)
+        self.nbytes += nbytes
+        while (self.max_size is not None and len(self._entries) > self.max_size) or (
+            self.max_bytes is not None and self.nbytes > self.max_bytes
+        ):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.nbytes -= evicted
+
+    def invalidate(self, key: str) -> bool:
+        """Remove an entry.
+
+        Returns:
+            bool: True if the entry existed.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.nbytes -= entry[1]
+        return True
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        self._entries.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            max_size=self.max_size,
+            max_bytes=self.max_bytes,
+            size=len(self._entries),
+            nbytes=self.nbytes,
+        )
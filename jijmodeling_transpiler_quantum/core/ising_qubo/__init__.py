@@ -1,8 +1,28 @@
-from .ising_qubo import IsingModel, calc_qubo_energy, qubo_to_ising
+from .ising_qubo import (
+    IsingArrays,
+    IsingModel,
+    calc_qubo_energies,
+    calc_qubo_energy,
+    qubo_to_ising,
+    qubo_to_ising_arrays,
+)
+from .exact_solver import enumerate_ground_states
+from .local_field import LocalFieldCache
+from .parametric import ParametricIsingModel
+from .local_search import refine_binaries, refine_binary_results, steepest_descent
 
 
 __all__ = [
+    "IsingArrays",
     "IsingModel",
+    "LocalFieldCache",
+    "ParametricIsingModel",
+    "calc_qubo_energies",
     "calc_qubo_energy",
+    "enumerate_ground_states",
     "qubo_to_ising",
+    "qubo_to_ising_arrays",
+    "refine_binaries",
+    "refine_binary_results",
+    "steepest_descent",
 ]
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import concurrent.futures
+import typing as typ
+
+import numpy as np
+
+from .ising_qubo import IsingArrays, IsingModel
+
+
+def _index_to_spins(index: np.ndarray, num_bits: int) -> np.ndarray:
+    # bit q of the index is 1 <-> spin q is -1
+    bits = (index[:, None] >> np.arange(num_bits, dtype=np.int64)) & 1
+    return (1 - 2 * bits).astype(np.float64)
+
+
+def _merge_top_k(
+    energies: np.ndarray, indices: np.ndarray, top_k: int
+) -> tuple[np.ndarray, np.ndarray]:
+    if len(energies) > top_k:
+        selected = np.argpartition(energies, top_k - 1)[:top_k]
+        energies, indices = energies[selected], indices[selected]
+    return energies, indices
+
+
+def _enumerate_shard(
+    interaction: np.ndarray,
+    linear: np.ndarray,
+    constant: float,
+    block_bits: int,
+    walk_bits: int,
+    prefix: int,
+    top_k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Enumerate all states whose bits above `block_bits + walk_bits` are `prefix`."""
+    num_spins = len(linear)
+    low = slice(0, block_bits)
+    high = slice(block_bits, num_spins)
+
+    # energies of all 2^block_bits low configurations, computed once
+    low_spins = _index_to_spins(np.arange(2**block_bits, dtype=np.int64), block_bits)
+    low_energies = (
+        np.einsum("si,ij,sj->s", low_spins, interaction[low, low], low_spins) / 2.0
+        + low_spins @ linear[low]
+    )
+
+    # initial high configuration: the walked bits are zero and the others are the prefix
+    num_high = num_spins - block_bits
+    low_high = interaction[low, high]
+    high_high = interaction[high, high]
+    high_index = prefix << walk_bits
+    high_spins = _index_to_spins(np.array([high_index], dtype=np.int64), num_high)[0]
+    coupling = low_high @ high_spins
+    high_fields = linear[high] + high_high @ high_spins
+    high_energy = (
+        constant
+        + (high_spins @ high_high @ high_spins) / 2.0
+        + high_spins @ linear[high]
+    )
+
+    best_energies = np.empty(0, dtype=np.float64)
+    best_indices = np.empty(0, dtype=np.int64)
+    high_offset = np.int64(1) << block_bits
+    for step in range(2**walk_bits):
+        if step:
+            # Gray code: the step-th move flips the lowest set bit of step
+            flip = (step & -step).bit_length() - 1
+            spin = high_spins[flip]
+            high_energy += -2.0 * spin * high_fields[flip]
+            high_spins[flip] = -spin
+            high_fields += -2.0 * spin * high_high[:, flip]
+            coupling += -2.0 * spin * low_high[:, flip]
+            high_index ^= 1 << flip
+
+        # spin products with the high part are linear in the low spins
+        energies = low_energies + low_spins @ coupling + high_energy
+        if len(best_energies) == top_k and energies.min() >= best_energies.max():
+            continue
+        candidates, low_index = _merge_top_k(
+            energies, np.arange(len(energies), dtype=np.int64), top_k
+        )
+        best_energies, best_indices = _merge_top_k(
+            np.concatenate([best_energies, candidates]),
+            np.concatenate([best_indices, high_index * high_offset + low_index]),
+            top_k,
+        )
+    return best_energies, best_indices
+
+
+def enumerate_ground_states(
+    ising: typ.Union[IsingModel, IsingArrays],
+    top_k: int = 1,
+    block_bits: int = 16,
+    num_shards: typ.Optional[int] = None,
+    n_jobs: typ.Optional[int] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Find the exact lowest-energy states of an Ising model by brute force.
+
+    The spins are split into the lowest `block_bits` spins and the rest.
+    The energies of the 2^block_bits low configurations are computed once,
+    and for every configuration of the rest, the energies of the whole block are obtained by one matrix-vector product.
+    The configurations of the rest are walked in Gray-code order so that the coupling
+    between the two parts and the energy of the rest are updated incrementally by one spin flip.
+    The space of the rest is split by its highest bits into `num_shards` prefixes, which can be walked in a process pool.
+
+    The energies of the returned states are recomputed exactly at the end.
+
+    Args:
+        ising (typ.Union[IsingModel, IsingArrays]): Ising model. This is practical up to about 34 spins.
+        top_k (int, optional): the number of states to return. Defaults to 1.
+        block_bits (int, optional): the number of spins enumerated in a vectorized block. Defaults to 16.
+        num_shards (typ.Optional[int], optional): the number of prefixes. It is rounded down to a power of two. Defaults to four times `n_jobs`.
+        n_jobs (typ.Optional[int], optional): the number of processes. Defaults to None (no process pool).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: energies in ascending order and the corresponding spin states whose shape is (top_k, n).
+
+    Examples:
+        >>> ising = IsingModel({(0, 1): 1.0, (1, 2): 1.0}, {0: 0.5}, 1.0)
+        >>> energies, states = enumerate_ground_states(ising, top_k=2)
+        >>> energies
+        array([-1.5, -0.5])
+        >>> states
+        array([[-1,  1, -1],
+               [ 1, -1,  1]])
+
+    """
+    if isinstance(ising, IsingModel):
+        ising = ising.to_arrays()
+    num_spins = ising.num_spins
+    if num_spins == 0:
+        return np.array([ising.constant]), np.zeros((1, 0), dtype=np.int64)
+    top_k = min(top_k, 2**num_spins)
+
+    interaction = np.zeros((num_spins, num_spins), dtype=np.float64)
+    indptr, indices, data = ising.to_csr()
+    interaction[np.repeat(np.arange(num_spins), np.diff(indptr)), indices] = data
+    linear = np.zeros(num_spins, dtype=np.float64)
+    np.add.at(linear, ising.linear_index, ising.linear_coeff)
+    # z_i * z_i = 1
+    diagonal = ising.quad_row == ising.quad_col
+    constant = ising.constant + ising.quad_coeff[diagonal].sum()
+
+    block_bits = min(block_bits, num_spins)
+    num_high = num_spins - block_bits
+    if num_shards is None:
+        num_shards = 4 * n_jobs if n_jobs else 1
+    prefix_bits = min(num_high, max(int(num_shards).bit_length() - 1, 0))
+    walk_bits = num_high - prefix_bits
+    args = (interaction, linear, constant, block_bits, walk_bits)
+
+    if n_jobs is not None and n_jobs > 1 and prefix_bits > 0:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [
+                executor.submit(_enumerate_shard, *args, prefix, top_k)
+                for prefix in range(2**prefix_bits)
+            ]
+            results = [future.result() for future in futures]
+    else:
+        results = [
+            _enumerate_shard(*args, prefix, top_k)
+            for prefix in range(2**prefix_bits)
+        ]
+
+    _, state_indices = _merge_top_k(
+        np.concatenate([energies for energies, _ in results]),
+        np.concatenate([indices for _, indices in results]),
+        top_k,
+    )
+    states = _index_to_spins(state_indices, num_spins).astype(np.int64)
+    energies = ising.calc_energies(states)
+    order = np.lexsort((state_indices, energies))
+    return energies[order], states[order]
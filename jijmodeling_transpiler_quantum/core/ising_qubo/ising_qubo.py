@@ -1,4 +1,9 @@
+from __future__ import annotations
+
 import dataclasses
+import typing as typ
+
+import numpy as np
 
 
 @dataclasses.dataclass
@@ -7,6 +12,54 @@ class IsingModel:
     linear: dict[int, float]
     constant: float
 
+    @property
+    def num_spins(self) -> int:
+        """The number of spins, i.e. the largest spin index plus one.
+
+        Examples:
+            >>> IsingModel({(0, 3): 1.0}, {5: 1.0}, 0.0).num_spins
+            6
+
+        """
+        max_index = -1
+        if self.quad:
+            max_index = max(max(ij) for ij in self.quad.keys())
+        if self.linear:
+            max_index = max(max_index, max(self.linear.keys()))
+        return max_index + 1
+
+    def to_arrays(self, num_spins: typ.Optional[int] = None) -> IsingArrays:
+        """Converts the dict representation into the array (COO) representation.
+
+        Args:
+            num_spins (typ.Optional[int], optional): the number of spins. Defaults to `self.num_spins`.
+
+        Returns:
+            IsingArrays: array representation of the same Ising model.
+        """
+        return IsingArrays.from_ising_model(self, num_spins=num_spins)
+
+    def calc_energies(self, states: np.ndarray) -> np.ndarray:
+        """Calculates the energies of a batch of states in one vectorized pass.
+
+        If you evaluate many batches of the same model, convert it once with `to_arrays`
+        and call `IsingArrays.calc_energies` instead.
+
+        Args:
+            states (np.ndarray): spin matrix whose shape is (num_samples, n) and whose values are -1 or 1.
+
+        Returns:
+            np.ndarray: energy of each state.
+
+        Examples:
+            >>> ising = IsingModel({(0, 1): 2.0}, {0: 4.0, 1: 5.0}, 6.0)
+            >>> ising.calc_energies(np.array([[1, -1], [1, 1]]))
+            array([ 3., 17.])
+
+        """
+        states = np.atleast_2d(states)
+        return self.to_arrays(num_spins=states.shape[1]).calc_energies(states)
+
     def calc_energy(self, state: list[int]) -> float:
         """Calculates the energy of the state.
 
@@ -24,6 +77,162 @@ class IsingModel:
         return energy
 
 
+@dataclasses.dataclass
+class IsingArrays:
+    """Array (COO) representation of an Ising model.
+
+    The quadratic terms are stored as `quad_coeff[k] * z[quad_row[k]] * z[quad_col[k]]`
+    and the linear terms as `linear_coeff[k] * z[linear_index[k]]`.
+    The order of the terms is the same as the insertion order of the dict representation.
+    """
+
+    quad_row: np.ndarray
+    quad_col: np.ndarray
+    quad_coeff: np.ndarray
+    linear_index: np.ndarray
+    linear_coeff: np.ndarray
+    constant: float
+    num_spins: int
+
+    @classmethod
+    def from_ising_model(
+        cls, ising: IsingModel, num_spins: typ.Optional[int] = None
+    ) -> IsingArrays:
+        """Builds the array representation from the dict representation.
+
+        Args:
+            ising (IsingModel): Ising model.
+            num_spins (typ.Optional[int], optional): the number of spins. Defaults to `ising.num_spins`.
+
+        Returns:
+            IsingArrays: array representation of `ising`.
+        """
+        quad = np.array(list(ising.quad.keys()), dtype=np.int64).reshape(-1, 2)
+        quad_coeff = np.fromiter(
+            ising.quad.values(), dtype=np.float64, count=len(ising.quad)
+        )
+        linear_index = np.fromiter(
+            ising.linear.keys(), dtype=np.int64, count=len(ising.linear)
+        )
+        linear_coeff = np.fromiter(
+            ising.linear.values(), dtype=np.float64, count=len(ising.linear)
+        )
+        return cls(
+            quad_row=quad[:, 0].copy(),
+            quad_col=quad[:, 1].copy(),
+            quad_coeff=quad_coeff,
+            linear_index=linear_index,
+            linear_coeff=linear_coeff,
+            constant=ising.constant,
+            num_spins=ising.num_spins if num_spins is None else num_spins,
+        )
+
+    def to_ising_model(self) -> IsingModel:
+        """Converts back into the dict representation.
+
+        Returns:
+            IsingModel: dict representation of the same Ising model.
+        """
+        quad = dict(
+            zip(
+                zip(self.quad_row.tolist(), self.quad_col.tolist()),
+                self.quad_coeff.tolist(),
+            )
+        )
+        linear = dict(zip(self.linear_index.tolist(), self.linear_coeff.tolist()))
+        return IsingModel(quad, linear, self.constant)
+
+    def substitute(self, spin: int, target: int, sign: int):
+        """Substitutes `z[spin] = sign * z[target]` in place.
+
+        The terms on `spin` are moved to `target`, and the quadratic terms which become `z[target] * z[target]`
+        are folded into the constant, so that `spin` has no term any more and `num_spins` is unchanged.
+
+        Args:
+            spin (int): the spin to eliminate.
+            target (int): the spin replacing it.
+            sign (int): 1 (correlation) or -1 (anti-correlation).
+
+        Examples:
+            >>> arrays = IsingModel({(0, 1): 2.0, (1, 2): 1.0}, {1: 0.5}, 0.0).to_arrays()
+            >>> arrays.substitute(1, 0, -1)
+            >>> arrays.to_ising_model()
+            IsingModel(quad={(0, 2): -1.0}, linear={0: -0.5}, constant=-2.0)
+
+        """
+        on_row, on_col = self.quad_row == spin, self.quad_col == spin
+        self.quad_coeff[on_row ^ on_col] *= sign
+        self.quad_row[on_row] = target
+        self.quad_col[on_col] = target
+        on_linear = self.linear_index == spin
+        self.linear_coeff[on_linear] *= sign
+        self.linear_index[on_linear] = target
+
+        # z_i * z_i = 1
+        diagonal = self.quad_row == self.quad_col
+        if diagonal.any():
+            self.constant += float(self.quad_coeff[diagonal].sum())
+            self.quad_row = self.quad_row[~diagonal]
+            self.quad_col = self.quad_col[~diagonal]
+            self.quad_coeff = self.quad_coeff[~diagonal]
+
+    def to_csr(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the symmetric interaction matrix in CSR format.
+
+        Both `(i, j)` and `(j, i)` are stored for every quadratic term and duplicated terms are merged.
+        Quadratic terms with `i == j` are constants (`z_i * z_i = 1`) and are not included.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: indptr, indices and data of the CSR matrix.
+
+        Examples:
+            >>> arrays = IsingModel({(0, 1): 2.0, (2, 1): 1.0}, {}, 0.0).to_arrays()
+            >>> indptr, indices, data = arrays.to_csr()
+            >>> indptr.tolist(), indices.tolist(), data.tolist()
+            ([0, 1, 3, 4], [1, 0, 2, 1], [2.0, 2.0, 1.0, 1.0])
+
+        """
+        n = self.num_spins
+        off_diagonal = self.quad_row != self.quad_col
+        row = self.quad_row[off_diagonal]
+        col = self.quad_col[off_diagonal]
+        coeff = self.quad_coeff[off_diagonal]
+
+        keys = np.concatenate([row * n + col, col * n + row])
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        data = np.bincount(
+            inverse, weights=np.concatenate([coeff, coeff]), minlength=len(unique_keys)
+        )
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(unique_keys // n, minlength=n), out=indptr[1:])
+        return indptr, unique_keys % n, data
+
+    def calc_energies(self, states: np.ndarray) -> np.ndarray:
+        """Calculates the energies of a batch of states in one vectorized pass.
+
+        Args:
+            states (np.ndarray): spin matrix whose shape is (num_samples, n) and whose values are -1 or 1.
+
+        Returns:
+            np.ndarray: energy of each state.
+
+        Examples:
+            >>> arrays = IsingModel({(0, 1): 2.0}, {0: 4.0, 1: 5.0}, 6.0).to_arrays()
+            >>> arrays.calc_energies(np.array([[1, -1], [-1, -1]]))
+            array([ 3., -1.])
+
+        """
+        states = np.atleast_2d(np.asarray(states, dtype=np.float64))
+        energies = np.full(states.shape[0], self.constant, dtype=np.float64)
+        if len(self.quad_coeff):
+            energies += (
+                states[:, self.quad_row] * states[:, self.quad_col]
+            ) @ self.quad_coeff
+        if len(self.linear_coeff):
+            energies += states[:, self.linear_index] @ self.linear_coeff
+        return energies
+
+
 def calc_qubo_energy(qubo: dict[tuple[int, int], float], state: list[int]) -> float:
     """Calculates the energy of the state.
 
@@ -37,12 +246,39 @@ def calc_qubo_energy(qubo: dict[tuple[int, int], float], state: list[int]) -> fl
     return energy
 
 
+def calc_qubo_energies(
+    qubo: dict[tuple[int, int], float], states: np.ndarray
+) -> np.ndarray:
+    """Calculates the energies of a batch of binary states in one vectorized pass.
+
+    Args:
+        qubo (dict[tuple[int, int], float]): QUBO.
+        states (np.ndarray): binary matrix whose shape is (num_samples, n) and whose values are 0 or 1.
+
+    Returns:
+        np.ndarray: energy of each state.
+
+    Examples:
+        >>> qubo = {(0, 0): 1.0, (0, 1): 2.0, (1, 1): 3.0}
+        >>> calc_qubo_energies(qubo, np.array([[1, 1], [0, 1]]))
+        array([6., 3.])
+    """
+    states = np.atleast_2d(np.asarray(states, dtype=np.float64))
+    if not qubo:
+        return np.zeros(states.shape[0], dtype=np.float64)
+    index = np.array(list(qubo.keys()), dtype=np.int64).reshape(-1, 2)
+    coeff = np.fromiter(qubo.values(), dtype=np.float64, count=len(qubo))
+    return (states[:, index[:, 0]] * states[:, index[:, 1]]) @ coeff
+
+
 def qubo_to_ising(qubo: dict[tuple[int, int], float], simplify=True) -> IsingModel:
     """Converts a QUBO to an Ising model.
 
     QUBO: sum_{ij} Q_{ij} x_i x_j -> Ising: sum_{ij} J_{ij} z_i z_j + sum_i h_i z_i
     Correspondence - x_i = (1 - z_i) / 2, where x_i in {0, 1} and z_i in {-1, 1}
 
+    This is a thin wrapper of `qubo_to_ising_arrays` which returns the dict representation.
+
     Examples:
         >>> qubo = {(0, 0): 1.0, (0, 1): 2.0, (1, 1): 3.0}
         >>> ising = qubo_to_ising(qubo)
@@ -58,19 +294,115 @@ def qubo_to_ising(qubo: dict[tuple[int, int], float], simplify=True) -> IsingMod
         >>> assert ising.quad == {(0, 1): 0.5}
 
     """
-    ising_J: dict[tuple[int, int], float] = {}
-    ising_h: dict[int, float] = {}
-    constant = 0.0
-    for (i, j), value in qubo.items():
-        if i != j:
-            ising_J[(i, j)] = value / 4.0 + ising_J.get((i, j), 0.0)
-            constant += value / 4.0
-        else:
-            constant += value / 2.0
-        ising_h[i] = -value / 4.0 + ising_h.get(i, 0.0)
-        ising_h[j] = -value / 4.0 + ising_h.get(j, 0.0)
+    return qubo_to_ising_arrays(qubo, simplify=simplify).to_ising_model()
+
+
+QuboLike = typ.Union[
+    dict[tuple[int, int], float],
+    tuple[np.ndarray, np.ndarray, np.ndarray],
+    typ.Any,
+]
+
+
+def _qubo_to_triplets(
+    qubo: QuboLike, num_spins: typ.Optional[int]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    if isinstance(qubo, dict):
+        index = np.array(list(qubo.keys()), dtype=np.int64).reshape(-1, 2)
+        row, col = index[:, 0], index[:, 1]
+        value = np.fromiter(qubo.values(), dtype=np.float64, count=len(qubo))
+    elif hasattr(qubo, "tocoo"):
+        # scipy.sparse matrix or array
+        coo = qubo.tocoo()
+        row = np.asarray(coo.row, dtype=np.int64)
+        col = np.asarray(coo.col, dtype=np.int64)
+        value = np.asarray(coo.data, dtype=np.float64)
+        if num_spins is None:
+            num_spins = max(coo.shape)
+    elif isinstance(qubo, tuple) and len(qubo) == 3:
+        row = np.asarray(qubo[0], dtype=np.int64)
+        col = np.asarray(qubo[1], dtype=np.int64)
+        value = np.asarray(qubo[2], dtype=np.float64)
+        if not (row.shape == col.shape == value.shape and row.ndim == 1):
+            raise ValueError(
+                "row, col and value of a QUBO must be 1-dim arrays of the same length."
+            )
+    else:
+        raise TypeError(
+            "qubo must be a dict, a scipy.sparse matrix or a tuple of (row, col, value) arrays, "
+            f"but got {type(qubo)}."
+        )
+
+    if num_spins is None:
+        num_spins = int(max(row.max(), col.max())) + 1 if len(row) else 0
+    return row, col, value, num_spins
+
+
+def qubo_to_ising_arrays(
+    qubo: QuboLike, simplify: bool = True, num_spins: typ.Optional[int] = None
+) -> IsingArrays:
+    """Converts a QUBO to the array representation of an Ising model.
+
+    The conversion is the same as `qubo_to_ising`, but all reductions are done by NumPy.
+    `Q_{ij}` and `Q_{ji}` are merged into one quadratic term whose key is the one appearing first.
+    The order of the terms is the order of first appearance in the QUBO.
+
+    Args:
+        qubo (QuboLike): QUBO as a dict, a `scipy.sparse` matrix or a tuple of (row, col, value) arrays.
+        simplify (bool, optional): remove terms whose coefficients are zero. Defaults to True.
+        num_spins (typ.Optional[int], optional): the number of spins. Defaults to the largest index plus one (or the shape of a sparse matrix).
+
+    Returns:
+        IsingArrays: Ising model.
+
+    Examples:
+        >>> row, col, value = np.array([0, 0, 1]), np.array([0, 1, 1]), np.array([1.0, 2.0, 3.0])
+        >>> arrays = qubo_to_ising_arrays((row, col, value))
+        >>> arrays.quad_coeff.tolist(), arrays.linear_coeff.tolist(), arrays.constant
+        ([0.5], [-1.0, -2.0], 2.5)
+
+    """
+    row, col, value, num_spins = _qubo_to_triplets(qubo, num_spins)
+    off_diagonal = row != col
+
+    # quadratic terms: (i, j) and (j, i) share the same key
+    quad_row, quad_col = row[off_diagonal], col[off_diagonal]
+    quad_value = value[off_diagonal] / 4.0
+    keys = np.minimum(quad_row, quad_col) * num_spins + np.maximum(quad_row, quad_col)
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    quad_coeff = np.bincount(inverse, weights=quad_value, minlength=len(first))
+    order = np.argsort(first, kind="stable")
+    quad_row, quad_col = quad_row[first[order]], quad_col[first[order]]
+    quad_coeff = quad_coeff[order]
+
+    # linear terms: each Q_{ij} contributes -Q_{ij} / 4 to both h_i and h_j
+    linear_all = np.stack([row, col], axis=1).ravel()
+    _, first, inverse = np.unique(linear_all, return_index=True, return_inverse=True)
+    linear_coeff = np.bincount(
+        inverse, weights=np.repeat(-value / 4.0, 2), minlength=len(first)
+    )
+    order = np.argsort(first, kind="stable")
+    linear_index = linear_all[first[order]]
+    linear_coeff = linear_coeff[order]
+
+    constant = float(quad_value.sum() + value[~off_diagonal].sum() / 2.0)
 
     if simplify:
-        ising_J = {ij: value for ij, value in ising_J.items() if value != 0.0}
-        ising_h = {i: value for i, value in ising_h.items() if value != 0.0}
-    return IsingModel(ising_J, ising_h, constant)
+        nonzero = quad_coeff != 0.0
+        quad_row, quad_col, quad_coeff = (
+            quad_row[nonzero],
+            quad_col[nonzero],
+            quad_coeff[nonzero],
+        )
+        nonzero = linear_coeff != 0.0
+        linear_index, linear_coeff = linear_index[nonzero], linear_coeff[nonzero]
+
+    return IsingArrays(
+        quad_row=quad_row,
+        quad_col=quad_col,
+        quad_coeff=quad_coeff,
+        linear_index=linear_index,
+        linear_coeff=linear_coeff,
+        constant=constant,
+        num_spins=num_spins,
+    )
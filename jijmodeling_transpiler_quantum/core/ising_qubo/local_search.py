@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import concurrent.futures
+import dataclasses
+import typing as typ
+
+import numpy as np
+import scipy.sparse as sp
+
+from .ising_qubo import IsingArrays, IsingModel, qubo_to_ising_arrays
+
+# A move is accepted only if it lowers the energy by more than this value,
+# so that floating point noise cannot make the descent cycle.
+_IMPROVEMENT_TOLERANCE = 1e-12
+
+
+def _descent_kernel(
+    interaction: sp.csr_matrix,
+    linear: np.ndarray,
+    edge_i: np.ndarray,
+    edge_j: np.ndarray,
+    edge_weight: np.ndarray,
+    states: np.ndarray,
+    two_flip: bool,
+    max_iterations: typ.Optional[int],
+) -> np.ndarray:
+    states = states.astype(np.float64)
+    active = np.arange(states.shape[0])
+    iteration = 0
+    while active.size and (max_iterations is None or iteration < max_iterations):
+        iteration += 1
+        spins = states[active]
+        fields = linear + (interaction @ spins.T).T
+        delta_1 = -2.0 * spins * fields
+        best_1 = np.argmin(delta_1, axis=1)
+        best_delta = delta_1[np.arange(active.size), best_1]
+
+        use_2 = np.zeros(active.size, dtype=bool)
+        if two_flip and edge_weight.size:
+            # dE(i, j) = dE(i) + dE(j) + 4 J_ij s_i s_j
+            delta_2 = (
+                delta_1[:, edge_i]
+                + delta_1[:, edge_j]
+                + 4.0 * edge_weight * spins[:, edge_i] * spins[:, edge_j]
+            )
+            best_2 = np.argmin(delta_2, axis=1)
+            best_delta_2 = delta_2[np.arange(active.size), best_2]
+            use_2 = best_delta_2 < best_delta
+            best_delta = np.where(use_2, best_delta_2, best_delta)
+
+        improved = best_delta < -_IMPROVEMENT_TOLERANCE
+        rows_1 = active[improved & ~use_2]
+        states[rows_1, best_1[improved & ~use_2]] *= -1
+        if use_2.any():
+            mask = improved & use_2
+            rows_2 = active[mask]
+            states[rows_2, edge_i[best_2[mask]]] *= -1
+            states[rows_2, edge_j[best_2[mask]]] *= -1
+        active = active[improved]
+    return states
+
+
+def steepest_descent(
+    ising: typ.Union[IsingModel, IsingArrays],
+    states: np.ndarray,
+    two_flip: bool = True,
+    max_iterations: typ.Optional[int] = None,
+    n_jobs: typ.Optional[int] = None,
+    chunk_size: int = 4096,
+) -> np.ndarray:
+    """Refine spin states by batched steepest descent.
+
+    In every iteration, each sample takes the best single-spin flip or, if `two_flip` is True,
+    the best flip of two interacting spins, as long as it lowers the energy.
+    All samples are updated at once by NumPy, and samples that reached a local minimum are dropped from the batch.
+    Only interacting pairs are considered for 2-flips, because a pair without interaction
+    cannot improve a state in which no single flip improves.
+
+    Args:
+        ising (typ.Union[IsingModel, IsingArrays]): Ising model.
+        states (np.ndarray): spin matrix whose shape is (num_samples, n) and whose values are -1 or 1.
+        two_flip (bool, optional): also search 2-flip moves. Defaults to True.
+        max_iterations (typ.Optional[int], optional): the maximum number of moves for each sample. Defaults to None (until convergence).
+        n_jobs (typ.Optional[int], optional): the number of processes. If it is larger than one, the samples are split into chunks of `chunk_size` and refined in a process pool. Defaults to None.
+        chunk_size (int, optional): the number of samples per process. Defaults to 4096.
+
+    Returns:
+        np.ndarray: refined spin matrix.
+
+    Examples:
+        >>> ising = IsingModel({(0, 1): -1.0, (1, 2): -1.0}, {0: 0.5}, 0.0)
+        >>> steepest_descent(ising, np.array([[1, 1, -1], [1, -1, 1]]))
+        array([[-1, -1, -1],
+               [ 1,  1,  1]])
+
+    """
+    states = np.atleast_2d(np.asarray(states))
+    num_spins = states.shape[1]
+    if isinstance(ising, IsingModel):
+        ising = ising.to_arrays(num_spins=num_spins)
+    else:
+        ising = dataclasses.replace(ising, num_spins=num_spins)
+
+    indptr, indices, data = ising.to_csr()
+    interaction = sp.csr_matrix((data, indices, indptr), shape=(num_spins, num_spins))
+    linear = np.zeros(num_spins, dtype=np.float64)
+    np.add.at(linear, ising.linear_index, ising.linear_coeff)
+    rows = np.repeat(np.arange(num_spins), np.diff(indptr))
+    upper = rows < indices
+    args = (interaction, linear, rows[upper], indices[upper], data[upper])
+
+    if n_jobs is not None and n_jobs > 1 and states.shape[0] > chunk_size:
+        chunks = [
+            states[start : start + chunk_size]
+            for start in range(0, states.shape[0], chunk_size)
+        ]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [
+                executor.submit(
+                    _descent_kernel, *args, chunk, two_flip, max_iterations
+                )
+                for chunk in chunks
+            ]
+            refined = np.concatenate([future.result() for future in futures])
+    else:
+        refined = _descent_kernel(*args, states, two_flip, max_iterations)
+    return refined.astype(states.dtype)
+
+
+def refine_binaries(
+    qubo: dict[tuple[int, int], float],
+    binaries: np.ndarray,
+    two_flip: bool = True,
+    n_jobs: typ.Optional[int] = None,
+) -> np.ndarray:
+    """Refine a binary matrix on a QUBO by `steepest_descent`.
+
+    Args:
+        qubo (dict[tuple[int, int], float]): QUBO.
+        binaries (np.ndarray): binary matrix whose shape is (num_samples, num_vars).
+        two_flip (bool, optional): also search 2-flip moves. Defaults to True.
+        n_jobs (typ.Optional[int], optional): the number of processes. Defaults to None.
+
+    Returns:
+        np.ndarray: refined binary matrix in the dtype of `binaries`.
+
+    Examples:
+        >>> qubo = {(0, 0): -1.0, (1, 1): -1.0, (0, 1): 3.0}
+        >>> refine_binaries(qubo, np.array([[1, 1], [0, 0]]))
+        array([[0, 1],
+               [1, 0]])
+
+    """
+    binaries = np.atleast_2d(np.asarray(binaries))
+    ising = qubo_to_ising_arrays(qubo, num_spins=binaries.shape[1])
+    spins = 1 - 2 * binaries.astype(np.int64)
+    spins = steepest_descent(ising, spins, two_flip=two_flip, n_jobs=n_jobs)
+    return ((1 - spins) // 2).astype(binaries.dtype)
+
+
+def refine_binary_results(
+    qubo: dict[tuple[int, int], float],
+    binary_results: list[dict[int, int]],
+    num_vars: int,
+    two_flip: bool = True,
+    n_jobs: typ.Optional[int] = None,
+) -> list[dict[int, int]]:
+    """Refine binary samples on a QUBO by `steepest_descent`.
+
+    Args:
+        qubo (dict[tuple[int, int], float]): QUBO.
+        binary_results (list[dict[int, int]]): binary samples. key is the index of the variable.
+        num_vars (int): the number of binary variables.
+        two_flip (bool, optional): also search 2-flip moves. Defaults to True.
+        n_jobs (typ.Optional[int], optional): the number of processes. Defaults to None.
+
+    Returns:
+        list[dict[int, int]]: refined binary samples.
+
+    Examples:
+        >>> qubo = {(0, 0): -1.0, (1, 1): -1.0, (0, 1): 3.0}
+        >>> refine_binary_results(qubo, [{0: 1, 1: 1}, {0: 0, 1: 0}], 2)
+        [{0: 0, 1: 1}, {0: 1, 1: 0}]
+
+    """
+    binaries = np.zeros((len(binary_results), num_vars), dtype=np.int64)
+    for row, binary in enumerate(binary_results):
+        binaries[row, list(binary.keys())] = list(binary.values())
+
+    refined = refine_binaries(qubo, binaries, two_flip=two_flip, n_jobs=n_jobs)
+    return [dict(enumerate(row)) for row in refined.tolist()]
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import dataclasses
+import typing as typ
+
+import numpy as np
+
+from .ising_qubo import IsingArrays, IsingModel, qubo_to_ising_arrays
+
+
+def align_terms(
+    keys: list[np.ndarray], coeffs: list[np.ndarray]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Align the terms of the components on the union of their keys.
+
+    Args:
+        keys (list[np.ndarray]): integer keys of the terms of each component.
+        coeffs (list[np.ndarray]): coefficients of the terms of each component.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: the position of the first appearance of each shared term in the concatenated keys
+        and the coefficient matrix whose shape is (num_components, num_shared_terms).
+    """
+    component_ids = np.repeat(np.arange(len(keys)), [len(k) for k in keys])
+    _, first, inverse = np.unique(
+        np.concatenate(keys), return_index=True, return_inverse=True
+    )
+    order = np.argsort(first, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    coeffs = np.concatenate(coeffs)
+    matrix = np.zeros((len(keys), len(first)), dtype=coeffs.dtype)
+    np.add.at(matrix, (component_ids, rank[inverse]), coeffs)
+    return first[order], matrix
+
+
+@dataclasses.dataclass
+class ParametricIsingModel:
+    """Ising model whose coefficients are affine in the penalty multipliers.
+
+    The QUBO of `PuboBuilder.get_qubo_dict` is `Q_0 + sum_c m_c Q_c`, where `Q_0` is the objective
+    and `Q_c` is the penalty of the constraint (or custom penalty) `labels[c - 1]`.
+    Every component is converted into an Ising model on one shared set of terms,
+    so that the model for any multipliers is a weighted sum of coefficient vectors.
+
+    The k-th row of `quad_coeffs`, `linear_coeffs`, `ising_constants` and `qubo_constants`
+    is the k-th component, and row 0 is the objective.
+    `ising_constants` is the constant of the Ising model and `qubo_constants` is the constant
+    returned by `PuboBuilder.get_qubo_dict`.
+    """
+
+    labels: list[str]
+    quad_row: np.ndarray
+    quad_col: np.ndarray
+    quad_coeffs: np.ndarray
+    linear_index: np.ndarray
+    linear_coeffs: np.ndarray
+    ising_constants: np.ndarray
+    qubo_constants: np.ndarray
+    num_spins: int
+
+    @classmethod
+    def from_pubo_builder(
+        cls,
+        pubo_builder,
+        num_spins: int,
+        detail_parameters: typ.Optional[
+            dict[str, dict[tuple[int, ...], tuple[float, float]]]
+        ] = None,
+    ) -> ParametricIsingModel:
+        """Decompose the QUBO of a `PuboBuilder` into the objective and each penalty.
+
+        `get_qubo_dict` is called once for the objective and once for each penalty.
+
+        Args:
+            pubo_builder (jmt.core.pubo.PuboBuilder): PUBO builder.
+            num_spins (int): the number of spins.
+            detail_parameters (typ.Optional[ dict[str, dict[tuple[int, ...], tuple[float, float]]] ], optional): detail parameters for each penalty. They are fixed in the decomposition. Defaults to None.
+
+        Returns:
+            ParametricIsingModel: decomposed Ising model.
+        """
+        labels = list(pubo_builder.penalty.keys()) + list(
+            pubo_builder.custom_penalty.keys()
+        )
+        zero = {label: 0.0 for label in labels}
+        objective, objective_constant = pubo_builder.get_qubo_dict(
+            multipliers=zero, detail_parameters=detail_parameters
+        )
+        qubos = [objective]
+        qubo_constants = [objective_constant]
+        for label in labels:
+            qubo, constant = pubo_builder.get_qubo_dict(
+                multipliers={**zero, label: 1.0},
+                detail_parameters=detail_parameters,
+            )
+            qubos.append(
+                {
+                    key: value - objective.get(key, 0.0)
+                    for key, value in qubo.items()
+                }
+            )
+            qubo_constants.append(constant - objective_constant)
+        return cls.from_qubos(labels, qubos, qubo_constants, num_spins)
+
+    @classmethod
+    def from_qubos(
+        cls,
+        labels: list[str],
+        qubos: list[dict[tuple[int, int], float]],
+        qubo_constants: list[float],
+        num_spins: int,
+    ) -> ParametricIsingModel:
+        """Build from the QUBO of the objective followed by the QUBO of each penalty.
+
+        Args:
+            labels (list[str]): labels of the penalties.
+            qubos (list[dict[tuple[int, int], float]]): QUBOs of the objective and the penalties.
+            qubo_constants (list[float]): constants of the QUBOs.
+            num_spins (int): the number of spins.
+
+        Returns:
+            ParametricIsingModel: decomposed Ising model.
+
+        Examples:
+            >>> model = ParametricIsingModel.from_qubos(
+            ...     ["onehot"], [{(0, 0): 1.0}, {(0, 1): 2.0, (0, 0): -1.0}], [0.0, 1.0], 2
+            ... )
+            >>> model.with_multipliers({"onehot": 2.0}).to_ising_model()
+            IsingModel(quad={(0, 1): 1.0}, linear={0: -0.5, 1: -1.0}, constant=0.5)
+
+        """
+        components = [
+            qubo_to_ising_arrays(qubo, simplify=False, num_spins=num_spins)
+            for qubo in qubos
+        ]
+        quad_row = np.concatenate([c.quad_row for c in components])
+        quad_col = np.concatenate([c.quad_col for c in components])
+        quad_first, quad_coeffs = align_terms(
+            [
+                np.minimum(c.quad_row, c.quad_col) * num_spins
+                + np.maximum(c.quad_row, c.quad_col)
+                for c in components
+            ],
+            [c.quad_coeff for c in components],
+        )
+        linear_index = np.concatenate([c.linear_index for c in components])
+        linear_first, linear_coeffs = align_terms(
+            [c.linear_index for c in components],
+            [c.linear_coeff for c in components],
+        )
+        return cls(
+            labels=list(labels),
+            quad_row=quad_row[quad_first],
+            quad_col=quad_col[quad_first],
+            quad_coeffs=quad_coeffs,
+            linear_index=linear_index[linear_first],
+            linear_coeffs=linear_coeffs,
+            ising_constants=np.array([c.constant for c in components]),
+            qubo_constants=np.asarray(qubo_constants, dtype=np.float64),
+            num_spins=num_spins,
+        )
+
+    @property
+    def num_components(self) -> int:
+        return len(self.labels) + 1
+
+    def weights(self, multipliers: typ.Optional[dict[str, float]] = None) -> np.ndarray:
+        """Weights of the components.
+
+        The objective has weight 1 and a penalty missing in `multipliers` has weight 1 as in `PuboBuilder`.
+
+        Args:
+            multipliers (typ.Optional[dict[str, float]], optional): a multiplier for each penalty. Defaults to None.
+
+        Returns:
+            np.ndarray: weights of the components.
+        """
+        multipliers = multipliers or {}
+        return np.array(
+            [1.0] + [float(multipliers.get(label, 1.0)) for label in self.labels]
+        )
+
+    def component(self, k: int) -> IsingModel:
+        """The k-th component on the shared terms. The zero coefficients are kept.
+
+        Args:
+            k (int): index of the component. 0 is the objective.
+
+        Returns:
+            IsingModel: Ising model of the component.
+        """
+        return IsingArrays(
+            quad_row=self.quad_row,
+            quad_col=self.quad_col,
+            quad_coeff=self.quad_coeffs[k],
+            linear_index=self.linear_index,
+            linear_coeff=self.linear_coeffs[k],
+            constant=float(self.ising_constants[k]),
+            num_spins=self.num_spins,
+        ).to_ising_model()
+
+    def with_multipliers(
+        self, multipliers: typ.Optional[dict[str, float]] = None
+    ) -> IsingArrays:
+        """Ising model for the given multipliers in O(terms).
+
+        Args:
+            multipliers (typ.Optional[dict[str, float]], optional): a multiplier for each penalty. Defaults to None.
+
+        Returns:
+            IsingArrays: Ising model on the shared terms. The constant does not include the QUBO constant.
+        """
+        weights = self.weights(multipliers)
+        return IsingArrays(
+            quad_row=self.quad_row,
+            quad_col=self.quad_col,
+            quad_coeff=weights @ self.quad_coeffs,
+            linear_index=self.linear_index,
+            linear_coeff=weights @ self.linear_coeffs,
+            constant=float(weights @ self.ising_constants),
+            num_spins=self.num_spins,
+        )
@@ -0,0 +1,33 @@
+"""
+This module provides a backend-neutral intermediate representation of Pauli operators.
+The encoders build a Hamiltonian into `PauliIR` once, and the backends export it.
+"""
+
+from .pauli_ir import PauliCode, PauliIR
+from .encoding import (
+    color_group_to_qrac_encode,
+    encode_ising_pauli_ir,
+    encoding_to_arrays,
+    ising_to_pauli_ir,
+    nonzero_ising_terms,
+    numbering_space_efficient_encode,
+    qrac21_encode_ising_ir,
+    qrac31_encode_ising_ir,
+    qrac32_encode_ising_ir,
+    qrac_space_efficient_encode_ising_ir,
+)
+
+__all__ = [
+    "PauliCode",
+    "PauliIR",
+    "color_group_to_qrac_encode",
+    "encode_ising_pauli_ir",
+    "encoding_to_arrays",
+    "ising_to_pauli_ir",
+    "nonzero_ising_terms",
+    "numbering_space_efficient_encode",
+    "qrac21_encode_ising_ir",
+    "qrac31_encode_ising_ir",
+    "qrac32_encode_ising_ir",
+    "qrac_space_efficient_encode_ising_ir",
+]
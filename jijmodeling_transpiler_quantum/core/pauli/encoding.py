@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import typing as typ
+
+import numpy as np
+
+from jijmodeling_transpiler_quantum.core.ising_qubo import IsingModel
+from jijmodeling_transpiler_quantum.core.ising_qubo.parametric import align_terms
+
+from .pauli_ir import _BITS_TO_CODE, PauliCode, PauliIR
+
+
+def color_group_to_qrac_encode(
+    color_group: dict[int, list[int]]
+) -> dict[int, tuple[int, PauliCode]]:
+    """QRAC encoding of a color group, as `color_group_to_qrac_encode` of the backends.
+
+    Args:
+        color_group (dict[int, list[int]]): key is color (qubit's index). value is list of bit's index.
+
+    Returns:
+        dict[int, tuple[int, PauliCode]]: key is bit's index. value is tuple of qubit's index and Pauli code.
+
+    Examples:
+        >>> color_group_to_qrac_encode({0: [0, 1, 2], 1: [3]})
+        {0: (0, <PauliCode.Z: 3>), 1: (0, <PauliCode.X: 1>), 2: (0, <PauliCode.Y: 2>), 3: (1, <PauliCode.Z: 3>)}
+
+    """
+    pauli_ope = [PauliCode.Z, PauliCode.X, PauliCode.Y]
+    return {
+        bit_index: (color, pauli_ope[ope_idx])
+        for color, group in color_group.items()
+        for ope_idx, bit_index in enumerate(group)
+    }
+
+
+def encoding_to_arrays(
+    encoded_ope: dict[int, tuple[int, typ.Any]], num_spins: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Qubit and Pauli code of each spin. The qubit of a spin which is not encoded is -1.
+
+    The kind of a spin may be a `PauliCode` or a `Pauli` of a backend, whose value is the code.
+    """
+    qubits = np.full(num_spins, -1, dtype=np.int64)
+    codes = np.zeros(num_spins, dtype=np.int64)
+    for index, (qubit, pauli_kind) in encoded_ope.items():
+        if index < num_spins:
+            qubits[index] = qubit
+            codes[index] = getattr(pauli_kind, "value", pauli_kind)
+    return qubits, codes
+
+
+def nonzero_ising_terms(
+    ising: IsingModel,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, float]:
+    """Nonzero linear terms and nonzero quadratic terms on two spins, in the order of `ising`.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, float]: linear index, linear coefficients,
+        rows, columns and coefficients of the quadratic terms, and the constant with the quadratic terms on one spin.
+    """
+    arrays = ising.to_arrays()
+    offset = ising.constant
+    quad = arrays.quad_coeff != 0.0
+    diagonal = quad & (arrays.quad_row == arrays.quad_col)
+    for coeff in arrays.quad_coeff[diagonal].tolist():
+        offset += coeff
+    quad &= ~diagonal
+    linear = arrays.linear_coeff != 0.0
+    return (
+        arrays.linear_index[linear],
+        arrays.linear_coeff[linear],
+        arrays.quad_row[quad],
+        arrays.quad_col[quad],
+        arrays.quad_coeff[quad],
+        offset,
+    )
+
+
+def _ising_term_spins(
+    linear_index: np.ndarray, quad_row: np.ndarray, quad_col: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Term and spin of each single-spin factor of the linear and then the quadratic terms."""
+    num_linear = len(linear_index)
+    terms = np.concatenate(
+        [np.arange(num_linear), num_linear + np.repeat(np.arange(len(quad_row)), 2)]
+    )
+    spins = np.concatenate(
+        [linear_index, np.stack([quad_row, quad_col], axis=1).reshape(-1)]
+    )
+    return terms, spins
+
+
+def _encoded_spins(
+    encoded_ope: dict[int, tuple[int, typ.Any]], spins: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    qubit_of, code_of = encoding_to_arrays(
+        encoded_ope, max(int(spins.max(initial=-1)) + 1, len(encoded_ope))
+    )
+    missing = spins[qubit_of[spins] < 0]
+    if len(missing):
+        raise KeyError(int(missing[0]))
+    return qubit_of, code_of
+
+
+def encode_ising_pauli_ir(
+    ising: IsingModel,
+    encoded_ope: dict[int, tuple[int, typ.Any]],
+    n_qubit: int,
+    linear_factor: float = 1.0,
+    quad_factor: float = 1.0,
+) -> tuple[PauliIR, float]:
+    """Replace each spin of `ising` by its encoded Pauli, and scale the linear and quadratic terms.
+
+    Args:
+        ising (IsingModel): Ising model.
+        encoded_ope (dict[int, tuple[int, typ.Any]]): qubit and Pauli kind of each spin.
+        n_qubit (int): the number of qubits.
+        linear_factor (float, optional): factor of the linear terms. Defaults to 1.0.
+        quad_factor (float, optional): factor of the quadratic terms. Defaults to 1.0.
+
+    Returns:
+        tuple[PauliIR, float]: Hamiltonian and constant term.
+    """
+    linear_index, linear_coeff, quad_row, quad_col, quad_coeff, offset = (
+        nonzero_ising_terms(ising)
+    )
+    terms, spins = _ising_term_spins(linear_index, quad_row, quad_col)
+    qubit_of, code_of = _encoded_spins(encoded_ope, spins)
+    coeffs = np.concatenate([linear_factor * linear_coeff, quad_factor * quad_coeff])
+    ir = PauliIR.from_terms(terms, qubit_of[spins], code_of[spins], coeffs, n_qubit)
+    return ir, offset
+
+
+def ising_to_pauli_ir(ising: IsingModel, n_qubit: int) -> tuple[PauliIR, float]:
+    """Ising Hamiltonian of `Z` and `ZZ` terms, where the spin i is the qubit i.
+
+    Args:
+        ising (IsingModel): Ising model.
+        n_qubit (int): the number of qubits.
+
+    Returns:
+        tuple[PauliIR, float]: Hamiltonian and constant term.
+
+    Examples:
+        >>> ising = IsingModel(quad={(0, 1): 2.0}, linear={1: -1.0}, constant=0.5)
+        >>> ir, offset = ising_to_pauli_ir(ising, 2)
+        >>> ir.indptr, ir.qubits, ir.coeffs, offset
+        (array([0, 1, 3]), array([1, 0, 1], dtype=int32), array([-1.,  2.]), 0.5)
+
+    """
+    linear_index, linear_coeff, quad_row, quad_col, quad_coeff, offset = (
+        nonzero_ising_terms(ising)
+    )
+    terms, spins = _ising_term_spins(linear_index, quad_row, quad_col)
+    codes = np.full(len(spins), PauliCode.Z)
+    coeffs = np.concatenate([linear_coeff, quad_coeff])
+    return PauliIR.from_terms(terms, spins, codes, coeffs, n_qubit), offset
+
+
+def qrac31_encode_ising_ir(
+    ising: IsingModel, color_group: dict[int, list[int]]
+) -> tuple[PauliIR, float, dict[int, tuple[int, PauliCode]]]:
+    encoded_ope = color_group_to_qrac_encode(color_group)
+    ir, offset = encode_ising_pauli_ir(
+        ising, encoded_ope, len(color_group), np.sqrt(3), 3
+    )
+    return ir, offset, encoded_ope
+
+
+def qrac21_encode_ising_ir(
+    ising: IsingModel, color_group: dict[int, list[int]]
+) -> tuple[PauliIR, float, dict[int, tuple[int, PauliCode]]]:
+    encoded_ope = color_group_to_qrac_encode(color_group)
+    ir, offset = encode_ising_pauli_ir(
+        ising, encoded_ope, len(color_group), np.sqrt(2), 2
+    )
+    return ir, offset, encoded_ope
+
+
+def numbering_space_efficient_encode(
+    ising: IsingModel,
+) -> dict[int, tuple[int, PauliCode]]:
+    """Space efficient encoding: the spins 2k and 2k + 1 are X and Y on the qubit k."""
+    max_quad_index = max(max(t) for t in ising.quad.keys())
+    max_linear_index = max(ising.linear.keys())
+    num_vars = max(max_quad_index, max_linear_index) + 1
+    pauli_ope = [PauliCode.X, PauliCode.Y]
+    return {i: (i // 2, pauli_ope[i % 2]) for i in range(num_vars)}
+
+
+def qrac_space_efficient_encode_ising_ir(
+    ising: IsingModel,
+) -> tuple[PauliIR, float, dict[int, tuple[int, PauliCode]]]:
+    encoded_ope = numbering_space_efficient_encode(ising)
+    n_qubit = max(t[0] for t in encoded_ope.values()) + 1
+
+    linear_index, linear_coeff, quad_row, quad_col, quad_coeff, offset = (
+        nonzero_ising_terms(ising)
+    )
+    qubit_of, code_of = encoding_to_arrays(encoded_ope, len(encoded_ope))
+
+    # A quadratic term on the two spins of one qubit is Z on the qubit, and the others are products of two Paulis.
+    num_linear = len(linear_index)
+    quad_terms = num_linear + np.arange(len(quad_coeff))
+    qubit_i, qubit_j = qubit_of[quad_row], qubit_of[quad_col]
+    same = qubit_i == qubit_j
+    pair = ~same
+    terms = np.concatenate(
+        [
+            np.arange(num_linear),
+            quad_terms[same],
+            np.repeat(quad_terms[pair], 2),
+        ]
+    )
+    qubits = np.concatenate(
+        [
+            qubit_of[linear_index],
+            qubit_i[same],
+            np.stack([qubit_i[pair], qubit_j[pair]], axis=1).reshape(-1),
+        ]
+    )
+    codes = np.concatenate(
+        [
+            code_of[linear_index],
+            np.full(np.count_nonzero(same), PauliCode.Z),
+            np.stack(
+                [code_of[quad_row[pair]], code_of[quad_col[pair]]], axis=1
+            ).reshape(-1),
+        ]
+    )
+    coeffs = np.concatenate(
+        [np.sqrt(3) * linear_coeff, np.where(same, np.sqrt(3), 3) * quad_coeff]
+    )
+    ir = PauliIR.from_terms(terms, qubits, codes, coeffs, n_qubit)
+    return ir, offset, encoded_ope
+
+
+# The three terms of the prime operator of each Pauli code for (3,2)-QRAC, as `create_pauli_prime_terms`.
+# A color uses the two qubits (2 * color, 2 * color + 1), and the bits of a local pattern are
+# Z on the first qubit, Z on the second qubit, X on the first qubit and X on the second qubit.
+# X' = 1/2 XX + 1/2 XZ + ZI, Y' = 1/2 IX + IZ + 1/2 YY and Z' = ZZ - 1/2 XI - 1/2 ZX,
+# where the first letter is the first qubit.
+PRIME_PATTERNS = np.array([[0, 0, 0], [12, 6, 1], [8, 2, 15], [3, 4, 9]])
+PRIME_COEFFS = np.array(
+    [[0.0, 0.0, 0.0], [0.5, 0.5, 1.0], [0.5, 1.0, 0.5], [1.0, -0.5, -0.5]]
+)
+# The 9 products of the prime operators of the codes i and j, indexed by (code_i, code_j, 3 * k_i + k_j).
+QUAD_PATTERNS_I = np.broadcast_to(
+    np.repeat(PRIME_PATTERNS, 3, axis=1)[:, None, :], (len(PauliCode) + 1,) * 2 + (9,)
+)
+QUAD_PATTERNS_J = np.broadcast_to(
+    np.tile(PRIME_PATTERNS, 3)[None, :, :], (len(PauliCode) + 1,) * 2 + (9,)
+)
+QUAD_COEFFS = (
+    PRIME_COEFFS[:, None, :, None] * PRIME_COEFFS[None, :, None, :]
+).reshape(len(PauliCode) + 1, len(PauliCode) + 1, 9)
+
+
+def qrac32_encode_ising_ir(
+    ising: IsingModel, color_group: dict[int, list[int]]
+) -> tuple[PauliIR, float, dict[int, tuple[int, PauliCode]]]:
+    encoded_ope = color_group_to_qrac_encode(color_group)
+
+    n_qubit = 2 * len(color_group)
+
+    linear_index, _, quad_row, quad_col, _, offset = nonzero_ising_terms(ising)
+    spins = np.concatenate([linear_index, quad_row, quad_col])
+    qubit_of, code_of = _encoded_spins(encoded_ope, spins)
+
+    # Each term is the local patterns on at most two colors, (color_a, pattern_a, color_b, pattern_b),
+    # so that the terms are merged without the Paulis of all the qubits.
+    # A linear term is a prime operator of 3 terms, and a quadratic term is a product of 9 terms.
+    color = qubit_of[linear_index]
+    code = code_of[linear_index]
+    linear_keys = np.stack(
+        [
+            np.repeat(color, 3),
+            PRIME_PATTERNS[code].reshape(-1),
+            np.full(3 * len(color), -1),
+            np.zeros(3 * len(color), dtype=np.int64),
+        ],
+        axis=1,
+    )
+    linear_coeffs = PRIME_COEFFS[code].reshape(-1)
+
+    color_i, color_j = qubit_of[quad_row], qubit_of[quad_col]
+    code_i, code_j = code_of[quad_row], code_of[quad_col]
+    pattern_i = QUAD_PATTERNS_I[code_i, code_j].reshape(-1)
+    pattern_j = QUAD_PATTERNS_J[code_i, code_j].reshape(-1)
+    color_i, color_j = np.repeat(color_i, 9), np.repeat(color_j, 9)
+    same = color_i == color_j
+    first_i = color_i < color_j
+    quad_keys = np.stack(
+        [
+            np.where(first_i | same, color_i, color_j),
+            np.where(
+                same, pattern_i | pattern_j, np.where(first_i, pattern_i, pattern_j)
+            ),
+            np.where(same, -1, np.where(first_i, color_j, color_i)),
+            np.where(same, 0, np.where(first_i, pattern_j, pattern_i)),
+        ],
+        axis=1,
+    )
+    quad_coeffs = QUAD_COEFFS[code_i, code_j].reshape(-1)
+
+    # Equal terms are merged in the order of their first appearance as `simplify(atol=0)`.
+    keys = np.concatenate([linear_keys, quad_keys])
+    if len(keys) == 0:
+        return PauliIR.empty(n_qubit), offset, encoded_ope
+    _, inverse = np.unique(keys, axis=0, return_inverse=True)
+    first, merged = align_terms(
+        [inverse.reshape(-1)], [np.concatenate([linear_coeffs, quad_coeffs])]
+    )
+    merged = merged[0]
+    nonzero = merged != 0
+    keys = keys[first[nonzero]]
+
+    # The qubits of the terms are increasing since color_a < color_b.
+    qubits = np.stack(
+        [2 * keys[:, 0], 2 * keys[:, 0] + 1, 2 * keys[:, 2], 2 * keys[:, 2] + 1],
+        axis=1,
+    )
+    pattern_a, pattern_b = keys[:, 1], keys[:, 3]
+    bits = np.stack(
+        [
+            (pattern_a & 1) | (pattern_a >> 1 & 2),
+            (pattern_a >> 1 & 1) | (pattern_a >> 2 & 2),
+            (pattern_b & 1) | (pattern_b >> 1 & 2),
+            (pattern_b >> 1 & 1) | (pattern_b >> 2 & 2),
+        ],
+        axis=1,
+    )
+    used = bits != 0
+    ir = PauliIR(
+        num_qubits=n_qubit,
+        indptr=np.r_[0, np.cumsum(used.sum(axis=1))],
+        qubits=qubits[used].astype(np.int32),
+        codes=_BITS_TO_CODE[bits[used]],
+        coeffs=merged[nonzero],
+    )
+    return ir, offset, encoded_ope
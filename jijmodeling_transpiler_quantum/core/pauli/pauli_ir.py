@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import dataclasses
+import enum
+
+import numpy as np
+
+from jijmodeling_transpiler_quantum.core.ising_qubo.parametric import align_terms
+
+
+class PauliCode(enum.IntEnum):
+    """Code of a single-qubit Pauli in `PauliIR`.
+
+    The values are those of the `Pauli` enums of the backends and of the Pauli IDs of quri-parts.
+    """
+
+    X = 1
+    Y = 2
+    Z = 3
+
+
+# Bits of each code (Z is 1 and X is 2), and the code of each bits.
+_CODE_TO_BITS = np.array([0, 2, 3, 1], dtype=np.int8)
+_BITS_TO_CODE = np.array([0, PauliCode.Z, PauliCode.X, PauliCode.Y], dtype=np.int8)
+
+
+@dataclasses.dataclass
+class PauliIR:
+    """Backend-neutral Pauli operator: a sum of Pauli strings with real coefficients.
+
+    The Pauli strings are stored in the CSR layout. The term t acts by the Paulis `codes[indptr[t]:indptr[t + 1]]`
+    on the qubits `qubits[indptr[t]:indptr[t + 1]]`, which are increasing, and its coefficient is `coeffs[t]`.
+    A term without qubits is the identity.
+    An encoder builds an operator into this form once, and `pauli_ir_to_sparse_pauli_op` of the qiskit backend
+    and `pauli_ir_to_operator` of the quri-parts backend export it.
+
+    Examples:
+        >>> ir = PauliIR.from_terms(
+        ...     np.array([0, 1, 1, 2]),
+        ...     np.array([0, 0, 1, 0]),
+        ...     np.array([PauliCode.X, PauliCode.X, PauliCode.Y, PauliCode.X]),
+        ...     np.array([1.0, 2.0, 3.0]),
+        ...     2,
+        ... )
+        >>> ir.indptr, ir.qubits, ir.codes, ir.coeffs
+        (array([0, 1, 3]), array([0, 0, 1], dtype=int32), array([1, 1, 2], dtype=int8), array([4., 2.]))
+
+    """
+
+    num_qubits: int
+    indptr: np.ndarray
+    qubits: np.ndarray
+    codes: np.ndarray
+    coeffs: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.coeffs)
+
+    @classmethod
+    def empty(cls, num_qubits: int) -> PauliIR:
+        """Operator without terms."""
+        return cls(
+            num_qubits=num_qubits,
+            indptr=np.zeros(1, dtype=np.int64),
+            qubits=np.zeros(0, dtype=np.int32),
+            codes=np.zeros(0, dtype=np.int8),
+            coeffs=np.zeros(0, dtype=np.float64),
+        )
+
+    @classmethod
+    def from_terms(
+        cls,
+        terms: np.ndarray,
+        qubits: np.ndarray,
+        codes: np.ndarray,
+        coeffs: np.ndarray,
+        num_qubits: int,
+    ) -> PauliIR:
+        """Build an operator from single-qubit Paulis.
+
+        The k-th single-qubit Pauli `codes[k]` acts on the qubit `qubits[k]` in the term `terms[k]`,
+        and `coeffs[t]` is the coefficient of the term t.
+        The Paulis of a term on the same qubit are combined by the union of their Z and X bits,
+        as the symplectic matrices of qiskit (X and Z are Y).
+        As `simplify(atol=0)` of qiskit, equal terms are merged in the order of their first appearance,
+        and the terms whose coefficients are zeros are removed.
+
+        Args:
+            terms (np.ndarray): term of each single-qubit Pauli.
+            qubits (np.ndarray): qubit of each single-qubit Pauli.
+            codes (np.ndarray): code of each single-qubit Pauli.
+            coeffs (np.ndarray): coefficient of each term.
+            num_qubits (int): the number of qubits.
+
+        Returns:
+            PauliIR: merged operator.
+        """
+        terms = np.asarray(terms, dtype=np.int64)
+        qubits = np.asarray(qubits, dtype=np.int64)
+        coeffs = np.asarray(coeffs, dtype=np.float64)
+        num_terms = len(coeffs)
+        if num_terms == 0:
+            return cls.empty(num_qubits)
+
+        # Sort the Paulis by the term and the qubit, and take the union of the bits on each qubit.
+        order = np.lexsort((qubits, terms))
+        terms, qubits = terms[order], qubits[order]
+        bits = _CODE_TO_BITS[np.asarray(codes, dtype=np.int64)[order]]
+        if len(terms):
+            start = np.flatnonzero(
+                np.r_[True, (terms[1:] != terms[:-1]) | (qubits[1:] != qubits[:-1])]
+            )
+            bits = np.bitwise_or.reduceat(bits, start)
+            terms, qubits = terms[start], qubits[start]
+
+        weights = np.bincount(terms, minlength=num_terms)
+        indptr = np.r_[0, np.cumsum(weights)]
+        # A term is identified by its row of `4 * qubit + bits + 1` padded with 0.
+        width = weights.max()
+        base = 4 * (int(qubits.max(initial=0)) + 1) + 1
+        rows = np.zeros((num_terms, width), dtype=np.int64)
+        rows[terms, np.arange(len(terms)) - indptr[terms]] = 4 * qubits + bits + 1
+        if width * np.log2(base) < 62:
+            # The row is a number in base `base`, so that the terms are merged by one sort of integers.
+            keys = rows @ base ** np.arange(width - 1, -1, -1, dtype=np.int64)
+        else:
+            _, keys = np.unique(rows, axis=0, return_inverse=True)
+        first, merged = align_terms([keys.reshape(-1)], [coeffs])
+        merged = merged[0]
+        nonzero = merged != 0
+        kept = first[nonzero]
+
+        kept_weights = weights[kept]
+        kept_indptr = np.r_[0, np.cumsum(kept_weights)]
+        entries = np.repeat(indptr[kept] - kept_indptr[:-1], kept_weights) + np.arange(
+            kept_indptr[-1]
+        )
+        return cls(
+            num_qubits=num_qubits,
+            indptr=kept_indptr,
+            qubits=qubits[entries].astype(np.int32),
+            codes=_BITS_TO_CODE[bits[entries]],
+            coeffs=merged[nonzero],
+        )
+
+    def to_symplectic(self) -> tuple[np.ndarray, np.ndarray]:
+        """Dense Z and X matrices of the terms, whose shapes are (the number of terms, `num_qubits`)."""
+        rows = np.repeat(np.arange(len(self)), np.diff(self.indptr))
+        bits = _CODE_TO_BITS[self.codes]
+        z = np.zeros((len(self), self.num_qubits), dtype=bool)
+        x = np.zeros((len(self), self.num_qubits), dtype=bool)
+        z[rows, self.qubits] = bits & 1 == 1
+        x[rows, self.qubits] = bits & 2 == 2
+        return z, x
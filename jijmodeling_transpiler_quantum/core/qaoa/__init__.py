@@ -0,0 +1,18 @@
+"""
+This module provides backend-neutral tools for QAOA of Ising cost Hamiltonians.
+"""
+
+from .diagonal_simulator import DiagonalQAOASimulator, ising_energy_diagonal
+from .lightcone import Lightcone, LightconeQAOAEngine
+from .p1_expectation import P1ExpectationEvaluator
+from .rqaoa import RQAOAResult, rqaoa
+
+__all__ = [
+    "DiagonalQAOASimulator",
+    "Lightcone",
+    "LightconeQAOAEngine",
+    "P1ExpectationEvaluator",
+    "RQAOAResult",
+    "ising_energy_diagonal",
+    "rqaoa",
+]
@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import concurrent.futures
+import os
+import typing as typ
+
+import numpy as np
+
+from jijmodeling_transpiler_quantum.core.ising_qubo import IsingArrays, IsingModel
+
+
+def _ising_fields(
+    arrays: IsingArrays, num_qubits: int
+) -> tuple[np.ndarray, np.ndarray, float]:
+    """Linear coefficients, strictly lower triangular couplings and the constant with the terms on one spin."""
+    linear = np.zeros(num_qubits)
+    np.add.at(linear, arrays.linear_index, arrays.linear_coeff)
+    off_diagonal = arrays.quad_row != arrays.quad_col
+    row, col = arrays.quad_row[off_diagonal], arrays.quad_col[off_diagonal]
+    couplings = np.zeros((num_qubits, num_qubits))
+    np.add.at(
+        couplings,
+        (np.maximum(row, col), np.minimum(row, col)),
+        arrays.quad_coeff[off_diagonal],
+    )
+    constant = float(arrays.constant + arrays.quad_coeff[~off_diagonal].sum())
+    return linear, couplings, constant
+
+
+def _spin_sum(constant: float, coeffs: np.ndarray) -> np.ndarray:
+    """`constant + sum_j coeffs[j] * z_j` for all the basis states of `len(coeffs)` qubits."""
+    values = np.full(1, constant)
+    for coeff in coeffs:
+        values = np.concatenate([values + coeff, values - coeff])
+    return values
+
+
+def ising_energy_diagonal(
+    ising: typ.Union[IsingModel, IsingArrays], num_qubits: typ.Optional[int] = None
+) -> np.ndarray:
+    """Energy of every computational basis state, which is the diagonal of the Ising Hamiltonian.
+
+    The bit k of the index of a basis state is the qubit k, and the spin of the bit 0 is +1 (the eigenvalue of Z).
+    The diagonal is built qubit by qubit: the energies of the qubits 0, ..., k are those of the qubits 0, ..., k - 1
+    plus and minus the local field on the qubit k, so that it costs O(2^n) whatever the number of terms is.
+
+    Args:
+        ising (typ.Union[IsingModel, IsingArrays]): Ising model.
+        num_qubits (typ.Optional[int], optional): the number of qubits. Defaults to the number of spins.
+
+    Returns:
+        np.ndarray: energies whose shape is (2^num_qubits,).
+
+    Examples:
+        >>> ising_energy_diagonal(IsingModel({(0, 1): 2.0}, {0: 4.0, 1: 5.0}, 6.0))
+        array([17.,  5.,  3., -1.])
+
+    """
+    if isinstance(ising, IsingModel):
+        ising = ising.to_arrays()
+    num_qubits = ising.num_spins if num_qubits is None else num_qubits
+    linear, couplings, constant = _ising_fields(ising, num_qubits)
+    energies = np.full(1, constant)
+    for k in range(num_qubits):
+        field = _spin_sum(linear[k], couplings[k, :k])
+        energies = np.concatenate([energies + field, energies - field])
+    return energies
+
+
+def _rotate_x(a: np.ndarray, b: np.ndarray, cos: complex, sin: complex):
+    """Apply `cos * I + sin * X` in place to the pairs of amplitudes (a, b)."""
+    sin_a = a * sin
+    a *= cos
+    a += b * sin
+    b *= cos
+    b += sin_a
+
+
+class DiagonalQAOASimulator:
+    """Statevector simulator of QAOA for an Ising cost Hamiltonian.
+
+    The cost Hamiltonian is diagonal, so its energies are computed once by `ising_energy_diagonal`,
+    and a cost layer `exp(-i gamma H)` is an elementwise phase.
+    A mixer layer `exp(-i beta sum_k X_k)` is a butterfly on the pairs of amplitudes of each qubit.
+    The butterflies of the qubits inside a block of `chunk_size` amplitudes are applied block by block,
+    and all the kernels run on `num_workers` threads over chunks of the statevector, because NumPy releases the GIL.
+
+    The state is `prod_l exp(-i betas[l] sum_k X_k) exp(-i gammas[l] H) |+>^n`,
+    which is `QAOAAnsatz` of qiskit and the ansatz of `QAOAAnsatzBuilder.get_qaoa_ansatz` of quri-parts.
+    The bit k of the index of a basis state is the qubit k.
+
+    Examples:
+        >>> ising = IsingModel({(0, 1): 1.0}, {}, 0.0)
+        >>> simulator = DiagonalQAOASimulator(ising)
+        >>> simulator.expectation([0.0], [0.0])
+        0.0
+        >>> round(simulator.expectation([-np.pi / 8], [np.pi / 8]), 6)
+        -0.707107
+        >>> [bits for bits, _ in simulator.top_k([-np.pi / 8], [np.pi / 8], 2)]
+        ['10', '01']
+
+    """
+
+    def __init__(
+        self,
+        ising: typ.Union[IsingModel, IsingArrays],
+        num_qubits: typ.Optional[int] = None,
+        offset: float = 0.0,
+        dtype: typ.Union[type, np.dtype] = np.complex128,
+        num_workers: typ.Optional[int] = None,
+        chunk_size: int = 1 << 16,
+    ):
+        """Compute the energies of the basis states.
+
+        Args:
+            ising (typ.Union[IsingModel, IsingArrays]): Ising model of the cost Hamiltonian.
+            num_qubits (typ.Optional[int], optional): the number of qubits. Defaults to the number of spins.
+            offset (float, optional): constant added to the energies, such as the constant of the QUBO. Defaults to 0.0.
+            dtype (typ.Union[type, np.dtype], optional): np.complex128 or np.complex64 for the statevector. Defaults to np.complex128.
+            num_workers (typ.Optional[int], optional): the number of threads. Defaults to `os.cpu_count()`.
+            chunk_size (int, optional): the number of amplitudes in a chunk. Defaults to 65536.
+        """
+        if isinstance(ising, IsingModel):
+            ising = ising.to_arrays()
+        self.num_qubits = ising.num_spins if num_qubits is None else num_qubits
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.complex64, np.complex128):
+            raise ValueError(f"dtype must be complex64 or complex128, not {self.dtype}.")
+        self.real_dtype = np.finfo(self.dtype).dtype
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.chunk_size = 1 << max(int(chunk_size).bit_length() - 1, 0)
+
+        energies = ising_energy_diagonal(ising, self.num_qubits)
+        # The phases are computed without the constant, which is only a global phase.
+        self.constant = float(energies[0]) + offset
+        self.diagonal = (energies - energies[0]).astype(self.real_dtype)
+
+    @property
+    def energies(self) -> np.ndarray:
+        """Energy of every basis state including the constant."""
+        return self.diagonal.astype(np.float64) + self.constant
+
+    def _run(
+        self,
+        executor: typ.Optional[concurrent.futures.Executor],
+        kernel: typ.Callable,
+        tasks: list,
+    ) -> list:
+        if executor is None or len(tasks) == 1:
+            return [kernel(*task) for task in tasks]
+        return list(executor.map(kernel, *zip(*tasks)))
+
+    def _chunks(self) -> list[tuple[int, int]]:
+        size = 1 << self.num_qubits
+        return [
+            (start, min(start + self.chunk_size, size))
+            for start in range(0, size, self.chunk_size)
+        ]
+
+    def _apply_cost(self, state, gamma, executor):
+        def kernel(start, stop):
+            state[start:stop] *= np.exp((-1j * gamma) * self.diagonal[start:stop])
+
+        self._run(executor, kernel, self._chunks())
+
+    def _map_pairs(self, executor, kernel, *states) -> list:
+        """Run `kernel(lower, upper)` on the amplitude pairs of every qubit.
+
+        `lower` and `upper` are the lists of the views of `states` whose bits of the qubit are 0 and 1.
+        The qubits inside a chunk are processed chunk by chunk, and the other qubits one by one.
+        """
+        num_local = min(self.num_qubits, self.chunk_size.bit_length() - 1)
+        block = 1 << num_local
+
+        def local_kernel(start, stop):
+            results = []
+            for k in range(num_local):
+                views = [state[start:stop].reshape(-1, 2, 1 << k) for state in states]
+                results.append(
+                    kernel([v[:, 0, :] for v in views], [v[:, 1, :] for v in views])
+                )
+            return results
+
+        results = [
+            result
+            for chunk_results in self._run(executor, local_kernel, self._chunks())
+            for result in chunk_results
+        ]
+        for k in range(num_local, self.num_qubits):
+            views = [state.reshape(-1, 2, 1 << k) for state in states]
+
+            def pair_kernel(outer, start):
+                return kernel(
+                    [v[outer, 0, start : start + block] for v in views],
+                    [v[outer, 1, start : start + block] for v in views],
+                )
+
+            tasks = [
+                (outer, start)
+                for outer in range(views[0].shape[0])
+                for start in range(0, 1 << k, block)
+            ]
+            results += self._run(executor, pair_kernel, tasks)
+        return results
+
+    def _apply_mixer(self, state, beta, executor):
+        cos = self.dtype.type(np.cos(beta))
+        sin = self.dtype.type(-1j * np.sin(beta))
+        self._map_pairs(
+            executor,
+            lambda lower, upper: _rotate_x(lower[0], upper[0], cos, sin),
+            state,
+        )
+
+    def _mixer_overlap(self, bra, ket, executor) -> complex:
+        """`<bra| sum_k X_k |ket>`."""
+        return sum(
+            self._map_pairs(
+                executor,
+                lambda lower, upper: complex(
+                    np.vdot(lower[0], upper[1]) + np.vdot(upper[0], lower[1])
+                ),
+                bra,
+                ket,
+            )
+        )
+
+    def _cost_overlap(self, bra, ket, executor) -> complex:
+        """`<bra| H |ket>` without the constant."""
+
+        def kernel(start, stop):
+            return complex(
+                np.vdot(bra[start:stop], self.diagonal[start:stop] * ket[start:stop])
+            )
+
+        return sum(self._run(executor, kernel, self._chunks()))
+
+    def _executor(self) -> typ.Optional[concurrent.futures.ThreadPoolExecutor]:
+        if self.num_workers > 1 and (1 << self.num_qubits) > self.chunk_size:
+            return concurrent.futures.ThreadPoolExecutor(self.num_workers)
+        return None
+
+    def _evolve(self, gammas, betas, executor) -> np.ndarray:
+        if len(gammas) != len(betas):
+            raise ValueError("gammas and betas must have the same length.")
+        size = 1 << self.num_qubits
+        state = np.full(size, 1 / np.sqrt(size), dtype=self.dtype)
+        for gamma, beta in zip(gammas, betas):
+            self._apply_cost(state, float(gamma), executor)
+            self._apply_mixer(state, float(beta), executor)
+        return state
+
+    def statevector(
+        self, gammas: typ.Sequence[float], betas: typ.Sequence[float]
+    ) -> np.ndarray:
+        """QAOA state for the parameters of the cost and mixer layers.
+
+        Args:
+            gammas (typ.Sequence[float]): parameters of the cost layers.
+            betas (typ.Sequence[float]): parameters of the mixer layers.
+
+        Returns:
+            np.ndarray: statevector whose shape is (2^num_qubits,).
+        """
+        executor = self._executor()
+        try:
+            return self._evolve(gammas, betas, executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def probabilities(
+        self, gammas: typ.Sequence[float], betas: typ.Sequence[float]
+    ) -> np.ndarray:
+        """Probability of every basis state, whose index has the qubit k in the bit k."""
+        state = self.statevector(gammas, betas)
+        return state.real**2 + state.imag**2
+
+    def expectation(
+        self, gammas: typ.Sequence[float], betas: typ.Sequence[float]
+    ) -> float:
+        """Expectation of the energy including the constant."""
+        probabilities = self.probabilities(gammas, betas)
+        # The products are summed chunk by chunk in float64.
+        value = sum(
+            float(np.dot(probabilities[start:stop], self.diagonal[start:stop]))
+            for start, stop in self._chunks()
+        )
+        return value + self.constant
+
+    def top_k(
+        self, gammas: typ.Sequence[float], betas: typ.Sequence[float], k: int
+    ) -> list[tuple[str, float]]:
+        """The k most probable bitstrings and their probabilities.
+
+        The k-th character of a bitstring is the qubit k, as the keys of `decode_from_counts`.
+        Equal probabilities are ordered by the index of the basis state.
+        """
+        probabilities = self.probabilities(gammas, betas)
+        k = min(k, len(probabilities))
+        candidates = np.argpartition(-probabilities, k - 1)[:k] if k > 0 else []
+        candidates = np.asarray(candidates, dtype=np.int64)
+        order = np.lexsort((candidates, -probabilities[candidates]))
+        return [
+            (format(index, f"0{self.num_qubits}b")[::-1], float(probabilities[index]))
+            for index in candidates[order].tolist()
+        ]
+
+    def value_and_grad(
+        self, gammas: typ.Sequence[float], betas: typ.Sequence[float]
+    ) -> tuple[float, np.ndarray, np.ndarray]:
+        """Expectation of the energy and its gradient by the adjoint method.
+
+        After the forward evolution, the layers are undone one by one on the state and on `H |state>`,
+        and the derivative of each parameter is the overlap of the two vectors with the generator of its layer,
+        so that the whole gradient costs about three evolutions instead of 2p by finite differences.
+
+        Args:
+            gammas (typ.Sequence[float]): parameters of the cost layers.
+            betas (typ.Sequence[float]): parameters of the mixer layers.
+
+        Returns:
+            tuple[float, np.ndarray, np.ndarray]: the expectation including the constant,
+            and the derivatives by `gammas` and `betas`.
+
+        Examples:
+            >>> simulator = DiagonalQAOASimulator(IsingModel({(0, 1): 1.0}, {}, 0.0))
+            >>> value, grad_gammas, grad_betas = simulator.value_and_grad([-np.pi / 8], [np.pi / 8])
+            >>> round(value, 6), grad_gammas.round(6), grad_betas.round(6)
+            (-0.707107, array([1.414214]), array([0.]))
+
+        """
+        executor = self._executor()
+        try:
+            state = self._evolve(gammas, betas, executor)
+            adjoint = self.diagonal * state
+            value = self._cost_overlap(state, state, executor).real + self.constant
+            grad_gammas = np.zeros(len(gammas))
+            grad_betas = np.zeros(len(betas))
+            # d<H>/dt = 2 Im <H state| G state> for a layer exp(-i t G).
+            for layer in reversed(range(len(gammas))):
+                grad_betas[layer] = 2 * self._mixer_overlap(adjoint, state, executor).imag
+                self._apply_mixer(state, -float(betas[layer]), executor)
+                self._apply_mixer(adjoint, -float(betas[layer]), executor)
+                grad_gammas[layer] = 2 * self._cost_overlap(adjoint, state, executor).imag
+                self._apply_cost(state, -float(gammas[layer]), executor)
+                self._apply_cost(adjoint, -float(gammas[layer]), executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return value, grad_gammas, grad_betas
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import concurrent.futures
+import dataclasses
+import typing as typ
+
+import numpy as np
+
+from jijmodeling_transpiler_quantum.core.ising_qubo import IsingArrays, IsingModel
+
+from .diagonal_simulator import DiagonalQAOASimulator
+
+
+@dataclasses.dataclass(frozen=True)
+class Lightcone:
+    """Subproblem of the reverse lightcone of one term of the Ising Hamiltonian.
+
+    The spins are relabelled to 0, ..., `num_spins` - 1, and `observable` are the spins of the term.
+    """
+
+    num_spins: int
+    observable: tuple[int, ...]
+    linear: tuple[float, ...]
+    quad: tuple[tuple[int, int, float], ...]
+
+    def to_arrays(self) -> IsingArrays:
+        quad = np.array(self.quad, dtype=np.float64).reshape(-1, 3)
+        return IsingArrays(
+            quad_row=quad[:, 0].astype(np.int64),
+            quad_col=quad[:, 1].astype(np.int64),
+            quad_coeff=quad[:, 2],
+            linear_index=np.arange(self.num_spins),
+            linear_coeff=np.array(self.linear, dtype=np.float64),
+            constant=0.0,
+            num_spins=self.num_spins,
+        )
+
+    def expectation(
+        self, gammas: typ.Sequence[float], betas: typ.Sequence[float]
+    ) -> float:
+        """Expectation of the product of Z on `observable` in the QAOA state of the subproblem."""
+        simulator = DiagonalQAOASimulator(
+            self.to_arrays(), self.num_spins, num_workers=1
+        )
+        probabilities = simulator.probabilities(gammas, betas)
+        bits = np.zeros(len(probabilities), dtype=np.int64)
+        indices = np.arange(len(probabilities))
+        for spin in self.observable:
+            bits ^= (indices >> spin) & 1
+        return float(np.dot(probabilities, 1 - 2 * bits))
+
+
+def _lightcone_expectations(
+    lightcones: list[Lightcone], gammas: list[float], betas: list[float]
+) -> list[float]:
+    return [lightcone.expectation(gammas, betas) for lightcone in lightcones]
+
+
+class LightconeQAOAEngine:
+    """QAOA energy computed term by term on the reverse lightcones.
+
+    In the state `prod_l exp(-i betas[l] sum_k X_k) exp(-i gammas[l] H) |+>^n` with p layers,
+    the expectation of `Z_i` or `Z_i Z_j` depends only on the gates in its reverse lightcone,
+    which are in the subgraph of the spins within p hops of i and j.
+    The engine simulates the subproblem of each term by `DiagonalQAOASimulator` on those spins,
+    so that the cost depends on the size of the lightcones and not on the number of spins.
+
+    The subproblems are relabelled by a colour refinement (the Weisfeiler-Lehman hashing)
+    of the fields, the couplings and the observed spins with individualisation of tied spins,
+    and those with the same relabelled terms are simulated once.
+    The unique subproblems are simulated in a process pool when `n_jobs` is larger than one.
+
+    Examples:
+        >>> ring = IsingModel({(k, (k + 1) % 100): 1.0 for k in range(100)}, {}, 0.0)
+        >>> engine = LightconeQAOAEngine(ring, p=2)
+        >>> len(engine.lightcones)
+        1
+        >>> round(engine.expectation([-np.pi / 8, 0.2], [np.pi / 8, 0.3]), 6)
+        -6.46004
+
+    """
+
+    def __init__(
+        self,
+        ising: typ.Union[IsingModel, IsingArrays],
+        p: int,
+        num_spins: typ.Optional[int] = None,
+        offset: float = 0.0,
+        max_qubits: int = 20,
+        n_jobs: typ.Optional[int] = None,
+    ):
+        """Build and deduplicate the lightcones of the terms.
+
+        Args:
+            ising (typ.Union[IsingModel, IsingArrays]): Ising model of the cost Hamiltonian.
+            p (int): the number of layers.
+            num_spins (typ.Optional[int], optional): the number of spins. Defaults to that of the model.
+            offset (float, optional): constant added to the energy, such as the constant of the QUBO. Defaults to 0.0.
+            max_qubits (int, optional): the maximum number of spins in a lightcone. Defaults to 20.
+            n_jobs (typ.Optional[int], optional): the number of processes. Defaults to None.
+
+        Raises:
+            ValueError: if a lightcone has more than `max_qubits` spins.
+        """
+        if isinstance(ising, IsingModel):
+            ising = ising.to_arrays()
+        n = ising.num_spins if num_spins is None else num_spins
+        self.p = p
+        self.n_jobs = n_jobs
+
+        linear = np.zeros(n)
+        np.add.at(linear, ising.linear_index, ising.linear_coeff)
+        off_diagonal = ising.quad_row != ising.quad_col
+        self.constant = float(
+            ising.constant + ising.quad_coeff[~off_diagonal].sum() + offset
+        )
+        indptr, indices, data = dataclasses.replace(ising, num_spins=n).to_csr()
+        neighbours: list[dict[int, float]] = [
+            {
+                int(k): float(value)
+                for k, value in zip(indices[start:stop], data[start:stop])
+                if value != 0
+            }
+            for start, stop in zip(indptr[:-1], indptr[1:])
+        ]
+
+        terms = [((i,), h) for i, h in enumerate(linear.tolist()) if h != 0]
+        terms += [
+            ((i, j), coupling)
+            for i in range(n)
+            for j, coupling in neighbours[i].items()
+            if i < j
+        ]
+        lightcone_index: dict[Lightcone, int] = {}
+        self.lightcones: list[Lightcone] = []
+        weights: list[float] = []
+        for observable, coeff in terms:
+            lightcone = self._lightcone(observable, linear, neighbours, max_qubits)
+            index = lightcone_index.setdefault(lightcone, len(self.lightcones))
+            if index == len(self.lightcones):
+                self.lightcones.append(lightcone)
+                weights.append(0.0)
+            weights[index] += coeff
+        self.weights = np.array(weights)
+
+    def _lightcone(
+        self,
+        observable: tuple[int, ...],
+        linear: np.ndarray,
+        neighbours: list[dict[int, float]],
+        max_qubits: int,
+    ) -> Lightcone:
+        spins = set(observable)
+        frontier = set(observable)
+        for _ in range(self.p):
+            frontier = {k for i in frontier for k in neighbours[i]} - spins
+            spins |= frontier
+        if len(spins) > max_qubits:
+            raise ValueError(
+                f"The lightcone of {observable} has {len(spins)} spins, "
+                f"more than {max_qubits}."
+            )
+
+        def refine(signatures: dict[int, typ.Hashable]) -> dict[int, int]:
+            """Colours refined by the colours and the couplings of the neighbours until they are stable."""
+            colour: dict[int, int] = {}
+            num_colours = 0
+            while True:
+                classes = sorted(set(signatures.values()))
+                if len(classes) == num_colours:
+                    return colour
+                index = {signature: c for c, signature in enumerate(classes)}
+                colour = {i: index[sig] for i, sig in signatures.items()}
+                num_colours = len(classes)
+                signatures = {
+                    i: (
+                        colour[i],
+                        tuple(
+                            sorted(
+                                (coupling, colour[k])
+                                for k, coupling in neighbours[i].items()
+                                if k in spins
+                            )
+                        ),
+                    )
+                    for i in spins
+                }
+
+        # Individualise the first spin of the first tied colour and refine again until all colours differ.
+        # Automorphic choices give the same order, and other choices may only miss some equal subproblems.
+        colour = refine({i: (i not in observable, float(linear[i])) for i in spins})
+        while len(set(colour.values())) < len(spins):
+            sizes = np.bincount(list(colour.values()))
+            tied = int(np.flatnonzero(sizes > 1)[0])
+            chosen = min(i for i in spins if colour[i] == tied)
+            colour = refine({i: (colour[i], i != chosen) for i in spins})
+        order = sorted(spins, key=colour.__getitem__)
+        position = {i: k for k, i in enumerate(order)}
+        quad = sorted(
+            (min(position[i], position[k]), max(position[i], position[k]), coupling)
+            for i in order
+            for k, coupling in neighbours[i].items()
+            if k in spins and i < k
+        )
+        return Lightcone(
+            num_spins=len(order),
+            observable=tuple(sorted(position[i] for i in observable)),
+            linear=tuple(float(linear[i]) for i in order),
+            quad=tuple(quad),
+        )
+
+    def term_expectations(
+        self, gammas: typ.Sequence[float], betas: typ.Sequence[float]
+    ) -> np.ndarray:
+        """Expectation of the observable of each lightcone in `lightcones`."""
+        gammas = [float(gamma) for gamma in gammas]
+        betas = [float(beta) for beta in betas]
+        if len(gammas) != self.p or len(betas) != self.p:
+            raise ValueError(f"gammas and betas must have {self.p} parameters.")
+        if self.n_jobs is not None and self.n_jobs > 1 and len(self.lightcones) > 1:
+            num_chunks = min(len(self.lightcones), 4 * self.n_jobs)
+            chunks = [self.lightcones[k::num_chunks] for k in range(num_chunks)]
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.n_jobs
+            ) as executor:
+                futures = [
+                    executor.submit(_lightcone_expectations, chunk, gammas, betas)
+                    for chunk in chunks
+                ]
+                values = np.zeros(len(self.lightcones))
+                for k, future in enumerate(futures):
+                    values[k::num_chunks] = future.result()
+            return values
+        return np.array(_lightcone_expectations(self.lightcones, gammas, betas))
+
+    def expectation(
+        self, gammas: typ.Sequence[float], betas: typ.Sequence[float]
+    ) -> float:
+        """Expectation of the energy including the constant.
+
+        Args:
+            gammas (typ.Sequence[float]): parameters of the cost layers.
+            betas (typ.Sequence[float]): parameters of the mixer layers.
+
+        Returns:
+            float: the energy.
+        """
+        values = self.term_expectations(gammas, betas)
+        return float(np.dot(self.weights, values)) + self.constant
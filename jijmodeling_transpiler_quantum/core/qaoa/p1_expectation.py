@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import typing as typ
+
+import numpy as np
+
+from jijmodeling_transpiler_quantum.core.ising_qubo import IsingArrays, IsingModel
+
+# Step of the complex-step derivative by gamma, which has no cancellation error.
+_COMPLEX_STEP = 1e-20
+# The maximum number of the cosines of the neighbourhoods computed at once.
+_MAX_BATCH_ENTRIES = 1 << 22
+
+
+def _segment_prod(values: np.ndarray, indptr: np.ndarray) -> np.ndarray:
+    """Products of `values[..., indptr[s]:indptr[s + 1]]` for each segment s, where empty products are 1."""
+    out = np.ones(values.shape[:-1] + (len(indptr) - 1,), dtype=values.dtype)
+    nonempty = indptr[:-1] < indptr[1:]
+    if nonempty.any():
+        out[..., nonempty] = np.multiply.reduceat(
+            values, indptr[:-1][nonempty], axis=-1
+        )
+    return out
+
+
+def _ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenation of `arange(start, start + count)`."""
+    offsets = np.repeat(starts - np.r_[0, np.cumsum(counts)[:-1]], counts)
+    return offsets + np.arange(counts.sum())
+
+
+class P1ExpectationEvaluator:
+    """Closed-form energy of QAOA with one layer.
+
+    For the Ising Hamiltonian `H = sum_u h_u Z_u + sum_{u<v} J_uv Z_u Z_v + constant`
+    and the state `exp(-i beta sum_k X_k) exp(-i gamma H) |+>^n`,
+
+    - `<Z_u> = sin(2 beta) sin(2 gamma h_u) prod_w cos(2 gamma J_uw)`,
+    - `<Z_u Z_v>` is a combination of `sin(4 beta)` and `sin(2 beta)^2` with products of cosines
+      over the neighbours of u and v,
+
+    as shown by Ozaeta, van Dam and McMahon (2022). Only the neighbourhoods of the spins are used,
+    so that it costs O(the number of edges x the degree) without any statevector.
+    The energy is `constant + sin(2 beta) A(gamma) + sin(4 beta) B(gamma) / 2 - sin(2 beta)^2 C(gamma) / 2`,
+    so that the energies on a grid of gamma and beta are an outer product.
+
+    The parameters are (gamma, beta), which are `[beta_0, gamma_0]` of `QAOAAnsatz` of qiskit
+    and `[gamma0, beta0]` of the ansatz of quri-parts for p=1.
+
+    Examples:
+        >>> evaluator = P1ExpectationEvaluator(IsingModel({(0, 1): 1.0}, {}, 0.0))
+        >>> round(evaluator.expectation(-np.pi / 8, np.pi / 8), 6)
+        -0.707107
+        >>> grid = np.linspace(-np.pi / 2, np.pi / 2, 33)
+        >>> gamma, beta, value = evaluator.grid_search(grid, grid / 2)
+        >>> round(gamma, 6), round(beta, 6), round(value, 6)
+        (-0.785398, 0.392699, -1.0)
+
+    """
+
+    def __init__(
+        self,
+        ising: typ.Union[IsingModel, IsingArrays],
+        num_spins: typ.Optional[int] = None,
+        offset: float = 0.0,
+    ):
+        """Build the neighbourhoods of the spins and of the edges.
+
+        Args:
+            ising (typ.Union[IsingModel, IsingArrays]): Ising model of the cost Hamiltonian.
+            num_spins (typ.Optional[int], optional): the number of spins. Defaults to that of the model.
+            offset (float, optional): constant added to the energy, such as the constant of the QUBO. Defaults to 0.0.
+        """
+        if isinstance(ising, IsingModel):
+            ising = ising.to_arrays()
+        n = ising.num_spins if num_spins is None else num_spins
+        self.num_spins = n
+        self.linear = np.zeros(n)
+        np.add.at(self.linear, ising.linear_index, ising.linear_coeff)
+        off_diagonal = ising.quad_row != ising.quad_col
+        # Z_u Z_u is the identity.
+        self.constant = float(
+            ising.constant + ising.quad_coeff[~off_diagonal].sum() + offset
+        )
+
+        row = ising.quad_row[off_diagonal].astype(np.int64)
+        col = ising.quad_col[off_diagonal].astype(np.int64)
+        keys, inverse = np.unique(
+            np.minimum(row, col) * n + np.maximum(row, col), return_inverse=True
+        )
+        coupling = np.bincount(
+            inverse.reshape(-1),
+            weights=ising.quad_coeff[off_diagonal],
+            minlength=len(keys),
+        )
+        nonzero = coupling != 0
+        self.edge_u, self.edge_v = keys[nonzero] // n, keys[nonzero] % n
+        self.coupling = coupling[nonzero]
+
+        # Symmetric adjacency in the CSR layout.
+        source = np.r_[self.edge_u, self.edge_v]
+        target = np.r_[self.edge_v, self.edge_u]
+        weight = np.r_[self.coupling, self.coupling]
+        order = np.lexsort((target, source))
+        self._neighbours, self._weights = target[order], weight[order]
+        degree = np.bincount(source, minlength=n)
+        self._indptr = np.r_[0, np.cumsum(degree)]
+
+        # The common neighbourhood of each edge (u, v): the spins w other than u and v adjacent to u or v,
+        # with J_uw and J_vw (0 if they are not adjacent).
+        num_edges = len(self.coupling)
+        edges = np.r_[
+            np.repeat(np.arange(num_edges), degree[self.edge_u]),
+            np.repeat(np.arange(num_edges), degree[self.edge_v]),
+        ]
+        entries = np.r_[
+            _ranges(self._indptr[self.edge_u], degree[self.edge_u]),
+            _ranges(self._indptr[self.edge_v], degree[self.edge_v]),
+        ]
+        side = np.r_[
+            np.zeros(degree[self.edge_u].sum(), dtype=bool),
+            np.ones(degree[self.edge_v].sum(), dtype=bool),
+        ]
+        spins = self._neighbours[entries]
+        other = np.where(side, self.edge_u[edges], self.edge_v[edges])
+        kept = spins != other
+        edges, spins, side = edges[kept], spins[kept], side[kept]
+        weights = self._weights[entries[kept]]
+        order = np.lexsort((spins, edges))
+        edges, spins = edges[order], spins[order]
+        side, weights = side[order], weights[order]
+        start = np.flatnonzero(
+            np.r_[True, (edges[1:] != edges[:-1]) | (spins[1:] != spins[:-1])]
+        )[: len(edges)]
+        coupling_u = np.zeros(len(start))
+        coupling_v = np.zeros(len(start))
+        if len(edges):
+            coupling_u = np.add.reduceat(np.where(side, 0.0, weights), start)
+            coupling_v = np.add.reduceat(np.where(side, weights, 0.0), start)
+        # Columns: J_uw, J_vw, J_uw + J_vw and J_uw - J_vw.
+        self._pair_couplings = np.stack(
+            [
+                coupling_u,
+                coupling_v,
+                coupling_u + coupling_v,
+                coupling_u - coupling_v,
+            ]
+        )
+        self._pair_indptr = np.r_[
+            0, np.cumsum(np.bincount(edges[start], minlength=num_edges))
+        ]
+
+    def coefficients(
+        self, gammas: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Coefficients A, B and C of the energy for each gamma.
+
+        Args:
+            gammas (np.ndarray): parameters of the cost layer, which may be complex.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: A, B and C, whose shapes are that of `gammas`.
+        """
+        gammas = np.asarray(gammas)
+        flat = gammas.reshape(-1)
+        # The gammas are evaluated in batches to bound the memory of the products.
+        entries = max(4 * self._pair_couplings.shape[1], len(self._weights), 1)
+        batch = max(1, _MAX_BATCH_ENTRIES // entries)
+        results = [
+            self._coefficients(flat[start : start + batch])
+            for start in range(0, len(flat), batch)
+        ]
+        if not results:
+            return tuple(np.zeros(gammas.shape) for _ in range(3))
+        return tuple(
+            np.concatenate([result[k] for result in results]).reshape(gammas.shape)
+            for k in range(3)
+        )
+
+    def _coefficients(self, gammas: np.ndarray) -> tuple[np.ndarray, ...]:
+        angles = 2 * gammas.reshape(-1, 1)
+        h = self.linear
+
+        # sum_u h_u sin(2 gamma h_u) prod_w cos(2 gamma J_uw)
+        spin_products = _segment_prod(np.cos(angles * self._weights), self._indptr)
+        a = (h * np.sin(angles * h) * spin_products).sum(axis=-1)
+
+        edge_sin, edge_cos = self._edge_factors(angles)
+        # sum_{u<v} J_uv <Z_u Z_v> = sin(4 beta) / 2 * b - sin(2 beta)^2 / 2 * c
+        b = (self.coupling * edge_sin).sum(axis=-1)
+        c = (self.coupling * edge_cos).sum(axis=-1)
+        return a, b, c
+
+    def _edge_factors(
+        self, angles: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Factors of `sin(4 beta) / 2` and `-sin(2 beta)^2 / 2` in `<Z_u Z_v>` of each edge.
+
+        `angles` are `2 gamma`, whose shape is (the number of gammas, 1).
+        """
+        h, u, v = self.linear, self.edge_u, self.edge_v
+        pair_products = _segment_prod(
+            np.cos(angles[..., None] * self._pair_couplings), self._pair_indptr
+        )
+        product_u, product_v, product_plus, product_minus = np.moveaxis(
+            pair_products, 1, 0
+        )
+        edge_sin = np.sin(angles * self.coupling) * (
+            np.cos(angles * h[u]) * product_u + np.cos(angles * h[v]) * product_v
+        )
+        edge_cos = (
+            np.cos(angles * (h[u] + h[v])) * product_plus
+            - np.cos(angles * (h[u] - h[v])) * product_minus
+        )
+        return edge_sin, edge_cos
+
+    def edge_correlations(self, gamma: float, beta: float) -> np.ndarray:
+        """`<Z_u Z_v>` of each edge (`edge_u`, `edge_v`) for the parameters."""
+        edge_sin, edge_cos = self._edge_factors(np.array([[2 * gamma]]))
+        sin2, sin4 = np.sin(2 * beta), np.sin(4 * beta)
+        return sin4 / 2 * edge_sin[0] - sin2**2 / 2 * edge_cos[0]
+
+    def energy_grid(self, gammas: np.ndarray, betas: np.ndarray) -> np.ndarray:
+        """Energies on a grid, whose shape is (len(gammas), len(betas))."""
+        a, b, c = self.coefficients(np.asarray(gammas, dtype=np.float64))
+        betas = np.asarray(betas, dtype=np.float64)
+        sin2, sin4 = np.sin(2 * betas), np.sin(4 * betas)
+        return (
+            self.constant
+            + np.outer(a, sin2)
+            + np.outer(b, sin4 / 2)
+            - np.outer(c, sin2**2 / 2)
+        )
+
+    def expectation(self, gamma: float, beta: float) -> float:
+        """Energy for the parameters."""
+        return float(self.energy_grid([gamma], [beta])[0, 0])
+
+    def value_and_grad(
+        self, gamma: float, beta: float
+    ) -> tuple[float, float, float]:
+        """Energy and its derivatives by gamma and beta.
+
+        The derivative by gamma is the complex-step derivative, which is exact up to rounding.
+
+        Returns:
+            tuple[float, float, float]: the energy and the derivatives by gamma and beta.
+        """
+        a, b, c = self.coefficients(np.array([gamma + 1j * _COMPLEX_STEP]))
+        sin2, sin4, cos2, cos4 = (
+            np.sin(2 * beta),
+            np.sin(4 * beta),
+            np.cos(2 * beta),
+            np.cos(4 * beta),
+        )
+        energy = self.constant + sin2 * a[0] + sin4 / 2 * b[0] - sin2**2 / 2 * c[0]
+        grad_beta = 2 * cos2 * a[0].real + 2 * cos4 * b[0].real - sin4 * c[0].real
+        grad_gamma = energy.imag / _COMPLEX_STEP
+        return float(energy.real), float(grad_gamma), float(grad_beta)
+
+    def grid_search(
+        self,
+        gammas: typ.Optional[np.ndarray] = None,
+        betas: typ.Optional[np.ndarray] = None,
+    ) -> tuple[float, float, float]:
+        """Parameters of the lowest energy on a grid.
+
+        Args:
+            gammas (typ.Optional[np.ndarray], optional): grid of gamma. Defaults to 64 points in (-pi, pi] divided by the largest coefficient.
+            betas (typ.Optional[np.ndarray], optional): grid of beta. Defaults to 32 points in [-pi/4, pi/4), which is a period.
+
+        Returns:
+            tuple[float, float, float]: gamma, beta and the energy.
+        """
+        if gammas is None:
+            scale = np.abs(np.r_[self.linear, self.coupling]).max(initial=0.0)
+            gammas = np.linspace(-np.pi, np.pi, 65)[1:] / (scale or 1.0)
+        if betas is None:
+            betas = np.linspace(-np.pi / 4, np.pi / 4, 33)[:-1]
+        gammas, betas = np.asarray(gammas), np.asarray(betas)
+        energies = self.energy_grid(gammas, betas)
+        i, j = np.unravel_index(np.argmin(energies), energies.shape)
+        return float(gammas[i]), float(betas[j]), float(energies[i, j])
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import dataclasses
+import typing as typ
+
+import numpy as np
+from scipy.optimize import minimize
+
+from jijmodeling_transpiler_quantum.core.ising_qubo import (
+    IsingArrays,
+    IsingModel,
+    enumerate_ground_states,
+)
+
+from .p1_expectation import P1ExpectationEvaluator
+
+
+@dataclasses.dataclass
+class RQAOAResult:
+    """Result of `rqaoa`.
+
+    Attributes:
+        spins (np.ndarray): spins of the solution, whose values are -1 or 1.
+        energy (float): energy of the solution.
+        eliminations (list[tuple[int, int, int]]): `(spin, target, sign)` of each round, which substituted `z[spin] = sign * z[target]`.
+        parameters (list[tuple[float, float]]): optimized (gamma, beta) of each round.
+    """
+
+    spins: np.ndarray
+    energy: float
+    eliminations: list[tuple[int, int, int]]
+    parameters: list[tuple[float, float]]
+
+
+def _optimize_parameters(
+    evaluator: P1ExpectationEvaluator,
+    gammas: typ.Optional[np.ndarray],
+    betas: typ.Optional[np.ndarray],
+) -> tuple[float, float]:
+    """Grid search and a gradient descent from the best point of the grid."""
+    gamma, beta, _ = evaluator.grid_search(gammas, betas)
+
+    def value_and_grad(parameters: np.ndarray) -> tuple[float, np.ndarray]:
+        value, grad_gamma, grad_beta = evaluator.value_and_grad(*parameters)
+        return value, np.array([grad_gamma, grad_beta])
+
+    result = minimize(value_and_grad, [gamma, beta], jac=True, method="BFGS")
+    return float(result.x[0]), float(result.x[1])
+
+
+def rqaoa(
+    ising: typ.Union[IsingModel, IsingArrays],
+    num_spins: typ.Optional[int] = None,
+    cutoff: int = 10,
+    gammas: typ.Optional[np.ndarray] = None,
+    betas: typ.Optional[np.ndarray] = None,
+) -> RQAOAResult:
+    """Recursive QAOA.
+
+    Each round optimizes QAOA with one layer on the current Ising model by `P1ExpectationEvaluator`,
+    takes the edge (u, v) whose `|<Z_u Z_v>|` is the largest, and eliminates v by `IsingArrays.substitute`
+    with `z_v = sign(<Z_u Z_v>) z_u`. When at most `cutoff` spins are coupled, the rest is solved exactly
+    by `enumerate_ground_states` (the uncoupled spins are set against their fields),
+    and the eliminated spins are recovered in the reverse order.
+
+    Args:
+        ising (typ.Union[IsingModel, IsingArrays]): Ising model. It is not modified.
+        num_spins (typ.Optional[int], optional): the number of spins. Defaults to that of the model.
+        cutoff (int, optional): the maximum number of coupled spins solved exactly. Defaults to 10.
+        gammas (typ.Optional[np.ndarray], optional): grid of gamma for `P1ExpectationEvaluator.grid_search`. Defaults to None.
+        betas (typ.Optional[np.ndarray], optional): grid of beta for `P1ExpectationEvaluator.grid_search`. Defaults to None.
+
+    Returns:
+        RQAOAResult: the solution and the history of the eliminations.
+
+    Examples:
+        >>> ring = IsingModel({(k, (k + 1) % 12): 1.0 for k in range(12)}, {}, 0.0)
+        >>> result = rqaoa(ring, cutoff=4)
+        >>> result.energy, len(result.eliminations)
+        (-12.0, 8)
+
+    """
+    if isinstance(ising, IsingModel):
+        ising = ising.to_arrays(num_spins=num_spins)
+    elif num_spins is not None:
+        ising = dataclasses.replace(ising, num_spins=num_spins)
+    arrays = dataclasses.replace(
+        ising,
+        quad_row=ising.quad_row.copy(),
+        quad_col=ising.quad_col.copy(),
+        quad_coeff=ising.quad_coeff.astype(np.float64),
+        linear_index=ising.linear_index.copy(),
+        linear_coeff=ising.linear_coeff.astype(np.float64),
+    )
+    n = arrays.num_spins
+
+    eliminations: list[tuple[int, int, int]] = []
+    parameters: list[tuple[float, float]] = []
+    while True:
+        evaluator = P1ExpectationEvaluator(arrays, n)
+        if len(np.union1d(evaluator.edge_u, evaluator.edge_v)) <= cutoff:
+            break
+        gamma, beta = _optimize_parameters(evaluator, gammas, betas)
+        correlations = evaluator.edge_correlations(gamma, beta)
+        edge = int(np.argmax(np.abs(correlations)))
+        target, spin = int(evaluator.edge_u[edge]), int(evaluator.edge_v[edge])
+        sign = 1 if correlations[edge] >= 0 else -1
+        arrays.substitute(spin, target, sign)
+        eliminations.append((spin, target, sign))
+        parameters.append((gamma, beta))
+
+    # The uncoupled spins minimize their fields, and the coupled ones are enumerated.
+    spins = np.where(evaluator.linear > 0, -1, 1)
+    coupled = np.union1d(evaluator.edge_u, evaluator.edge_v)
+    if len(coupled):
+        position = np.full(n, -1)
+        position[coupled] = np.arange(len(coupled))
+        linear = position[arrays.linear_index] >= 0
+        residual = IsingArrays(
+            quad_row=position[evaluator.edge_u],
+            quad_col=position[evaluator.edge_v],
+            quad_coeff=evaluator.coupling,
+            linear_index=position[arrays.linear_index[linear]],
+            linear_coeff=arrays.linear_coeff[linear],
+            constant=0.0,
+            num_spins=len(coupled),
+        )
+        _, states = enumerate_ground_states(residual)
+        spins[coupled] = states[0]
+    for spin, target, sign in reversed(eliminations):
+        spins[spin] = sign * spins[target]
+
+    energy = float(ising.calc_energies(spins)[0])
+    return RQAOAResult(spins, energy, eliminations, parameters)
@@ -3,6 +3,18 @@ This module provides utilities for the Quantum Random Access Coding (QRAC).
 Ex: QRAC utilizes are used Quantum Random Access Optimization (QRAO).
 """
 
-from .graph_coloring import greedy_graph_coloring, check_linear_term
+from .graph_coloring import (
+    ColoringStrategy,
+    greedy_graph_coloring,
+    jones_plassmann_coloring,
+    check_linear_term,
+)
+from .incremental_coloring import IncrementalGraphColoring
 
-__all__ = ["greedy_graph_coloring", "check_linear_term"]
+__all__ = [
+    "ColoringStrategy",
+    "greedy_graph_coloring",
+    "jones_plassmann_coloring",
+    "check_linear_term",
+    "IncrementalGraphColoring",
+]
@@ -1,18 +1,164 @@
 from __future__ import annotations
+import concurrent.futures
+import contextlib
+import enum
+import heapq
+import itertools
 import typing as typ
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class ColoringStrategy(enum.Enum):
+    """Order in which `greedy_graph_coloring` colors the vertices.
+
+    Every strategy gives each vertex the smallest color which is not used by its neighbors
+    and whose group is not full, so that the colors are 0, 1, ... and respect `max_color_group_size`.
+    JONES_PLASSMANN colors independent sets of vertices at once and splits the colors afterwards
+    to enforce the group size, see `jones_plassmann_coloring`.
+    """
+
+    # the order of first appearance in the graph
+    GREEDY = "greedy"
+    # decreasing degree (Welsh-Powell)
+    LARGEST_FIRST = "largest_first"
+    WELSH_POWELL = "largest_first"
+    # the vertex with the most distinct neighbor colors first, ties broken by degree (DSatur)
+    DSATUR = "dsatur"
+    # the best of random orders, which include the order of GREEDY
+    RANDOM = "random"
+    # parallel rounds of independent sets chosen by random priorities (Jones-Plassmann)
+    JONES_PLASSMANN = "jones_plassmann"
+
+
+class _ColoringState:
+    """Colors of the vertices of a CSR adjacency and the occupancy of the colors."""
+
+    def __init__(
+        self,
+        vertices: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        max_color_group_size: int,
+        init_coloring: typ.Optional[dict[int, int]],
+    ):
+        self.vertices = vertices.tolist()
+        self.indptr = indptr
+        self.indices = indices
+        self.max_color_group_size = max_color_group_size
+
+        self.coloring: dict[int, int] = {}
+        if init_coloring:
+            self.coloring.update(init_coloring)
+        self.color_group: dict[int, list[int]] = {}
+        for index, color in self.coloring.items():
+            if color not in self.color_group:
+                self.color_group[color] = []
+            self.color_group[color].append(index)
+
+        # Colors never exceed the initial colors plus the number of vertices.
+        max_color = max(self.coloring.values()) if self.coloring else -1
+        num_colors = max_color + len(self.vertices) + 2
+        self.vertex_color = np.array(
+            [self.coloring.get(v, -1) for v in self.vertices], dtype=np.int64
+        )
+        self.counts = np.zeros(num_colors, dtype=np.int64)
+        for color, group in self.color_group.items():
+            self.counts[color] = len(group)
+        # `next_open[c] == c` unless color c is full. Full colors are skipped by path halving.
+        self.next_open = np.arange(num_colors, dtype=np.int64)
+        self.next_open[:-1][self.counts[:-1] >= max_color_group_size] += 1
+        # `forbidden[c] == i` means that a neighbor of the i-th vertex has color c.
+        self.forbidden = np.full(num_colors, -1, dtype=np.int64)
+
+    def neighbors(self, i: int) -> np.ndarray:
+        return self.indices[self.indptr[i] : self.indptr[i + 1]]
+
+    def _find_open(self, color: int) -> int:
+        next_open = self.next_open
+        while next_open[color] != color:
+            next_open[color] = next_open[next_open[color]]
+            color = next_open[color]
+        return int(color)
+
+    def assign(self, i: int) -> int:
+        """Give the i-th vertex the smallest color which is not used by its neighbors and whose group is not full."""
+        neighbor_colors = self.vertex_color[self.neighbors(i)]
+        self.forbidden[neighbor_colors[neighbor_colors >= 0]] = i
+
+        color = self._find_open(0)
+        while self.forbidden[color] == i:
+            color = self._find_open(color + 1)
+
+        vertex = self.vertices[i]
+        self.vertex_color[i] = color
+        self.coloring[vertex] = color
+        if color not in self.color_group:
+            self.color_group[color] = []
+        self.color_group[color].append(vertex)
+        self.counts[color] += 1
+        if self.counts[color] >= self.max_color_group_size:
+            self.next_open[color] = color + 1
+        return color
+
+    def assign_in_order(self, order: typ.Iterable[int]):
+        for i in order:
+            if self.vertex_color[i] < 0:
+                self.assign(i)
+
+    def assign_dsatur(self):
+        degree = np.diff(self.indptr)
+        saturation: list[set[int]] = [set() for _ in self.vertices]
+        for i in np.flatnonzero(self.vertex_color >= 0).tolist():
+            for j in self.neighbors(i).tolist():
+                saturation[j].add(int(self.vertex_color[i]))
+
+        # Stale entries, whose saturation is lower than the current one, are skipped.
+        heap = [
+            (-len(saturation[i]), -int(degree[i]), i)
+            for i in np.flatnonzero(self.vertex_color < 0).tolist()
+        ]
+        heapq.heapify(heap)
+        while heap:
+            negative_saturation, _, i = heapq.heappop(heap)
+            if self.vertex_color[i] >= 0 or -negative_saturation != len(
+                saturation[i]
+            ):
+                continue
+            color = self.assign(i)
+            for j in self.neighbors(i).tolist():
+                if self.vertex_color[j] < 0 and color not in saturation[j]:
+                    saturation[j].add(color)
+                    heapq.heappush(heap, (-len(saturation[j]), -int(degree[j]), j))
 
 
 def greedy_graph_coloring(
     graph: typ.Iterable[tuple[int, int]],
     max_color_group_size: int,
     init_coloring: typ.Optional[dict[int, int]] = None,
+    coloring_strategy: ColoringStrategy = ColoringStrategy.GREEDY,
+    num_starts: int = 16,
+    seed: typ.Optional[int] = 0,
 ) -> tuple[dict[int, int], dict[int, list[int]]]:
     """graph coloring for QRAC
 
+    Each vertex takes the smallest color which is not used by its neighbors and whose group has less than
+    `max_color_group_size` vertices. The order of the vertices is chosen by `coloring_strategy`,
+    and the default is the order of their first appearance in `graph`.
+    The number of colors is the number of qubits of the QRAC Hamiltonian.
+
+    The adjacency is a deduplicated CSR, the colors of the neighbors are marked in an array,
+    and the full colors are skipped by a union-find, so that GREEDY and LARGEST_FIRST run in nearly O(V + E),
+    DSATUR in O((V + E) log V) and RANDOM in `num_starts` times of GREEDY.
+
     Args:
-        graph (typ.Iterable[tuple[int, int]]): _description_
+        graph (typ.Iterable[tuple[int, int]]): edges. Duplicated edges and self-loops are ignored.
         max_color_group_size (int): if you want to use for the qrac31, set 3.
         init_coloring (typ.Optional[dict[int, int]], optional): initial coloring. Defaults to None.
+        coloring_strategy (ColoringStrategy, optional): order of the vertices. Defaults to ColoringStrategy.GREEDY.
+        num_starts (int, optional): the number of orders tried by ColoringStrategy.RANDOM. Defaults to 16.
+        seed (typ.Optional[int], optional): seed of ColoringStrategy.RANDOM and ColoringStrategy.JONES_PLASSMANN. Defaults to 0.
 
     Returns:
         tuple[dict[int, int], dict[int, list[int]]]: coloring, color_group
@@ -22,90 +168,366 @@ def greedy_graph_coloring(
         >>> graph = [(0, 1), (1, 2), (2, 0), (0, 4)]
         >>> greedy_graph_coloring(graph, 2)
         ({0: 0, 1: 1, 2: 2, 4: 1}, {0: [0], 1: [1, 4], 2: [2]})
+        >>> greedy_graph_coloring(graph, 2, coloring_strategy=ColoringStrategy.DSATUR)
+        ({0: 0, 1: 1, 2: 2, 4: 1}, {0: [0], 1: [1, 4], 2: [2]})
+
+    """
+    coloring_strategy = ColoringStrategy(coloring_strategy)
+    vertices, indptr, indices = _csr_adjacency(graph)
+    args = (vertices, indptr, indices, max_color_group_size, init_coloring)
+    num_vertices = len(vertices)
+
+    if coloring_strategy == ColoringStrategy.JONES_PLASSMANN:
+        return _jones_plassmann(
+            vertices, indptr, indices, max_color_group_size, init_coloring, seed
+        )
+
+    if coloring_strategy == ColoringStrategy.RANDOM:
+        rng = np.random.default_rng(seed)
+        best: typ.Optional[_ColoringState] = None
+        for start in range(max(num_starts, 1)):
+            state = _ColoringState(*args)
+            order = np.arange(num_vertices) if start == 0 else rng.permutation(num_vertices)
+            state.assign_in_order(order.tolist())
+            if best is None or len(state.color_group) < len(best.color_group):
+                best = state
+        return best.coloring, best.color_group
+
+    state = _ColoringState(*args)
+    if coloring_strategy == ColoringStrategy.DSATUR:
+        state.assign_dsatur()
+    elif coloring_strategy == ColoringStrategy.LARGEST_FIRST:
+        state.assign_in_order(
+            np.argsort(-np.diff(indptr), kind="stable").tolist()
+        )
+    else:
+        state.assign_in_order(range(num_vertices))
+    return state.coloring, state.color_group
+
+
+def jones_plassmann_coloring(
+    graph: typ.Iterable[tuple[int, int]],
+    max_color_group_size: int,
+    init_coloring: typ.Optional[dict[int, int]] = None,
+    seed: typ.Optional[int] = 0,
+    n_jobs: typ.Optional[int] = None,
+    chunk_size: int = 1 << 16,
+) -> tuple[dict[int, int], dict[int, list[int]]]:
+    """graph coloring for QRAC by the parallel algorithm of Jones and Plassmann
+
+    Every vertex gets a random priority. In each round, the uncolored vertices whose priorities are higher than
+    those of all their uncolored neighbors form an independent set, and all of them take the smallest color
+    which is not used by their neighbors at once. A round is a few NumPy kernels over the edges of the uncolored vertices,
+    which are split into chunks of `chunk_size` edges. If `n_jobs` is larger than 1, the chunks run on a process pool.
+    The edges and the colors are then kept in shared memory, and each chunk drops its used edges in place,
+    so that only the indices of the chunks and the colors of the neighbors are sent between the processes.
+    The pool costs its startup and a message per chunk and round, so it is worth only for large graphs on several cores.
+    Finally, the group size is enforced by splitting every color into new colors of at most `max_color_group_size` vertices
+    in the order of their first appearance, since a subset of a color is still independent.
+    The colors other than those of `init_coloring` are renumbered to be 0, 1, ... without gaps,
+    so that the output is the same form as `greedy_graph_coloring`.
+    The coloring does not depend on `n_jobs` and `chunk_size`.
+
+    Args:
+        graph (typ.Iterable[tuple[int, int]]): edges. Duplicated edges and self-loops are ignored.
+        max_color_group_size (int): if you want to use for the qrac31, set 3.
+        init_coloring (typ.Optional[dict[int, int]], optional): initial coloring. Defaults to None.
+        seed (typ.Optional[int], optional): seed of the priorities. Defaults to 0.
+        n_jobs (typ.Optional[int], optional): the number of processes. Defaults to None (no process pool).
+        chunk_size (int, optional): the number of edges in a chunk. Defaults to 65536.
+
+    Returns:
+        tuple[dict[int, int], dict[int, list[int]]]: coloring, color_group
+
+    Examples:
+        >>> coloring, color_group = jones_plassmann_coloring([(0, 1), (1, 2), (2, 0), (0, 4)], 2)
+        >>> all(coloring[i] != coloring[j] for i, j in [(0, 1), (1, 2), (2, 0), (0, 4)])
+        True
+        >>> max(len(group) for group in color_group.values())
+        2
 
     """
-    coloring = {}
-    if init_coloring:
-        coloring.update(init_coloring)
-
-    max_color = max(coloring.values()) if coloring else -1
-
-    adj_matrix: dict[int, list[int]] = {}
-    for i, j in graph:
-        if i == j:
-            continue
-        if i not in adj_matrix:
-            adj_matrix[i] = []
-        if j not in adj_matrix:
-            adj_matrix[j] = []
-        adj_matrix[i].append(j)
-        adj_matrix[j].append(i)
+    vertices, indptr, indices = _csr_adjacency(graph)
+    return _jones_plassmann(
+        vertices,
+        indptr,
+        indices,
+        max_color_group_size,
+        init_coloring,
+        seed,
+        n_jobs,
+        chunk_size,
+    )
 
+
+# The arrays of `_jones_plassmann` in the shared memory, mapped by each worker process.
+_jones_plassmann_shared: dict[str, np.ndarray] = {}
+_jones_plassmann_memory: list[shared_memory.SharedMemory] = []
+
+
+def _attach_jones_plassmann(specs: dict[str, tuple[str, str, tuple[int, ...]]]):
+    """Map the shared arrays of `_jones_plassmann` in a worker process."""
+    for name, (memory_name, dtype, shape) in specs.items():
+        memory = shared_memory.SharedMemory(name=memory_name)
+        _jones_plassmann_memory.append(memory)
+        _jones_plassmann_shared[name] = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def _jones_plassmann_task(kernel: typ.Callable, chunk: int):
+    return kernel(_jones_plassmann_shared, chunk)
+
+
+def _jones_plassmann_chunk(
+    arrays: dict[str, np.ndarray], chunk: int
+) -> tuple[np.ndarray, np.ndarray]:
+    start = arrays["start"][chunk]
+    stop = start + arrays["length"][chunk]
+    return arrays["src"][start:stop], arrays["dst"][start:stop]
+
+
+def _jones_plassmann_block(arrays: dict[str, np.ndarray], chunk: int) -> None:
+    """Unselect the vertices which have an uncolored neighbor of higher priority."""
+    src, dst = _jones_plassmann_chunk(arrays, chunk)
+    arrays["selected"][src[arrays["color"][dst] < 0]] = False
+
+
+def _jones_plassmann_take(
+    arrays: dict[str, np.ndarray], chunk: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Colors of the neighbors of the selected vertices. The edges of the other vertices are moved to the front."""
+    src, dst = _jones_plassmann_chunk(arrays, chunk)
+    is_selected = arrays["selected"][src]
+    neighbor_vertex = src[is_selected]
+    neighbor_color = arrays["color"][dst[is_selected]]
+    remaining = ~is_selected
+    num_remaining = int(np.count_nonzero(remaining))
+    src[:num_remaining] = src[remaining]
+    dst[:num_remaining] = dst[remaining]
+    arrays["length"][chunk] = num_remaining
+    return neighbor_vertex, neighbor_color
+
+
+def _jones_plassmann(
+    vertices: np.ndarray,
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    max_color_group_size: int,
+    init_coloring: typ.Optional[dict[int, int]],
+    seed: typ.Optional[int],
+    n_jobs: typ.Optional[int] = None,
+    chunk_size: int = 1 << 16,
+) -> tuple[dict[int, int], dict[int, list[int]]]:
+    num_vertices = len(vertices)
+    init_coloring = dict(init_coloring or {})
+    vertex_color = np.array(
+        [init_coloring.get(v, -1) for v in vertices.tolist()], dtype=np.int64
+    )
+    # The initially colored vertices have the highest priorities.
+    priority = np.random.default_rng(seed).permutation(num_vertices)
+    priority[vertex_color >= 0] += num_vertices
+
+    # A vertex is selected when all its neighbors of higher priority are colored, and its neighbors of lower priority
+    # are not colored before it. So only the edges towards higher priority from the uncolored vertices are needed.
+    src = np.repeat(np.arange(num_vertices), np.diff(indptr))
+    dst = indices
+    active = (priority[dst] > priority[src]) & (vertex_color[src] < 0)
+    src, dst = src[active], dst[active]
+
+    chunk_size = max(chunk_size, 1)
+    bounds = np.minimum(np.arange(0, len(src) + chunk_size, chunk_size), len(src))
+    arrays = {
+        "src": src.astype(np.int64),
+        "dst": dst.astype(np.int64),
+        "start": bounds[:-1].copy(),
+        "length": np.diff(bounds),
+        "color": vertex_color,
+        "selected": vertex_color < 0,
+    }
+
+    with contextlib.ExitStack() as stack:
+        executor = None
+        if n_jobs is not None and n_jobs > 1 and len(arrays["length"]) > 1:
+            specs = {}
+            for name, array in arrays.items():
+                memory = shared_memory.SharedMemory(
+                    create=True, size=max(array.nbytes, 1)
+                )
+                stack.callback(memory.unlink)
+                stack.callback(memory.close)
+                shared = np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)
+                shared[...] = array
+                arrays[name] = shared
+                specs[name] = (memory.name, array.dtype.str, array.shape)
+            del shared
+            executor = stack.enter_context(
+                concurrent.futures.ProcessPoolExecutor(
+                    max_workers=n_jobs,
+                    initializer=_attach_jones_plassmann,
+                    initargs=(specs,),
+                )
+            )
+
+        def run(kernel: typ.Callable) -> list:
+            chunks = np.flatnonzero(arrays["length"]).tolist()
+            if executor is not None and len(chunks) > 1:
+                return list(
+                    executor.map(
+                        _jones_plassmann_task, itertools.repeat(kernel), chunks
+                    )
+                )
+            return [kernel(arrays, chunk) for chunk in chunks]
+
+        color_of, selected = arrays["color"], arrays["selected"]
+        while selected.any():
+            run(_jones_plassmann_block)
+
+            neighbor_vertex = np.zeros(0, dtype=np.int64)
+            neighbor_color = np.zeros(0, dtype=np.int64)
+            results = run(_jones_plassmann_take)
+            if results:
+                neighbor_vertex, neighbor_color = (
+                    np.concatenate(parts) for parts in zip(*results)
+                )
+
+            # The smallest color which is not used by the neighbors is the first gap of their sorted colors.
+            base = int(neighbor_color.max()) + 1 if len(neighbor_color) else 1
+            neighbor_vertex, neighbor_color = np.divmod(
+                np.unique(neighbor_vertex * base + neighbor_color), base
+            )
+            rank = np.arange(len(neighbor_vertex)) - np.searchsorted(
+                neighbor_vertex, neighbor_vertex
+            )
+            color = np.bincount(neighbor_vertex, minlength=num_vertices)
+            gap = neighbor_color != rank
+            np.minimum.at(color, neighbor_vertex[gap], rank[gap])
+            color_of[selected] = color[selected]
+            selected[...] = color_of < 0
+
+        # The shared memory is closed on exit, so no view of it may be left.
+        vertex_color = np.array(color_of)
+        del color_of, selected, run
+        arrays.clear()
+
+    # Balancing: a subset of a color is independent, so the vertices beyond the group size are split into new colors.
+    # Each color keeps the initial vertices and its first vertices up to the group size.
+    is_new = np.array([v not in init_coloring for v in vertices.tolist()], dtype=bool)
+    new = np.flatnonzero(is_new)
+    new_color = vertex_color[new]
+    init_colors = np.array(list(init_coloring.values()), dtype=np.int64)
+    init_counts = np.bincount(
+        init_colors, minlength=int(vertex_color.max(initial=0)) + 1
+    )
+    order = np.argsort(new_color, kind="stable")
+    sorted_color = new_color[order]
+    position = np.empty(len(new), dtype=np.int64)
+    position[order] = np.arange(len(new)) - np.searchsorted(sorted_color, sorted_color)
+    room = np.maximum(max_color_group_size - init_counts[new_color], 0)
+    part = np.where(
+        position < room, 0, (position - room) // max_color_group_size + 1
+    )
+
+    # The initial colors are fixed, and the other colors take the smallest unused numbers in order.
+    num_parts = int(part.max(initial=0)) + 1
+    labels, label_index = np.unique(new_color * num_parts + part, return_inverse=True)
+    label_color, label_part = np.divmod(labels, num_parts)
+    unique_init_colors = np.unique(init_colors)
+    fixed = (label_part == 0) & np.isin(label_color, unique_init_colors)
+    free = np.setdiff1d(
+        np.arange(len(unique_init_colors) + len(labels)), unique_init_colors
+    )
+    label_color[~fixed] = free[: np.count_nonzero(~fixed)]
+
+    coloring = init_coloring
+    coloring.update(
+        zip(vertices[new].tolist(), label_color[label_index.reshape(-1)].tolist())
+    )
     color_group: dict[int, list[int]] = {}
     for index, color in coloring.items():
-        if color not in coloring:
+        if color not in color_group:
             color_group[color] = []
         color_group[color].append(index)
+    return coloring, color_group
 
-    for i, neigborhoors in adj_matrix.items():
-        if i in coloring:
-            continue
-
-        neighbor_colors = [coloring[k] for k in neigborhoors if k in coloring]
-
-        done_coloring = False
-        for color in range(max_color + 1):
-            if color not in color_group or color not in neighbor_colors:
-                if color not in color_group or max_color_group_size > len(
-                    color_group[color]
-                ):
-                    coloring[i] = color
-                    done_coloring = True
-                    if color not in color_group:
-                        color_group[color] = []
-                    color_group[color].append(i)
-                    break
-        if not done_coloring:
-            coloring[i] = max_color + 1
-            color_group[max_color + 1] = [i]
-            max_color += 1
 
-    return coloring, color_group
+def _csr_adjacency(
+    graph: typ.Iterable[tuple[int, int]]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Deduplicated CSR adjacency of an undirected graph without self-loops.
+
+    Args:
+        graph (typ.Iterable[tuple[int, int]]): edges.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: vertices in the order of first appearance,
+        and `indptr` and `indices` where the neighbors of the k-th vertex are `indices[indptr[k]:indptr[k + 1]]`
+        as positions in the vertices.
+    """
+    edges = np.array(list(graph), dtype=np.int64).reshape(-1, 2)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    vertices, first, inverse = np.unique(
+        edges.reshape(-1), return_index=True, return_inverse=True
+    )
+    order = np.argsort(first, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    num_vertices = len(vertices)
+    local = rank[inverse].reshape(-1, 2)
+
+    keys = np.unique(
+        np.minimum(local[:, 0], local[:, 1]) * num_vertices
+        + np.maximum(local[:, 0], local[:, 1])
+    )
+    row, col = np.divmod(keys, max(num_vertices, 1))
+    rows = np.concatenate([row, col])
+    cols = np.concatenate([col, row])
+    sort = np.argsort(rows, kind="stable")
+    indptr = np.zeros(num_vertices + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_vertices), out=indptr[1:])
+    return vertices[order], indptr, cols[sort]
 
 
 def check_linear_term(
     color_group: dict[int, list[int]],
-    linear_term_index: list[int],
+    linear_term_index: typ.Union[typ.Iterable[int], np.ndarray],
     max_color_group_size: int,
 ) -> dict[int, list[int]]:
     """Search for items within the index of linear term that have not been assigned to the color_group, and add them.
 
+    The unassigned indices are packed in their order into new groups of `max_color_group_size` items,
+    whose colors follow the largest color in `color_group`. It runs in O(n) by a set of the assigned indices.
+
     Args:
         color_group (dict[int, list[int]]): color_group
-        linear_term_index (list[int]): list of index of linear term
+        linear_term_index (typ.Union[typ.Iterable[int], np.ndarray]): index of linear term. duplicated indices are added once.
         max_color_group_size (int): the maximum number of encoding qubits. if you want to use for the qrac31, set 3.
 
     Returns:
         dict[int, list[int]]: color_group which added items within the index of linear term that have not been assigned to the color_group.
+
+    Examples:
+        >>> check_linear_term({0: [0, 1], 1: [2]}, np.array([2, 3, 4, 5, 3]), 2)
+        {0: [0, 1], 1: [2], 2: [3, 4], 3: [5]}
+
     """
-    idx_in_color_group = []
-    for v in color_group.values():
-        idx_in_color_group.extend(v)
+    if isinstance(linear_term_index, np.ndarray):
+        linear_term_index = linear_term_index.tolist()
 
-    # We're adding a bit to the next index of the 'quad' qubit, affecting only the linear term. 
-    # If the Ising Hamiltonian has only linear terms, making 'quad' empty and causing a 'max' error, we return index 0 to avoid this.
-    qubit_index_for_linear = max(color_group.keys()) + 1 if color_group else 0
-    bits_in_qubits_counter = 1
+    assigned: set[int] = set()
+    for group in color_group.values():
+        assigned.update(group)
+    unassigned = []
     for idx in linear_term_index:
-        if idx not in idx_in_color_group:
-            if bits_in_qubits_counter == 1:
-                color_group[qubit_index_for_linear] = []
-
-            color_group[qubit_index_for_linear].append(idx)
-            bits_in_qubits_counter += 1
+        if idx not in assigned:
+            assigned.add(idx)
+            unassigned.append(idx)
 
-            if bits_in_qubits_counter > max_color_group_size:
-                qubit_index_for_linear += 1
-                bits_in_qubits_counter = 1
+    # We're adding a bit to the next index of the 'quad' qubit, affecting only the linear term.
+    # If the Ising Hamiltonian has only linear terms, making 'quad' empty and causing a 'max' error, we return index 0 to avoid this.
+    qubit_index_for_linear = max(color_group.keys()) + 1 if color_group else 0
+    for start in range(0, len(unassigned), max_color_group_size):
+        color_group[qubit_index_for_linear] = unassigned[
+            start : start + max_color_group_size
+        ]
+        qubit_index_for_linear += 1
 
     return color_group
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import collections
+import typing as typ
+
+from .graph_coloring import ColoringStrategy, greedy_graph_coloring
+
+
+class IncrementalGraphColoring:
+    """Graph coloring for QRAC which is repaired, not rebuilt, when edges are added or removed.
+
+    Removing an edge never makes a coloring invalid, so only the new vertices and one end of each added edge
+    whose ends have the same color are recolored. They take the smallest color which is not used by their neighbors
+    and whose group is not full, as in `greedy_graph_coloring`. The other vertices keep their colors,
+    so that the qubits of the QRAC encoding stay the same as far as possible.
+    A vertex keeps its color even if it loses all its edges.
+
+    Examples:
+        >>> coloring = IncrementalGraphColoring([(0, 1), (1, 2)], 2)
+        >>> coloring.color_group
+        {0: [0, 2], 1: [1]}
+        >>> coloring.update(added_edges=[(0, 2), (2, 3)], removed_edges=[(1, 2)])
+        {3: 0, 2: 1}
+        >>> coloring.color_group
+        {0: [0, 3], 1: [1, 2]}
+
+    """
+
+    def __init__(
+        self,
+        graph: typ.Iterable[tuple[int, int]],
+        max_color_group_size: int,
+        init_coloring: typ.Optional[dict[int, int]] = None,
+        coloring_strategy: ColoringStrategy = ColoringStrategy.GREEDY,
+    ):
+        """Color the graph by `greedy_graph_coloring`.
+
+        Args:
+            graph (typ.Iterable[tuple[int, int]]): edges. Duplicated edges and self-loops are ignored.
+            max_color_group_size (int): if you want to use for the qrac31, set 3.
+            init_coloring (typ.Optional[dict[int, int]], optional): initial coloring. Defaults to None.
+            coloring_strategy (ColoringStrategy, optional): order of the vertices in the first coloring. Defaults to ColoringStrategy.GREEDY.
+        """
+        graph = list(graph)
+        self.max_color_group_size = max_color_group_size
+        self.coloring_strategy = ColoringStrategy(coloring_strategy)
+        self.edges: set[tuple[int, int]] = set()
+        self.adjacency: dict[int, set[int]] = {}
+        for i, j in graph:
+            self._add_edge(i, j)
+        self.coloring, self.color_group = greedy_graph_coloring(
+            graph,
+            max_color_group_size,
+            init_coloring=init_coloring,
+            coloring_strategy=self.coloring_strategy,
+        )
+
+    def _add_edge(self, i: int, j: int) -> bool:
+        i, j = int(i), int(j)
+        edge = (min(i, j), max(i, j))
+        if i == j or edge in self.edges:
+            return False
+        self.edges.add(edge)
+        self.adjacency.setdefault(i, set()).add(j)
+        self.adjacency.setdefault(j, set()).add(i)
+        return True
+
+    def _remove_edge(self, i: int, j: int) -> bool:
+        i, j = int(i), int(j)
+        edge = (min(i, j), max(i, j))
+        if edge not in self.edges:
+            return False
+        self.edges.remove(edge)
+        self.adjacency[i].discard(j)
+        self.adjacency[j].discard(i)
+        return True
+
+    def _uncolor(self, vertex: int):
+        color = self.coloring.pop(vertex)
+        self.color_group[color].remove(vertex)
+        if not self.color_group[color]:
+            del self.color_group[color]
+
+    def _assign(self, vertex: int) -> int:
+        forbidden = {
+            self.coloring[neighbor]
+            for neighbor in self.adjacency.get(vertex, ())
+            if neighbor in self.coloring
+        }
+        color = 0
+        while (
+            color in forbidden
+            or len(self.color_group.get(color, ())) >= self.max_color_group_size
+        ):
+            color += 1
+        self.coloring[vertex] = color
+        if color not in self.color_group:
+            self.color_group[color] = []
+        self.color_group[color].append(vertex)
+        return color
+
+    def _compact(self) -> dict[int, int]:
+        """Move the groups of the largest colors into the unused colors, so that the colors are 0, 1, ... as qubits."""
+        changes = {}
+        num_colors = len(self.color_group)
+        gaps = [color for color in range(num_colors) if color not in self.color_group]
+        for color in gaps:
+            largest = max(self.color_group)
+            group = self.color_group.pop(largest)
+            self.color_group[color] = group
+            for vertex in group:
+                self.coloring[vertex] = color
+                changes[vertex] = color
+        return changes
+
+    def update(
+        self,
+        added_edges: typ.Iterable[tuple[int, int]] = (),
+        removed_edges: typ.Iterable[tuple[int, int]] = (),
+    ) -> dict[int, int]:
+        """Apply the changes of the edges and recolor only the vertices which need it.
+
+        An added edge whose ends have the same color is repaired by recoloring the end which is in more such edges.
+
+        Args:
+            added_edges (typ.Iterable[tuple[int, int]], optional): new edges. Defaults to ().
+            removed_edges (typ.Iterable[tuple[int, int]], optional): removed edges. Defaults to ().
+
+        Returns:
+            dict[int, int]: the new colors of the vertices whose colors are changed or assigned.
+        """
+        for i, j in removed_edges:
+            self._remove_edge(i, j)
+
+        pending: dict[int, None] = {}
+        conflicts: list[tuple[int, int]] = []
+        for i, j in added_edges:
+            if not self._add_edge(i, j):
+                continue
+            i, j = int(i), int(j)
+            for vertex in (i, j):
+                if vertex not in self.coloring:
+                    pending[vertex] = None
+            if i in self.coloring and self.coloring.get(i) == self.coloring.get(j):
+                conflicts.append((i, j))
+
+        previous = {}
+        num_conflicts = collections.Counter(v for edge in conflicts for v in edge)
+        for i, j in conflicts:
+            if i in previous or j in previous:
+                continue
+            vertex = i if num_conflicts[i] > num_conflicts[j] else j
+            previous[vertex] = self.coloring[vertex]
+            self._uncolor(vertex)
+            pending[vertex] = None
+
+        changes = {}
+        for vertex in pending:
+            color = self._assign(vertex)
+            if previous.get(vertex) != color:
+                changes[vertex] = color
+        changes.update(self._compact())
+        return changes
+
+    def update_graph(self, graph: typ.Iterable[tuple[int, int]]) -> dict[int, int]:
+        """Replace the edges by those of `graph` and recolor only the vertices which need it.
+
+        Args:
+            graph (typ.Iterable[tuple[int, int]]): the new edges.
+
+        Returns:
+            dict[int, int]: the new colors of the vertices whose colors are changed or assigned.
+        """
+        edges = {(min(i, j), max(i, j)) for i, j in graph if i != j}
+        return self.update(
+            added_edges=sorted(edges - self.edges),
+            removed_edges=sorted(self.edges - edges),
+        )
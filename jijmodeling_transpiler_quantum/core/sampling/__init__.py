@@ -0,0 +1,15 @@
+"""
+This module provides backend-neutral tools for the measurement outcomes of samplers.
+"""
+
+from .counts import counts_to_binaries, merge_binaries
+from .energy import EnergyStatistics, energy_statistics
+from .probabilities import select_probabilities
+
+__all__ = [
+    "EnergyStatistics",
+    "counts_to_binaries",
+    "energy_statistics",
+    "merge_binaries",
+    "select_probabilities",
+]
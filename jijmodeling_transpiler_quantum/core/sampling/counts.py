@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import typing as typ
+
+import numpy as np
+
+# Integer keys up to this number of bits are unpacked by shifts of int64.
+_MAX_SHIFT_BITS = 63
+
+
+def _parse_bitstrings(keys: list[str], num_bits: int) -> np.ndarray:
+    """Rows of '0'/'1' characters, padded with '0' or truncated to `num_bits`."""
+    if any(len(key) != num_bits for key in keys):
+        keys = [key[:num_bits].ljust(num_bits, "0") for key in keys]
+    if num_bits == 0:
+        return np.zeros((len(keys), 0), dtype=np.uint8)
+    buffer = "".join(keys).encode("ascii")
+    characters = np.frombuffer(buffer, dtype=np.uint8).reshape(len(keys), num_bits)
+    return characters - np.uint8(ord("0"))
+
+
+def _unpack_integers(keys: list[int], num_bits: int) -> np.ndarray:
+    """Rows of the bits of the integers, whose k-th column is the bit `(key >> k) & 1`."""
+    if num_bits <= _MAX_SHIFT_BITS:
+        values = np.array(keys, dtype=np.int64).reshape(-1, 1)
+        return ((values >> np.arange(num_bits)) & 1).astype(np.uint8)
+    num_bytes = (num_bits + 7) // 8
+    buffer = b"".join(key.to_bytes(num_bytes, "little") for key in keys)
+    packed = np.frombuffer(buffer, dtype=np.uint8).reshape(len(keys), num_bytes)
+    return np.unpackbits(packed, axis=1, bitorder="little")[:, :num_bits]
+
+
+def merge_binaries(
+    binaries: np.ndarray, weights: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Merge the duplicated rows of a binary matrix and sum their weights.
+
+    The rows are packed into bytes to be compared, and the merged rows keep the order of their first appearance.
+
+    Args:
+        binaries (np.ndarray): binary matrix whose shape is (num_samples, num_bits).
+        weights (np.ndarray): weight of each row, such as the number of occurrences.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: the unique rows and their total weights in the dtype of `weights`.
+
+    Examples:
+        >>> binaries = np.array([[0, 1], [1, 0], [0, 1]], dtype=np.uint8)
+        >>> merge_binaries(binaries, np.array([2, 3, 4]))
+        (array([[0, 1],
+               [1, 0]], dtype=uint8), array([6, 3]))
+
+    """
+    binaries = np.asarray(binaries, dtype=np.uint8)
+    weights = np.asarray(weights)
+    if len(binaries) == 0:
+        return binaries.reshape(0, binaries.shape[-1]), weights
+    packed = np.packbits(binaries, axis=1)
+    keys = np.ascontiguousarray(packed).view(
+        np.dtype((np.void, packed.dtype.itemsize * packed.shape[1]))
+    )
+    _, first, inverse = np.unique(
+        keys.ravel(), return_index=True, return_inverse=True
+    )
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    totals = np.bincount(rank[inverse], weights=weights, minlength=len(order))
+    return binaries[first[order]], totals.astype(weights.dtype)
+
+
+def counts_to_binaries(
+    counts: typ.Mapping[typ.Union[str, int], typ.Union[int, float]],
+    num_bits: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Parse counts of measurement outcomes into a binary matrix at once.
+
+    A key is either a bitstring whose k-th character is the k-th bit, as `decode_from_counts` expects,
+    or an integer whose k-th bit `(key >> k) & 1` is the k-th bit, as the keys of quri-parts samplers
+    and `qk.result.QuasiDistribution`, whose k-th bit is the qubit k.
+    The bitstring of an integer key is therefore `format(key, f"0{num_bits}b")[::-1]`, and `{1: 3}` and `{"10": 3}` are the same counts.
+    Bitstrings are read from one buffer instead of character by character,
+    and the duplicated outcomes, such as bitstrings of different lengths padded with '0', are merged by `merge_binaries`.
+
+    Args:
+        counts (typ.Mapping[typ.Union[str, int], typ.Union[int, float]]): counts of each outcome.
+        num_bits (int): the number of bits.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: the unique rows as a uint8 matrix whose shape is (num_samples, num_bits), and their counts.
+
+    Examples:
+        >>> counts_to_binaries({"01": 3, "10": 1, "0": 2}, 2)
+        (array([[0, 1],
+               [1, 0],
+               [0, 0]], dtype=uint8), array([3, 1, 2]))
+        >>> counts_to_binaries({1: 3, 2: 1, "10": 1}, 2)
+        (array([[1, 0],
+               [0, 1]], dtype=uint8), array([4, 1]))
+
+    """
+    keys = list(counts.keys())
+    weights = np.array(list(counts.values()))
+    if len(keys) == 0:
+        return np.zeros((0, num_bits), dtype=np.uint8), np.zeros(0, dtype=np.int64)
+    is_str = np.array([isinstance(key, str) for key in keys])
+    if is_str.all():
+        binaries = _parse_bitstrings(keys, num_bits)
+    elif not is_str.any():
+        binaries = _unpack_integers([int(key) for key in keys], num_bits)
+    else:
+        binaries = np.empty((len(keys), num_bits), dtype=np.uint8)
+        binaries[is_str] = _parse_bitstrings(
+            [key for key in keys if isinstance(key, str)], num_bits
+        )
+        binaries[~is_str] = _unpack_integers(
+            [int(key) for key in keys if not isinstance(key, str)], num_bits
+        )
+    return merge_binaries(binaries, weights)
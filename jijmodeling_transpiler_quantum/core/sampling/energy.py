@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import dataclasses
+import typing as typ
+
+import numpy as np
+
+from jijmodeling_transpiler_quantum.core.ising_qubo import IsingArrays, IsingModel
+
+from .counts import counts_to_binaries
+from .probabilities import select_probabilities
+
+
+@dataclasses.dataclass
+class EnergyStatistics:
+    """Weighted energies of the unique outcomes of a sampler.
+
+    Attributes:
+        energies (np.ndarray): energy of each unique outcome in the ascending order.
+        weights (np.ndarray): counts or (quasi-)probabilities of each energy.
+    """
+
+    energies: np.ndarray
+    weights: np.ndarray
+
+    def mean(self) -> float:
+        """Weighted mean of the energies."""
+        return float(np.dot(self.energies, self.weights) / self.weights.sum())
+
+    def cvar(self, alpha: float) -> float:
+        """Conditional value at risk, the mean of the lowest `alpha` fraction of the weights.
+
+        The outcome at the boundary contributes only the part of its weight within the fraction.
+
+        Args:
+            alpha (float): the fraction in (0, 1]. `cvar(1.0)` is `mean()`.
+
+        Returns:
+            float: CVaR of the energies.
+        """
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError(f"alpha must be in (0, 1], but got {alpha}.")
+        probabilities = self.weights / self.weights.sum()
+        below = np.concatenate([[0.0], np.cumsum(probabilities)[:-1]])
+        taken = np.clip(alpha - below, 0.0, probabilities)
+        return float(np.dot(self.energies, taken) / alpha)
+
+    def histogram(
+        self, bins: typ.Union[int, np.ndarray] = 10
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Weighted histogram of the energies by `np.histogram`.
+
+        Args:
+            bins (typ.Union[int, np.ndarray], optional): the number of bins or their edges. Defaults to 10.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: total weight of each bin and the edges of the bins.
+        """
+        return np.histogram(self.energies, bins=bins, weights=self.weights)
+
+
+def energy_statistics(
+    ising: typ.Union[IsingModel, IsingArrays],
+    counts: typ.Union[
+        typ.Mapping[typ.Union[str, int], typ.Union[int, float]], np.ndarray
+    ],
+    num_spins: typ.Optional[int] = None,
+    offset: float = 0.0,
+) -> EnergyStatistics:
+    """Energies of counts of measurement outcomes without decoding them.
+
+    The counts are parsed by `counts_to_binaries`, which merges the duplicated outcomes,
+    and the basis states of a probability vector whose probabilities are positive are taken by `select_probabilities`.
+    The energies of the unique outcomes are computed at once by `IsingArrays.calc_energies`
+    with the spin `z = 1 - 2x` of each bit `x`.
+    Convert an `IsingModel` once with `to_arrays` when the same model is evaluated repeatedly.
+
+    Args:
+        ising (typ.Union[IsingModel, IsingArrays]): Ising model.
+        counts (typ.Union[typ.Mapping[typ.Union[str, int], typ.Union[int, float]], np.ndarray]): counts or (quasi-)probabilities of each outcome, whose keys are those of `counts_to_binaries`, or a probability vector whose indices are the integer keys.
+        num_spins (typ.Optional[int], optional): the number of spins. Defaults to that of the model.
+        offset (float, optional): constant added to the energies, such as the constant of the QUBO. Defaults to 0.0.
+
+    Returns:
+        EnergyStatistics: the energies and their weights.
+
+    Examples:
+        >>> ising = IsingModel({(0, 1): 1.0}, {0: 0.5}, 0.0)
+        >>> statistics = energy_statistics(ising, {"00": 1, "10": 2, "11": 1})
+        >>> statistics.energies, statistics.weights
+        (array([-1.5,  0.5,  1.5]), array([2, 1, 1]))
+        >>> statistics.mean(), statistics.cvar(0.25)
+        (-0.25, -1.5)
+        >>> energy_statistics(ising, np.array([0.0, 0.75, 0.25, 0.0])).energies
+        array([-1.5, -0.5])
+
+    """
+    if isinstance(ising, IsingModel):
+        ising = ising.to_arrays(num_spins=num_spins)
+    elif num_spins is not None:
+        ising = dataclasses.replace(ising, num_spins=num_spins)
+    if isinstance(counts, typ.Mapping):
+        binaries, weights = counts_to_binaries(counts, ising.num_spins)
+    else:
+        binaries, weights = select_probabilities(counts, ising.num_spins)
+    energies = ising.calc_energies(1 - 2 * binaries.astype(np.int64)) + offset
+    order = np.argsort(energies, kind="stable")
+    return EnergyStatistics(energies[order], weights[order])
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import typing as typ
+
+import numpy as np
+
+from .counts import _unpack_integers
+
+
+def select_probabilities(
+    probabilities: typ.Union[np.ndarray, typ.Mapping[int, float]],
+    num_bits: typ.Optional[int] = None,
+    top_k: typ.Optional[int] = None,
+    threshold: float = 0.0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Select the most probable outcomes of a probability vector or a quasi-distribution.
+
+    The outcomes whose probabilities are larger than `threshold` are kept,
+    and the `top_k` largest of them are selected by `np.argpartition` without sorting all of them.
+    Only the selected indices are converted to bits, and the probabilities are kept as they are,
+    so that no outcome is lost by rounding them to counts.
+
+    Args:
+        probabilities (typ.Union[np.ndarray, typ.Mapping[int, float]]): probability of each basis state, or a mapping from integers to (quasi-)probabilities. The k-th bit of an index is the k-th bit of the outcome, as the integer keys of `counts_to_binaries`. It is the qubit k of the statevectors of qiskit and quri-parts, `qk.result.QuasiDistribution` and `DiagonalQAOASimulator.probabilities`.
+        num_bits (typ.Optional[int], optional): the number of bits. Defaults to log2 of the length of the vector. Required for a mapping.
+        top_k (typ.Optional[int], optional): the maximum number of outcomes. Defaults to None (all of them).
+        threshold (float, optional): outcomes whose probabilities are not larger than it are dropped. Defaults to 0.0.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: the selected outcomes as a uint8 matrix whose shape is (num_samples, num_bits), and their probabilities, in the descending order of the probabilities.
+
+    Examples:
+        >>> select_probabilities(np.array([0.1, 0.0, 0.6, 0.3]), top_k=2)
+        (array([[0, 1],
+               [1, 1]], dtype=uint8), array([0.6, 0.3]))
+        >>> select_probabilities({1: 0.5, 2: -0.1, 0: 0.6}, num_bits=2)
+        (array([[0, 0],
+               [1, 0]], dtype=uint8), array([0.6, 0.5]))
+
+    """
+    if isinstance(probabilities, typ.Mapping):
+        if num_bits is None:
+            raise ValueError("num_bits is required for a mapping of probabilities.")
+        indices = np.fromiter(probabilities.keys(), dtype=np.int64)
+        values = np.fromiter(probabilities.values(), dtype=np.float64)
+    else:
+        values = np.asarray(probabilities, dtype=np.float64).ravel()
+        indices = None
+        if num_bits is None:
+            num_bits = max(len(values) - 1, 0).bit_length()
+
+    selected = np.flatnonzero(values > threshold)
+    if top_k is not None and top_k < len(selected):
+        largest = np.argpartition(-values[selected], top_k - 1)[:top_k]
+        selected = selected[largest]
+    # Descending probabilities, ties broken by the position.
+    selected = selected[np.lexsort((selected, -values[selected]))]
+
+    outcomes = selected if indices is None else indices[selected]
+    binaries = _unpack_integers(outcomes.tolist(), num_bits)
+    return binaries, values[selected]
@@ -1,5 +1,7 @@
 from jijmodeling_transpiler_quantum.qiskit import qaoa as qaoa
 from jijmodeling_transpiler_quantum.qiskit import qrao as qrao
+from .parametric_hamiltonian import ParametricHamiltonian
+from .pauli_ir import pauli_ir_to_sparse_pauli_op
 from .qaoa.to_qaoa import transpile_to_qaoa_ansatz
 from .qrao.to_qrac import (
     transpile_to_qrac31_hamiltonian,
@@ -11,6 +13,8 @@ from .qrao.to_qrac import (
 __all__ = [
     "qaoa",
     "qrao",
+    "ParametricHamiltonian",
+    "pauli_ir_to_sparse_pauli_op",
     "transpile_to_qaoa_ansatz",
     "transpile_to_qrac31_hamiltonian",
     "transpile_to_qrac21_hamiltonian",
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import dataclasses
+import typing as typ
+
+import numpy as np
+import qiskit.quantum_info as qk_info
+
+from jijmodeling_transpiler_quantum.core.ising_qubo.parametric import (
+    ParametricIsingModel,
+    align_terms,
+)
+
+
+@dataclasses.dataclass
+class ParametricHamiltonian:
+    """Hamiltonian whose coefficients are affine in the penalty multipliers.
+
+    The objective and each penalty are encoded into Pauli operators once and aligned on one shared list of Pauli strings.
+    The k-th row of `coeffs` and `offsets` is the k-th component, and row 0 is the objective.
+    `with_multipliers` only takes a weighted sum of the rows, so that a sweep over multipliers does not
+    rebuild the QUBO, the Ising model or the Pauli terms.
+    """
+
+    labels: list[str]
+    paulis: qk_info.PauliList
+    coeffs: np.ndarray
+    offsets: np.ndarray
+
+    @classmethod
+    def from_operators(
+        cls,
+        labels: list[str],
+        operators: list[qk_info.SparsePauliOp],
+        offsets: typ.Sequence[float],
+    ) -> ParametricHamiltonian:
+        """Align the operators of the objective and the penalties on their shared Pauli strings.
+
+        Args:
+            labels (list[str]): labels of the penalties.
+            operators (list[qk_info.SparsePauliOp]): operators of the objective and the penalties on the same number of qubits.
+            offsets (typ.Sequence[float]): constant terms of the objective and the penalties.
+
+        Returns:
+            ParametricHamiltonian: aligned Hamiltonian.
+        """
+        z = np.concatenate([op.paulis.z for op in operators])
+        x = np.concatenate([op.paulis.x for op in operators])
+        _, keys = np.unique(
+            np.packbits(np.hstack([z, x]), axis=1), axis=0, return_inverse=True
+        )
+        keys = keys.reshape(-1)
+        sections = np.cumsum([len(op) for op in operators])[:-1]
+        first, coeffs = align_terms(
+            np.split(keys, sections), [op.coeffs for op in operators]
+        )
+        return cls(
+            labels=list(labels),
+            paulis=qk_info.PauliList.from_symplectic(z[first], x[first]),
+            coeffs=coeffs,
+            offsets=np.asarray(offsets, dtype=np.float64),
+        )
+
+    @classmethod
+    def from_ising(
+        cls, model: ParametricIsingModel, n_qubit: int
+    ) -> ParametricHamiltonian:
+        """Ising Hamiltonian of `Z` and `ZZ` terms, as `to_ising_operator_from_qubo`.
+
+        Args:
+            model (ParametricIsingModel): decomposed Ising model.
+            n_qubit (int): the number of qubits.
+
+        Returns:
+            ParametricHamiltonian: Ising Hamiltonian.
+        """
+        n_qubit = max(1, n_qubit)
+        num_linear = len(model.linear_index)
+        num_terms = num_linear + len(model.quad_row)
+        z = np.zeros((num_terms, n_qubit), dtype=bool)
+        z[np.arange(num_linear), model.linear_index] = True
+        z[np.arange(num_linear, num_terms), model.quad_row] = True
+        z[np.arange(num_linear, num_terms), model.quad_col] = True
+        return cls(
+            labels=list(model.labels),
+            paulis=qk_info.PauliList.from_symplectic(z, np.zeros_like(z)),
+            coeffs=np.hstack([model.linear_coeffs, model.quad_coeffs]),
+            offsets=model.ising_constants + model.qubo_constants,
+        )
+
+    def weights(self, multipliers: typ.Optional[dict[str, float]] = None) -> np.ndarray:
+        """Weights of the components. A penalty missing in `multipliers` has weight 1 as in `PuboBuilder`."""
+        multipliers = multipliers or {}
+        return np.array(
+            [1.0] + [float(multipliers.get(label, 1.0)) for label in self.labels]
+        )
+
+    def with_multipliers(
+        self, multipliers: typ.Optional[dict[str, float]] = None
+    ) -> tuple[qk_info.SparsePauliOp, float]:
+        """Hamiltonian for the given multipliers in O(terms).
+
+        Args:
+            multipliers (typ.Optional[dict[str, float]], optional): a multiplier for each penalty. Defaults to None.
+
+        Returns:
+            tuple[qk_info.SparsePauliOp, float]: Hamiltonian and constant term, as `get_hamiltonian` with the same multipliers.
+        """
+        weights = self.weights(multipliers)
+        coeffs = weights @ self.coeffs
+        # Remove paulis whose coefficients are zeros as `simplify(atol=0)`.
+        nonzero = coeffs != 0
+        if nonzero.any():
+            operator = qk_info.SparsePauliOp(self.paulis[nonzero], coeffs[nonzero])
+        else:
+            operator = qk_info.SparsePauliOp("I" * self.paulis.num_qubits, 0)
+        return operator, float(weights @ self.offsets)
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import qiskit.quantum_info as qk_info
+
+from jijmodeling_transpiler_quantum.core.pauli import PauliIR
+
+
+def pauli_ir_to_sparse_pauli_op(ir: PauliIR) -> qk_info.SparsePauliOp:
+    """Export a `PauliIR` to qiskit.
+
+    The symplectic matrices of all the terms are filled at once, and the terms are not merged again.
+
+    Args:
+        ir (PauliIR): operator.
+
+    Returns:
+        qk_info.SparsePauliOp: Pauli operator. If there is no term, the identity whose coefficient is 0.
+
+    Examples:
+        >>> from jijmodeling_transpiler_quantum.core.ising_qubo import IsingModel
+        >>> from jijmodeling_transpiler_quantum.core.pauli import ising_to_pauli_ir
+        >>> ir, _ = ising_to_pauli_ir(IsingModel(quad={(0, 1): 2.0}, linear={1: -1.0}, constant=0.0), 2)
+        >>> pauli_ir_to_sparse_pauli_op(ir)
+        SparsePauliOp(['ZI', 'ZZ'],
+                      coeffs=[-1.+0.j,  2.+0.j])
+
+    """
+    if len(ir) == 0:
+        # If there is no variable, we set num_nodes=1 so that qubit_op should be an operator.
+        # If num_nodes=0, I^0 = 1 (int).
+        return qk_info.SparsePauliOp("I" * max(1, ir.num_qubits), 0)
+    z, x = ir.to_symplectic()
+    return qk_info.SparsePauliOp(qk_info.PauliList.from_symplectic(z, x), ir.coeffs)
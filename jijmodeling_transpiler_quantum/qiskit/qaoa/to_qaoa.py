@@ -4,11 +4,34 @@ import typing as typ
 
 import jijmodeling as jm
 import jijmodeling_transpiler as jmt
+import numpy as np
 import qiskit as qk
 import qiskit.quantum_info as qk_info
 
-from jijmodeling_transpiler_quantum.core import qubo_to_ising
+from jijmodeling_transpiler_quantum.core import qubo_to_ising, qubo_to_ising_arrays
+from jijmodeling_transpiler_quantum.core.cache import (
+    HamiltonianCache,
+    cached_hamiltonian,
+)
+from jijmodeling_transpiler_quantum.core.ising_qubo import (
+    ParametricIsingModel,
+    refine_binaries,
+)
+from jijmodeling_transpiler_quantum.core.qaoa import (
+    DiagonalQAOASimulator,
+    LightconeQAOAEngine,
+    P1ExpectationEvaluator,
+    rqaoa,
+)
+from jijmodeling_transpiler_quantum.core.sampling import (
+    EnergyStatistics,
+    counts_to_binaries,
+    energy_statistics,
+    merge_binaries,
+    select_probabilities,
+)
 
+from ..parametric_hamiltonian import ParametricHamiltonian
 from .ising_hamiltonian import to_ising_operator_from_qubo
 
 
@@ -22,11 +45,15 @@ class QAOAAnsatzBuilder:
         self.pubo_builder = pubo_builder
         self.num_vars = num_vars
         self.compiled_instance = compiled_instance
+        # Set a HamiltonianCache to reuse the Hamiltonians of equal multipliers.
+        # The cached objects are shared by the callers, so they must not be modified in place.
+        self.hamiltonian_cache: typ.Optional[HamiltonianCache] = None
 
     @property
     def var_map(self) -> dict[str, tuple[int, ...]]:
         return self.compiled_instance.var_map.var_map
 
+    @cached_hamiltonian
     def get_hamiltonian(
         self,
         multipliers: typ.Optional[dict[str, float]] = None,
@@ -42,6 +69,28 @@ class QAOAAnsatzBuilder:
         )
         return ising_operator, ising_const + constant
 
+    def get_parametric_hamiltonian(
+        self,
+        detail_parameters: typ.Optional[
+            dict[str, dict[tuple[int, ...], tuple[float, float]]]
+        ] = None,
+    ) -> ParametricHamiltonian:
+        """Get the Ising Hamiltonian as a function of the multipliers.
+
+        `get_parametric_hamiltonian().with_multipliers(multipliers)` returns the same Hamiltonian
+        as `get_hamiltonian(multipliers)` without rebuilding the QUBO for every multipliers.
+
+        Args:
+            detail_parameters (typ.Optional[ dict[str, dict[tuple[int, ...], tuple[float, float]]] ], optional): detail parameters for each penalty. Defaults to None.
+
+        Returns:
+            ParametricHamiltonian: Ising Hamiltonian decomposed into the objective and each penalty.
+        """
+        model = ParametricIsingModel.from_pubo_builder(
+            self.pubo_builder, self.num_vars, detail_parameters=detail_parameters
+        )
+        return ParametricHamiltonian.from_ising(model, self.num_vars)
+
     def get_qaoa_ansatz(
         self,
         p: int,
@@ -56,14 +105,252 @@ class QAOAAnsatzBuilder:
         qaoa_ansatz = qk.circuit.library.QAOAAnsatz(ising_operator, reps=p)
         return qaoa_ansatz, ising_operator, constant
 
-    def decode_from_counts(self, counts: dict[str, int]) -> jm.SampleSet:
-        samples = []
-        num_occurrences = []
-        for binary_str, count_num in counts.items():
-            binary_values = {idx: int(b) for idx, b in enumerate(binary_str)}
-            samples.append(binary_values)
-            num_occurrences.append(count_num)
+    def get_qaoa_simulator(
+        self,
+        multipliers: typ.Optional[dict[str, float]] = None,
+        detail_parameters: typ.Optional[
+            dict[str, dict[tuple[int, ...], tuple[float, float]]]
+        ] = None,
+        dtype: typ.Union[type, np.dtype] = np.complex128,
+        num_workers: typ.Optional[int] = None,
+    ) -> DiagonalQAOASimulator:
+        """Get a statevector simulator of the QAOA ansatz.
+
+        The simulator computes the states of `get_qaoa_ansatz` without building circuits.
+        The parameters of `QAOAAnsatz` are sorted as `[beta_0, ..., beta_{p-1}, gamma_0, ..., gamma_{p-1}]`,
+        so that `simulator.expectation(parameters[p:], parameters[:p])` is the expectation of the ansatz.
+        The energies include the constant of `get_hamiltonian`, and the bitstrings of `top_k` are those of `decode_from_counts`.
+        `probabilities` can be passed to `decode_from_probs` and `get_energy_statistics` as it is.
+
+        Args:
+            multipliers (typ.Optional[dict[str, float]], optional): multipliers for each penalty. Defaults to None.
+            detail_parameters (typ.Optional[ dict[str, dict[tuple[int, ...], tuple[float, float]]] ], optional): detail parameters for each penalty. Defaults to None.
+            dtype (typ.Union[type, np.dtype], optional): np.complex128 or np.complex64 for the statevector. Defaults to np.complex128.
+            num_workers (typ.Optional[int], optional): the number of threads. Defaults to `os.cpu_count()`.
+
+        Returns:
+            DiagonalQAOASimulator: simulator of the QAOA ansatz.
+        """
+        qubo, constant = self.pubo_builder.get_qubo_dict(
+            multipliers=multipliers, detail_parameters=detail_parameters
+        )
+        return DiagonalQAOASimulator(
+            qubo_to_ising_arrays(qubo, num_spins=self.num_vars),
+            self.num_vars,
+            offset=constant,
+            dtype=dtype,
+            num_workers=num_workers,
+        )
+
+    def get_qaoa_p1_evaluator(
+        self,
+        multipliers: typ.Optional[dict[str, float]] = None,
+        detail_parameters: typ.Optional[
+            dict[str, dict[tuple[int, ...], tuple[float, float]]]
+        ] = None,
+    ) -> P1ExpectationEvaluator:
+        """Get the closed-form energy of the QAOA ansatz with one layer.
+
+        The evaluator needs no statevector, so that it warm-starts `get_qaoa_ansatz` beyond the size of simulators.
+        Its parameters (gamma, beta) are `[beta_0, gamma_0]` of `QAOAAnsatz` for p=1,
+        and the energy includes the constant of `get_hamiltonian`.
+
+        Args:
+            multipliers (typ.Optional[dict[str, float]], optional): multipliers for each penalty. Defaults to None.
+            detail_parameters (typ.Optional[ dict[str, dict[tuple[int, ...], tuple[float, float]]] ], optional): detail parameters for each penalty. Defaults to None.
+
+        Returns:
+            P1ExpectationEvaluator: evaluator of the energy and its gradient.
+        """
+        qubo, constant = self.pubo_builder.get_qubo_dict(
+            multipliers=multipliers, detail_parameters=detail_parameters
+        )
+        return P1ExpectationEvaluator(
+            qubo_to_ising_arrays(qubo, num_spins=self.num_vars),
+            self.num_vars,
+            offset=constant,
+        )
+
+    def get_qaoa_lightcone_engine(
+        self,
+        p: int,
+        multipliers: typ.Optional[dict[str, float]] = None,
+        detail_parameters: typ.Optional[
+            dict[str, dict[tuple[int, ...], tuple[float, float]]]
+        ] = None,
+        max_qubits: int = 20,
+        n_jobs: typ.Optional[int] = None,
+    ) -> LightconeQAOAEngine:
+        """Get the energy of the QAOA ansatz computed on the reverse lightcones of the terms.
+
+        The engine simulates only the p-hop neighbourhood of each term, so that it tunes the ansatz of `get_qaoa_ansatz`
+        on sparse instances too large for a statevector. The parameters of `QAOAAnsatz` are sorted as
+        `[beta_0, ..., beta_{p-1}, gamma_0, ..., gamma_{p-1}]`, so that `engine.expectation(parameters[p:], parameters[:p])`
+        is the expectation of the ansatz, and it includes the constant of `get_hamiltonian`.
+
+        Args:
+            p (int): the number of layers.
+            multipliers (typ.Optional[dict[str, float]], optional): multipliers for each penalty. Defaults to None.
+            detail_parameters (typ.Optional[ dict[str, dict[tuple[int, ...], tuple[float, float]]] ], optional): detail parameters for each penalty. Defaults to None.
+            max_qubits (int, optional): the maximum number of qubits in a lightcone. Defaults to 20.
+            n_jobs (typ.Optional[int], optional): the number of processes. Defaults to None.
+
+        Returns:
+            LightconeQAOAEngine: engine of the energy.
+        """
+        qubo, constant = self.pubo_builder.get_qubo_dict(
+            multipliers=multipliers, detail_parameters=detail_parameters
+        )
+        return LightconeQAOAEngine(
+            qubo_to_ising_arrays(qubo, num_spins=self.num_vars),
+            p,
+            self.num_vars,
+            offset=constant,
+            max_qubits=max_qubits,
+            n_jobs=n_jobs,
+        )
+
+    def get_qaoa_value_and_grad(
+        self,
+        multipliers: typ.Optional[dict[str, float]] = None,
+        detail_parameters: typ.Optional[
+            dict[str, dict[tuple[int, ...], tuple[float, float]]]
+        ] = None,
+        dtype: typ.Union[type, np.dtype] = np.complex128,
+        num_workers: typ.Optional[int] = None,
+    ) -> typ.Callable[[np.ndarray], tuple[float, np.ndarray]]:
+        """Get the energy of the QAOA ansatz and its gradient as a function of the parameters.
+
+        The function takes the parameters of `QAOAAnsatz` of `get_qaoa_ansatz`, `[beta_0, ..., beta_{p-1}, gamma_0, ..., gamma_{p-1}]`,
+        and returns the expectation including the constant of `get_hamiltonian` and its gradient in the same order,
+        which are computed by the adjoint method of `DiagonalQAOASimulator.value_and_grad`.
+        Pass it to `scipy.optimize.minimize(value_and_grad, x0, jac=True)`.
+
+        Args:
+            multipliers (typ.Optional[dict[str, float]], optional): multipliers for each penalty. Defaults to None.
+            detail_parameters (typ.Optional[ dict[str, dict[tuple[int, ...], tuple[float, float]]] ], optional): detail parameters for each penalty. Defaults to None.
+            dtype (typ.Union[type, np.dtype], optional): np.complex128 or np.complex64 for the statevector. Defaults to np.complex128.
+            num_workers (typ.Optional[int], optional): the number of threads. Defaults to `os.cpu_count()`.
+
+        Returns:
+            typ.Callable[[np.ndarray], tuple[float, np.ndarray]]: function from the parameters to the energy and its gradient.
+        """
+        simulator = self.get_qaoa_simulator(
+            multipliers, detail_parameters, dtype=dtype, num_workers=num_workers
+        )
 
+        def value_and_grad(parameters: np.ndarray) -> tuple[float, np.ndarray]:
+            parameters = np.asarray(parameters, dtype=np.float64)
+            p = len(parameters) // 2
+            value, grad_gammas, grad_betas = simulator.value_and_grad(
+                parameters[p:], parameters[:p]
+            )
+            return value, np.concatenate([grad_betas, grad_gammas])
+
+        return value_and_grad
+
+    def run_rqaoa(
+        self,
+        multipliers: typ.Optional[dict[str, float]] = None,
+        detail_parameters: typ.Optional[
+            dict[str, dict[tuple[int, ...], tuple[float, float]]]
+        ] = None,
+        cutoff: int = 10,
+    ) -> jm.SampleSet:
+        """Solve the QUBO by recursive QAOA and decode the solution.
+
+        Each round of `rqaoa` optimizes QAOA with one layer by the closed form of `get_qaoa_p1_evaluator`
+        and eliminates the most correlated variable, until at most `cutoff` variables are coupled and solved exactly.
+
+        Args:
+            multipliers (typ.Optional[dict[str, float]], optional): multipliers for each penalty. Defaults to None.
+            detail_parameters (typ.Optional[ dict[str, dict[tuple[int, ...], tuple[float, float]]] ], optional): detail parameters for each penalty. Defaults to None.
+            cutoff (int, optional): the maximum number of coupled variables solved exactly. Defaults to 10.
+
+        Returns:
+            jm.SampleSet: The decoded sample set of the solution.
+        """
+        qubo, _ = self.pubo_builder.get_qubo_dict(
+            multipliers=multipliers, detail_parameters=detail_parameters
+        )
+        result = rqaoa(
+            qubo_to_ising_arrays(qubo, num_spins=self.num_vars), cutoff=cutoff
+        )
+        # z = 1 - 2x
+        binary_str = "".join("0" if spin > 0 else "1" for spin in result.spins)
+        return self.decode_from_counts({binary_str: 1})
+
+    def get_energy_statistics(
+        self,
+        counts: typ.Union[
+            typ.Mapping[typ.Union[str, int], typ.Union[int, float]], np.ndarray
+        ],
+        multipliers: typ.Optional[dict[str, float]] = None,
+        detail_parameters: typ.Optional[
+            dict[str, dict[tuple[int, ...], tuple[float, float]]]
+        ] = None,
+    ) -> EnergyStatistics:
+        """Get the energies of the sampled bitstrings without decoding them.
+
+        The unique bitstrings are evaluated at once on the Ising model by `energy_statistics`,
+        and the mean, CVaR and histogram of the energies are weighted by their counts.
+        The energies include the constant of `get_hamiltonian`, so that they are the values of the QUBO.
+
+        Args:
+            counts (typ.Union[typ.Mapping[typ.Union[str, int], typ.Union[int, float]], np.ndarray]): the counts or a `qk.result.QuasiDistribution`, whose keys are bitstrings or integers as those of `decode_from_counts`, or a probability vector such as `qk_info.Statevector.probabilities()`, whose indices are the integer keys.
+            multipliers (typ.Optional[dict[str, float]], optional): multipliers for each penalty. Defaults to None.
+            detail_parameters (typ.Optional[ dict[str, dict[tuple[int, ...], tuple[float, float]]] ], optional): detail parameters for each penalty. Defaults to None.
+
+        Returns:
+            EnergyStatistics: the energies and their weights.
+        """
+        qubo, constant = self.pubo_builder.get_qubo_dict(
+            multipliers=multipliers, detail_parameters=detail_parameters
+        )
+        return energy_statistics(
+            qubo_to_ising_arrays(qubo, num_spins=self.num_vars),
+            counts,
+            offset=constant,
+        )
+
+    def decode_from_counts(
+        self,
+        counts: dict[typ.Union[str, int], int],
+        local_search: bool = False,
+        multipliers: typ.Optional[dict[str, float]] = None,
+        detail_parameters: typ.Optional[
+            dict[str, dict[tuple[int, ...], tuple[float, float]]]
+        ] = None,
+    ) -> jm.SampleSet:
+        """Decode the result from the counts.
+
+        Args:
+            counts (dict[typ.Union[str, int], int]): The counts to be decoded. A key is a bitstring whose k-th character is the k-th variable, or an integer whose k-th bit is the k-th variable, as the keys of quri-parts samplers and `qk.result.QuasiDistribution`. Duplicated outcomes are merged.
+            local_search (bool, optional): refine each bitstring by 1-flip and 2-flip steepest descent on the QUBO before decoding. Defaults to False.
+            multipliers (typ.Optional[dict[str, float]], optional): multipliers of the QUBO used by the local search. Use the same ones as `get_hamiltonian`. Defaults to None.
+            detail_parameters (typ.Optional[ dict[str, dict[tuple[int, ...], tuple[float, float]]] ], optional): detail parameters of the QUBO used by the local search. Defaults to None.
+
+        Returns:
+            jm.SampleSet: The decoded sample set.
+        """
+        binaries, num_occurrences = counts_to_binaries(counts, self.num_vars)
+        if local_search:
+            qubo, _ = self.pubo_builder.get_qubo_dict(
+                multipliers=multipliers, detail_parameters=detail_parameters
+            )
+            binaries, num_occurrences = merge_binaries(
+                refine_binaries(qubo, binaries), num_occurrences
+            )
+        return self._decode_binaries(binaries, num_occurrences.tolist())
+
+    def _decode_binaries(
+        self,
+        binaries: np.ndarray,
+        num_occurrences: list,
+        metadata: typ.Optional[dict] = None,
+    ) -> jm.SampleSet:
+        """Decode the rows of a binary matrix in one batch."""
+        samples = [dict(enumerate(row)) for row in binaries.tolist()]
         binary_encoder = self.pubo_builder.binary_encoder
         decoded: jm.SampleSet = (
             jmt.core.pubo.binary_decode.decode_from_dict_binary_result(
@@ -77,14 +364,76 @@ class QAOAAnsatzBuilder:
             ),
             evaluation=decoded.evaluation,
             measuring_time=decoded.measuring_time,
-            metadata=decoded.metadata,
+            metadata={**decoded.metadata, **(metadata or {})},
         )
         return decoded
 
+    def _decode_probabilities(
+        self, binaries: np.ndarray, probabilities: np.ndarray
+    ) -> jm.SampleSet:
+        """Decode the selected outcomes with their probabilities in the metadata."""
+        return self._decode_binaries(
+            binaries,
+            [1] * len(binaries),
+            metadata={"probabilities": probabilities.tolist()},
+        )
+
+    def decode_from_probs(
+        self,
+        probs: np.ndarray,
+        top_k: typ.Optional[int] = None,
+        threshold: float = 0.0,
+    ) -> jm.SampleSet:
+        """Decode the most probable basis states of a probability vector.
+
+        Only the `top_k` states whose probabilities are larger than `threshold` are decoded by `select_probabilities`.
+        Each state occurs once in the record, in the descending order of the probabilities,
+        and `metadata["probabilities"]` holds their probabilities in the same order.
+
+        Args:
+            probs (np.ndarray): probability of each basis state, such as `qk_info.Statevector.probabilities()`. The k-th bit of an index is the qubit k, which is the k-th variable, as the keys of `decode_from_quasi_dist`.
+            top_k (typ.Optional[int], optional): the maximum number of states. Defaults to None (all of them).
+            threshold (float, optional): states whose probabilities are not larger than it are dropped. Defaults to 0.0.
+
+        Returns:
+            jm.SampleSet: The decoded sample set.
+        """
+        binaries, probabilities = select_probabilities(
+            probs, self.num_vars, top_k=top_k, threshold=threshold
+        )
+        return self._decode_probabilities(binaries, probabilities)
+
     def decode_from_quasi_dist(
-        self, quasi_dist: qk.result.QuasiDistribution
+        self,
+        quasi_dist: qk.result.QuasiDistribution,
+        top_k: typ.Optional[int] = None,
+        threshold: typ.Optional[float] = None,
     ) -> jm.SampleSet:
-        binary_prob: dict[str, float] = quasi_dist.binary_probabilities()
+        """Decode the result from the quasi-distribution.
+
+        By default, the quasi-probabilities are converted to counts of `quasi_dist.shots` (or a guessed number of shots)
+        and truncated, so that unlikely states are dropped.
+        If `top_k` or `threshold` is given, the `top_k` states whose quasi-probabilities are larger than `threshold`
+        are decoded with their quasi-probabilities in `metadata["probabilities"]` as `decode_from_probs`.
+        Both read the k-th bit of a key as the qubit k, which is the k-th variable, as `qk.result.QuasiDistribution` numbers the qubits,
+        so that they assign the same variables.
+
+        Args:
+            quasi_dist (qk.result.QuasiDistribution): The quasi-distribution to be decoded.
+            top_k (typ.Optional[int], optional): the maximum number of states. Defaults to None.
+            threshold (typ.Optional[float], optional): states whose quasi-probabilities are not larger than it are dropped. Defaults to None.
+
+        Returns:
+            jm.SampleSet: The decoded sample set.
+        """
+        if top_k is not None or threshold is not None:
+            binaries, probabilities = select_probabilities(
+                quasi_dist,
+                self.num_vars,
+                top_k=top_k,
+                threshold=0.0 if threshold is None else threshold,
+            )
+            return self._decode_probabilities(binaries, probabilities)
 
         shots: int
         if quasi_dist.shots:
@@ -95,9 +444,7 @@ class QAOAAnsatzBuilder:
             else:
                 shots = 30000
 
-        binary_counts = {
-            key: int(prob * shots) for key, prob in binary_prob.items()
-        }
+        binary_counts = {key: int(prob * shots) for key, prob in quasi_dist.items()}
 
         return self.decode_from_counts(binary_counts)
 
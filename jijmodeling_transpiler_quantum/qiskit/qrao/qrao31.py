@@ -3,6 +3,8 @@ import enum
 import numpy as np
 import qiskit.quantum_info as qk_ope
 from jijmodeling_transpiler_quantum.core.ising_qubo import IsingModel
+from jijmodeling_transpiler_quantum.core.pauli import PauliIR, encode_ising_pauli_ir
+from ..pauli_ir import pauli_ir_to_sparse_pauli_op
 
 
 class Pauli(enum.Enum):
@@ -50,53 +52,50 @@ def create_pauli_term(operators: list[Pauli], indices: list[int], n_qubit: int):
     return qk_ope.SparsePauliOp(qk_ope.Pauli((z_p, x_p)))
 
 
-def qrac31_encode_ising(
-    ising: IsingModel, color_group: dict[int, list[int]]
-) -> tuple[qk_ope.SparsePauliOp, float, dict[int, tuple[int, Pauli]]]:
-    encoded_ope = color_group_to_qrac_encode(color_group)
-
-    pauli_terms: list[qk_ope.SparsePauliOp] = []
-
-    offset = ising.constant
-    n_qubit = len(color_group)
-
-    # convert linear parts of the objective function into Hamiltonian.
-    for idx, coeff in ising.linear.items():
-        if coeff == 0.0:
-            continue
-
-        color, pauli_kind = encoded_ope[idx]
-        pauli_operator = create_pauli_term([pauli_kind], [color], n_qubit)
-
-        pauli_terms.append(qk_ope.SparsePauliOp(pauli_operator, np.sqrt(3) * coeff))
-
-    # create Pauli terms
-    for (i, j), coeff in ising.quad.items():
-        if coeff == 0.0:
-            continue
+def create_pauli_operator(
+    terms: np.ndarray,
+    qubits: np.ndarray,
+    kinds: np.ndarray,
+    coeffs: np.ndarray,
+    n_qubit: int,
+) -> qk_ope.SparsePauliOp:
+    """Build a Pauli operator from single-qubit Paulis through `PauliIR.from_terms`.
 
-        if i == j:
-            offset += coeff
-            continue
+    The k-th single-qubit Pauli whose kind is `kinds[k]` (the value of `Pauli`) acts on the qubit `qubits[k]`
+    in the term `terms[k]`, and `coeffs[t]` is the coefficient of the term t.
+    As `sum` of `create_pauli_term` followed by `simplify(atol=0)`, equal terms are merged
+    in the order of their first appearance, and the terms whose coefficients are zeros are removed.
 
-        color_i, pauli_kind_i = encoded_ope[i]
-
-        color_j, pauli_kind_j = encoded_ope[j]
+    Args:
+        terms (np.ndarray): term of each single-qubit Pauli.
+        qubits (np.ndarray): qubit of each single-qubit Pauli.
+        kinds (np.ndarray): kind of each single-qubit Pauli.
+        coeffs (np.ndarray): coefficient of each term.
+        n_qubit (int): the number of qubits.
 
-        pauli_ope = create_pauli_term(
-            [pauli_kind_i, pauli_kind_j], [color_i, color_j], n_qubit
-        )
+    Returns:
+        qk_ope.SparsePauliOp: Pauli operator. If all the terms vanish, the identity whose coefficient is 0.
 
-        pauli_terms.append(qk_ope.SparsePauliOp(pauli_ope, 3 * coeff))
+    Examples:
+        >>> op = create_pauli_operator(
+        ...     np.array([0, 1, 1, 2]),
+        ...     np.array([0, 0, 1, 0]),
+        ...     np.array([Pauli.X.value, Pauli.X.value, Pauli.Y.value, Pauli.X.value]),
+        ...     np.array([1.0, 2.0, 3.0]),
+        ...     2,
+        ... )
+        >>> op.paulis, op.coeffs
+        (PauliList(['IX', 'YX']), array([4.+0.j, 2.+0.j]))
 
-    if pauli_terms:
-        # Remove paulis whose coefficients are zeros.
+    """
+    ir = PauliIR.from_terms(terms, qubits, kinds, coeffs, n_qubit)
+    return pauli_ir_to_sparse_pauli_op(ir)
 
-        qubit_op = sum(pauli_terms).simplify(atol=0)
-    else:
-        # If there is no variable, we set num_nodes=1 so that qubit_op should be an operator.
-        # If num_nodes=0, I^0 = 1 (int).
-        n_qubit = max(1, n_qubit)
-        qubit_op = qk_ope.SparsePauliOp("I" * n_qubit, 0)
 
-    return qubit_op, offset, encoded_ope
+def qrac31_encode_ising(
+    ising: IsingModel, color_group: dict[int, list[int]]
+) -> tuple[qk_ope.SparsePauliOp, float, dict[int, tuple[int, Pauli]]]:
+    encoded_ope = color_group_to_qrac_encode(color_group)
+    n_qubit = len(color_group)
+    ir, offset = encode_ising_pauli_ir(ising, encoded_ope, n_qubit, np.sqrt(3), 3)
+    return pauli_ir_to_sparse_pauli_op(ir), offset, encoded_ope
@@ -8,7 +8,14 @@ import qiskit.quantum_info as qk_info
 import jijmodeling as jm
 import jijmodeling_transpiler as jmt
 import jijmodeling_transpiler_quantum.core as jmt_qc
-
+from jijmodeling_transpiler_quantum.core.cache import (
+    ColoringCache,
+    HamiltonianCache,
+    graph_fingerprint,
+    cached_hamiltonian,
+)
+
+from ..parametric_hamiltonian import ParametricHamiltonian
 from .qrao31 import qrac31_encode_ising, Pauli
 from .qrao21 import qrac21_encode_ising
 from .qrao32 import qrac32_encode_ising
@@ -20,9 +27,23 @@ class QRACBuilder(ABC):
         self,
         pubo_builder: jmt.core.pubo.PuboBuilder,
         compiled_instance: jmt.core.CompiledInstance,
+        coloring_strategy: jmt_qc.ColoringStrategy = jmt_qc.ColoringStrategy.GREEDY,
     ) -> None:
         self.pubo_builder = pubo_builder
         self.compiled_instance = compiled_instance
+        self.coloring_strategy = jmt_qc.ColoringStrategy(coloring_strategy)
+        # Set a HamiltonianCache to reuse the Hamiltonians of equal multipliers.
+        # The cached objects are shared by the callers, so they must not be modified in place.
+        self.hamiltonian_cache: typ.Optional[HamiltonianCache] = None
+        # Set a ColoringCache to reuse the colorings of equal interaction graphs, which rarely change with the multipliers.
+        # It can be shared by the builders or stored on the disk.
+        self.coloring_cache: typ.Optional[ColoringCache] = None
+        # Set True to repair the last coloring when the edges of the interaction graph change,
+        # so that the spins keep their qubits. The number of qubits then depends on the graphs seen before
+        # and may be larger than that of a fresh coloring.
+        self.incremental_coloring: bool = False
+        # The last coloring of the incremental coloring. Set None to color the next graph from scratch.
+        self.graph_coloring: typ.Optional[jmt_qc.qrac.IncrementalGraphColoring] = None
 
     @abstractmethod
     def get_hamiltonian(
@@ -34,13 +55,89 @@ class QRACBuilder(ABC):
     ) -> tuple[qk_info.SparsePauliOp, float, QRACEncodingCache]:
         pass
 
+    def _color_group(
+        self, ising: jmt_qc.IsingModel, max_color_group_size: int
+    ) -> dict[int, list[int]]:
+        """Color the interaction graph of `ising` and add the spins of the linear terms.
+
+        By default, the graph is colored from scratch by `greedy_graph_coloring`.
+        If `self.coloring_cache` is set, the coloring is reused from it while the edge set of the graph does not change.
+        If `self.incremental_coloring` is True, the last coloring is repaired instead by recoloring
+        only the vertices which need it, so that most of the spins keep their qubits when the edges change.
+        The repaired colorings depend on the graphs seen before, so they are not cached.
+        """
+        graph = ising.quad.keys()
+        if self.incremental_coloring:
+            graph_coloring = self.graph_coloring
+            if (
+                graph_coloring is None
+                or graph_coloring.max_color_group_size != max_color_group_size
+                or graph_coloring.coloring_strategy != self.coloring_strategy
+            ):
+                graph_coloring = jmt_qc.qrac.IncrementalGraphColoring(
+                    graph,
+                    max_color_group_size,
+                    coloring_strategy=self.coloring_strategy,
+                )
+                self.graph_coloring = graph_coloring
+            else:
+                graph_coloring.update_graph(graph)
+            color_group = graph_coloring.color_group
+        else:
+            cache = self.coloring_cache
+            color_group = None
+            if cache is not None:
+                key = graph_fingerprint(
+                    graph, max_color_group_size, self.coloring_strategy
+                )
+                color_group = cache.get(key)
+            if color_group is None:
+                _, color_group = jmt_qc.greedy_graph_coloring(
+                    graph,
+                    max_color_group_size=max_color_group_size,
+                    coloring_strategy=self.coloring_strategy,
+                )
+                if cache is not None:
+                    cache.put(key, color_group)
+        # check_linear_term adds the groups in place, and the cached or incremental groups must not be modified.
+        color_group = {color: list(group) for color, group in color_group.items()}
+        return jmt_qc.qrac.check_linear_term(
+            color_group, ising.linear.keys(), max_color_group_size
+        )
+
     def decode_from_binary_values(
-        self, binary_list: typ.Iterable[list[int]]
+        self,
+        binary_list: typ.Iterable[list[int]],
+        local_search: bool = False,
+        multipliers: typ.Optional[dict[str, float]] = None,
+        detail_parameters: typ.Optional[
+            dict[str, dict[tuple[int, ...], tuple[float, float]]]
+        ] = None,
     ) -> jm.SampleSet:
+        """Decode the rounded binary values.
+
+        Args:
+            binary_list (typ.Iterable[list[int]]): list of binary values. The i-th value is the value of the i-th variable.
+            local_search (bool, optional): refine each sample by 1-flip and 2-flip steepest descent on the QUBO before decoding. Defaults to False.
+            multipliers (typ.Optional[dict[str, float]], optional): multipliers of the QUBO used by the local search. Use the same ones as `get_hamiltonian`. Defaults to None.
+            detail_parameters (typ.Optional[ dict[str, dict[tuple[int, ...], tuple[float, float]]] ], optional): detail parameters of the QUBO used by the local search. Defaults to None.
+
+        Returns:
+            jm.SampleSet: decoded sample set.
+        """
         binary_results = [
             {i: value for i, value in enumerate(binary)}
             for binary in binary_list
         ]
+        if local_search:
+            qubo, _ = self.pubo_builder.get_qubo_dict(
+                multipliers=multipliers, detail_parameters=detail_parameters
+            )
+            binary_results = jmt_qc.ising_qubo.refine_binary_results(
+                qubo,
+                binary_results,
+                self.compiled_instance.var_map.var_num,
+            )
         binary_encoder = self.pubo_builder.binary_encoder
         decoded: jm.SampleSet = (
             jmt.core.pubo.binary_decode.decode_from_dict_binary_result(
@@ -67,7 +164,62 @@ class QRACEncodingCache:
     encoding: dict[int, tuple[int, Pauli]]
 
 
-class QRAC31Builder(QRACBuilder):
+class ParametricQRACBuilder(QRACBuilder):
+    """QRAC builder whose Hamiltonian is linear in the coefficients of the Ising model.
+
+    The Hamiltonian is then affine in the multipliers, so that `get_parametric_hamiltonian` encodes
+    the objective and each penalty once. (3,2,p)-QRAC is not such an encoding.
+    """
+
+    @abstractmethod
+    def _encode_ising(
+        self,
+        ising: jmt_qc.IsingModel,
+        color_group: typ.Optional[dict[int, list[int]]],
+    ) -> tuple[qk_info.SparsePauliOp, float, QRACEncodingCache]:
+        """Encode an Ising model linearly in its coefficients. If `color_group` is None, it is built from the terms of `ising`."""
+
+    def get_parametric_hamiltonian(
+        self,
+        detail_parameters: typ.Optional[
+            dict[str, dict[tuple[int, ...], tuple[float, float]]]
+        ] = None,
+    ) -> tuple[ParametricHamiltonian, QRACEncodingCache]:
+        """Get Quantum Relaxation Hamiltonian as a function of the multipliers.
+
+        The objective and each penalty are encoded once with one encoding, which is built from
+        the terms of all of them, so that the encoding is valid for any multipliers.
+        `with_multipliers(multipliers)` of the result gives the Hamiltonian and the constant term
+        for the multipliers without rebuilding the QUBO, the coloring or the Pauli terms.
+
+        Args:
+            detail_parameters (typ.Optional[ dict[str, dict[tuple[int, ...], tuple[float, float]]] ], optional): detail parameters for each penalty. Defaults to None.
+
+        Returns:
+            tuple[ParametricHamiltonian, QRACEncodingCache]: Hamiltonian decomposed into the objective and each penalty, and encoding cache for decoding
+        """
+        model = jmt_qc.ising_qubo.ParametricIsingModel.from_pubo_builder(
+            self.pubo_builder,
+            self.compiled_instance.var_map.var_num,
+            detail_parameters=detail_parameters,
+        )
+        # The component models keep the zero coefficients, so their terms are the union of all components.
+        components = [model.component(k) for k in range(model.num_components)]
+        color_group = None
+        operators, offsets = [], []
+        for ising in components:
+            operator, offset, cache = self._encode_ising(ising, color_group)
+            color_group = cache.color_group
+            operators.append(operator)
+            offsets.append(offset)
+        hamiltonian = ParametricHamiltonian.from_operators(
+            model.labels, operators, offsets + model.qubo_constants
+        )
+        return hamiltonian, cache
+
+
+class QRAC31Builder(ParametricQRACBuilder):
+    @cached_hamiltonian
     def get_hamiltonian(
         self,
         multipliers: typ.Optional[dict[str, float]] = None,
@@ -89,12 +241,7 @@ class QRAC31Builder(QRACBuilder):
         )
         ising = jmt_qc.qubo_to_ising(qubo)
         max_color_group_size = 3
-        _, color_group = jmt_qc.greedy_graph_coloring(
-            ising.quad.keys(), max_color_group_size=max_color_group_size
-        )
-        color_group = jmt_qc.qrac.check_linear_term(
-            color_group, ising.linear.keys(), max_color_group_size
-        )
+        color_group = self._color_group(ising, max_color_group_size)
         qrac_hamiltonian, offset, encoding = qrac31_encode_ising(
             ising, color_group
         )
@@ -104,9 +251,23 @@ class QRAC31Builder(QRACBuilder):
             QRACEncodingCache(color_group, encoding),
         )
 
+    def _encode_ising(
+        self,
+        ising: jmt_qc.IsingModel,
+        color_group: typ.Optional[dict[int, list[int]]],
+    ) -> tuple[qk_info.SparsePauliOp, float, QRACEncodingCache]:
+        if color_group is None:
+            color_group = self._color_group(ising, 3)
+        qrac_hamiltonian, offset, encoding = qrac31_encode_ising(
+            ising, color_group
+        )
+        return qrac_hamiltonian, offset, QRACEncodingCache(color_group, encoding)
+
 
 def transpile_to_qrac31_hamiltonian(
-    compiled_instance: jmt.core.CompiledInstance, normalize: bool = True
+    compiled_instance: jmt.core.CompiledInstance,
+    normalize: bool = True,
+    coloring_strategy: jmt_qc.ColoringStrategy = jmt_qc.ColoringStrategy.GREEDY,
 ) -> QRAC31Builder:
     """Generate Quantum Relaxation Hamiltonian based on (3,1,p)-QRAC builder.
 
@@ -115,6 +276,7 @@ def transpile_to_qrac31_hamiltonian(
     Args:
         compiled_instance (jmt.core.CompiledInstance): Compiled model
         normalize (bool, optional): Normalize objective function. Defaults to True.
+        coloring_strategy (jmt_qc.ColoringStrategy, optional): graph coloring strategy which decides the number of qubits. Defaults to ColoringStrategy.GREEDY.
 
     Returns:
         QRAC31Builder: (3,1,p)-QRAC Hamiltonian builder
@@ -122,10 +284,11 @@ def transpile_to_qrac31_hamiltonian(
     pubo_builder = jmt.core.pubo.transpile_to_pubo(
         compiled_instance, normalize=normalize
     )
-    return QRAC31Builder(pubo_builder, compiled_instance)
+    return QRAC31Builder(pubo_builder, compiled_instance, coloring_strategy)
 
 
-class QRAC21Builder(QRACBuilder):
+class QRAC21Builder(ParametricQRACBuilder):
+    @cached_hamiltonian
     def get_hamiltonian(
         self,
         multipliers: typ.Optional[dict[str, float]] = None,
@@ -148,12 +311,7 @@ class QRAC21Builder(QRACBuilder):
         ising = jmt_qc.qubo_to_ising(qubo)
         max_color_group_size = 2
 
-        _, color_group = jmt_qc.greedy_graph_coloring(
-            ising.quad.keys(), max_color_group_size=max_color_group_size
-        )
-        color_group = jmt_qc.qrac.check_linear_term(
-            color_group, ising.linear.keys(), max_color_group_size
-        )
+        color_group = self._color_group(ising, max_color_group_size)
         qrac_hamiltonian, offset, encoding = qrac21_encode_ising(
             ising, color_group
         )
@@ -163,9 +321,23 @@ class QRAC21Builder(QRACBuilder):
             QRACEncodingCache(color_group, encoding),
         )
 
+    def _encode_ising(
+        self,
+        ising: jmt_qc.IsingModel,
+        color_group: typ.Optional[dict[int, list[int]]],
+    ) -> tuple[qk_info.SparsePauliOp, float, QRACEncodingCache]:
+        if color_group is None:
+            color_group = self._color_group(ising, 2)
+        qrac_hamiltonian, offset, encoding = qrac21_encode_ising(
+            ising, color_group
+        )
+        return qrac_hamiltonian, offset, QRACEncodingCache(color_group, encoding)
+
 
 def transpile_to_qrac21_hamiltonian(
-    compiled_instance: jmt.core.CompiledInstance, normalize: bool = True
+    compiled_instance: jmt.core.CompiledInstance,
+    normalize: bool = True,
+    coloring_strategy: jmt_qc.ColoringStrategy = jmt_qc.ColoringStrategy.GREEDY,
 ) -> QRAC21Builder:
     """Generate Quantum Relaxation Hamiltonian based on (2,1,p)-QRAC builder.
 
@@ -174,6 +346,7 @@ def transpile_to_qrac21_hamiltonian(
     Args:
         compiled_instance (jmt.core.CompiledInstance): Compiled model
         normalize (bool, optional): Normalize objective function. Defaults to True.
+        coloring_strategy (jmt_qc.ColoringStrategy, optional): graph coloring strategy which decides the number of qubits. Defaults to ColoringStrategy.GREEDY.
 
     Returns:
         QRAC21Builder: (2,1,p)-QRAC Hamiltonian builder
@@ -181,10 +354,11 @@ def transpile_to_qrac21_hamiltonian(
     pubo_builder = jmt.core.pubo.transpile_to_pubo(
         compiled_instance, normalize=normalize
     )
-    return QRAC21Builder(pubo_builder, compiled_instance)
+    return QRAC21Builder(pubo_builder, compiled_instance, coloring_strategy)
 
 
 class QRAC32Builder(QRACBuilder):
+    @cached_hamiltonian
     def get_hamiltonian(
         self,
         multipliers: typ.Optional[dict[str, float]] = None,
@@ -206,12 +380,7 @@ class QRAC32Builder(QRACBuilder):
         )
         ising = jmt_qc.qubo_to_ising(qubo)
         max_color_group_size = 3
-        _, color_group = jmt_qc.greedy_graph_coloring(
-            ising.quad.keys(), max_color_group_size=max_color_group_size
-        )
-        color_group = jmt_qc.qrac.check_linear_term(
-            color_group, ising.linear.keys(), max_color_group_size
-        )
+        color_group = self._color_group(ising, max_color_group_size)
         qrac_hamiltonian, offset, encoding = qrac32_encode_ising(
             ising, color_group
         )
@@ -223,7 +392,9 @@ class QRAC32Builder(QRACBuilder):
 
 
 def transpile_to_qrac32_hamiltonian(
-    compiled_instance: jmt.core.CompiledInstance, normalize: bool = True
+    compiled_instance: jmt.core.CompiledInstance,
+    normalize: bool = True,
+    coloring_strategy: jmt_qc.ColoringStrategy = jmt_qc.ColoringStrategy.GREEDY,
 ) -> QRAC32Builder:
     """Generate Quantum Relaxation Hamiltonian based on (3,2,p)-QRAC builder.
 
@@ -232,6 +403,7 @@ def transpile_to_qrac32_hamiltonian(
     Args:
         compiled_instance (jmt.core.CompiledInstance): Compiled model
         normalize (bool, optional): Normalize objective function. Defaults to True.
+        coloring_strategy (jmt_qc.ColoringStrategy, optional): graph coloring strategy which decides the number of qubits. Defaults to ColoringStrategy.GREEDY.
 
     Returns:
         QRAC32Builder: (3,2,p)-QRAC Hamiltonian builder
@@ -239,10 +411,11 @@ def transpile_to_qrac32_hamiltonian(
     pubo_builder = jmt.core.pubo.transpile_to_pubo(
         compiled_instance, normalize=normalize
     )
-    return QRAC32Builder(pubo_builder, compiled_instance)
+    return QRAC32Builder(pubo_builder, compiled_instance, coloring_strategy)
 
 
-class QRACSpaceEfficientBuilder(QRACBuilder):
+class QRACSpaceEfficientBuilder(ParametricQRACBuilder):
+    @cached_hamiltonian
     def get_hamiltonian(
         self,
         multipliers: typ.Optional[dict[str, float]] = None,
@@ -272,6 +445,20 @@ class QRACSpaceEfficientBuilder(QRACBuilder):
             QRACEncodingCache(color_group={}, encoding=encoding),
         )
 
+    def _encode_ising(
+        self,
+        ising: jmt_qc.IsingModel,
+        color_group: typ.Optional[dict[int, list[int]]],
+    ) -> tuple[qk_info.SparsePauliOp, float, QRACEncodingCache]:
+        qrac_hamiltonian, offset, encoding = qrac_space_efficient_encode_ising(
+            ising
+        )
+        return (
+            qrac_hamiltonian,
+            offset,
+            QRACEncodingCache(color_group={}, encoding=encoding),
+        )
+
 
 def transpile_to_qrac_space_efficient_hamiltonian(
     compiled_instance: jmt.core.CompiledInstance, normalize=True
@@ -1,5 +1,7 @@
 from jijmodeling_transpiler_quantum.quri_parts import qaoa as qaoa
 from jijmodeling_transpiler_quantum.quri_parts import qrao as qrao
+from .parametric_hamiltonian import ParametricHamiltonian
+from .pauli_ir import PauliLabelCache, pauli_ir_to_operator
 from .qaoa.to_qaoa import transpile_to_qaoa_ansatz
 from .qrao.to_qrac import (
     transpile_to_qrac31_hamiltonian,
@@ -10,5 +12,8 @@ from .qrao.to_qrac import (
 __all__ = [
     "qaoa",
     "qrao",
+    "ParametricHamiltonian",
+    "PauliLabelCache",
+    "pauli_ir_to_operator",
     "transpile_to_qaoa_ansatz",
 ]
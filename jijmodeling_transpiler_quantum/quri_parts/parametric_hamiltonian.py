@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import dataclasses
+import typing as typ
+
+import numpy as np
+from quri_parts.core.operator import PAULI_IDENTITY, Operator, PauliLabel
+
+from jijmodeling_transpiler_quantum.core.ising_qubo import ParametricIsingModel
+from jijmodeling_transpiler_quantum.core.pauli import PauliCode, PauliIR
+
+from .pauli_ir import default_label_cache
+
+
+@dataclasses.dataclass
+class ParametricHamiltonian:
+    """Hamiltonian whose coefficients are affine in the penalty multipliers.
+
+    The objective and each penalty are encoded into operators once and aligned on one shared list of Pauli labels.
+    The k-th row of `coeffs` and `offsets` is the k-th component, and row 0 is the objective.
+    `with_multipliers` only takes a weighted sum of the rows, so that a sweep over multipliers does not
+    rebuild the QUBO, the Ising model or the Pauli labels.
+    """
+
+    labels: list[str]
+    paulis: list[PauliLabel]
+    coeffs: np.ndarray
+    offsets: np.ndarray
+
+    @classmethod
+    def from_operators(
+        cls,
+        labels: list[str],
+        operators: list[Operator],
+        offsets: typ.Sequence[float],
+    ) -> ParametricHamiltonian:
+        """Align the operators of the objective and the penalties on their shared Pauli labels.
+
+        Args:
+            labels (list[str]): labels of the penalties.
+            operators (list[Operator]): operators of the objective and the penalties.
+            offsets (typ.Sequence[float]): constant terms of the objective and the penalties.
+
+        Returns:
+            ParametricHamiltonian: aligned Hamiltonian.
+        """
+        term_index: dict[PauliLabel, int] = {}
+        for operator in operators:
+            for label in operator.keys():
+                term_index.setdefault(label, len(term_index))
+        coeffs = np.zeros((len(operators), len(term_index)), dtype=np.complex128)
+        for k, operator in enumerate(operators):
+            for label, coeff in operator.items():
+                coeffs[k, term_index[label]] += coeff
+        if not np.iscomplex(coeffs).any():
+            coeffs = coeffs.real
+        return cls(
+            labels=list(labels),
+            paulis=list(term_index.keys()),
+            coeffs=coeffs,
+            offsets=np.asarray(offsets, dtype=np.float64),
+        )
+
+    @classmethod
+    def from_ising(cls, model: ParametricIsingModel) -> ParametricHamiltonian:
+        """Ising Hamiltonian of `Z` and `ZZ` terms, as `to_ising_operator_from_qubo`.
+
+        The `Z` terms come first and the constant of the Ising model is the last term of the operator.
+
+        Args:
+            model (ParametricIsingModel): decomposed Ising model.
+
+        Returns:
+            ParametricHamiltonian: Ising Hamiltonian.
+        """
+        num_linear = len(model.linear_index)
+        quad = np.sort(np.stack([model.quad_row, model.quad_col], axis=1), axis=1)
+        qubits = np.concatenate([model.linear_index, quad.reshape(-1)])
+        # Only the Pauli strings of the IR are used, and their labels are shared through the cache.
+        ir = PauliIR(
+            num_qubits=int(qubits.max(initial=-1)) + 1,
+            indptr=np.r_[
+                np.arange(num_linear), num_linear + 2 * np.arange(len(quad) + 1)
+            ],
+            qubits=qubits.astype(np.int32),
+            codes=np.full(len(qubits), PauliCode.Z, dtype=np.int8),
+            coeffs=np.zeros(num_linear + len(quad)),
+        )
+        paulis = default_label_cache.labels(ir)
+        paulis.append(PAULI_IDENTITY)
+        return cls(
+            labels=list(model.labels),
+            paulis=paulis,
+            coeffs=np.hstack(
+                [
+                    model.linear_coeffs,
+                    model.quad_coeffs,
+                    model.ising_constants[:, None],
+                ]
+            ),
+            offsets=model.ising_constants + model.qubo_constants,
+        )
+
+    def weights(self, multipliers: typ.Optional[dict[str, float]] = None) -> np.ndarray:
+        """Weights of the components. A penalty missing in `multipliers` has weight 1 as in `PuboBuilder`."""
+        multipliers = multipliers or {}
+        return np.array(
+            [1.0] + [float(multipliers.get(label, 1.0)) for label in self.labels]
+        )
+
+    def with_multipliers(
+        self, multipliers: typ.Optional[dict[str, float]] = None
+    ) -> tuple[Operator, float]:
+        """Hamiltonian for the given multipliers in O(terms).
+
+        Args:
+            multipliers (typ.Optional[dict[str, float]], optional): a multiplier for each penalty. Defaults to None.
+
+        Returns:
+            tuple[Operator, float]: Hamiltonian and constant term, as `get_hamiltonian` with the same multipliers.
+        """
+        weights = self.weights(multipliers)
+        coeffs = (weights @ self.coeffs).tolist()
+        # The terms whose coefficients are zeros are removed, but the constant term is kept.
+        operator = Operator(
+            {
+                label: coeff
+                for label, coeff in zip(self.paulis, coeffs)
+                if coeff != 0.0 or label == PAULI_IDENTITY
+            }
+        )
+        return operator, float(weights @ self.offsets)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import typing as typ
+
+import numpy as np
+from quri_parts.core.operator import PAULI_IDENTITY, Operator, PauliLabel, SinglePauli
+
+from jijmodeling_transpiler_quantum.core.pauli import PauliIR
+
+_SINGLE_PAULIS = [None, SinglePauli.X, SinglePauli.Y, SinglePauli.Z]
+
+
+class PauliLabelCache:
+    """Cache of the `PauliLabel`s of the terms on one or two qubits.
+
+    A `PauliLabel` formats its string when it is created, which is the most of the cost to export an operator.
+    The labels of the terms on one or two qubits, which are all the terms of the QAOA and the QRAC 3-1 and 2-1
+    Hamiltonians, are looked up by an integer made of the qubits and the codes,
+    so that the labels are shared by the operators of different multipliers and instances.
+    When there are more than `max_size` labels, the cache is cleared.
+
+    Examples:
+        >>> from jijmodeling_transpiler_quantum.core.pauli import PauliCode
+        >>> cache = PauliLabelCache()
+        >>> ir = PauliIR.from_terms([0, 1, 1], [2, 0, 1], [PauliCode.Z] * 3, [1.0, 2.0], 3)
+        >>> cache.labels(ir)
+        [PauliLabel({(2, <SinglePauli.Z: 3>)}), PauliLabel({(0, <SinglePauli.Z: 3>), (1, <SinglePauli.Z: 3>)})]
+        >>> cache.labels(ir)[0] is cache.labels(ir)[0]
+        True
+
+    """
+
+    def __init__(self, max_size: int = 1 << 20):
+        """Create an empty cache.
+
+        Args:
+            max_size (int, optional): the maximum number of labels. 0 means no cache. Defaults to 1 << 20.
+        """
+        self.max_size = max_size
+        self._labels: dict[int, PauliLabel] = {}
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def clear(self):
+        self._labels.clear()
+
+    def labels(self, ir: PauliIR) -> list[PauliLabel]:
+        """`PauliLabel` of each term of `ir`."""
+        indptr = ir.indptr.tolist()
+        qubits = ir.qubits.tolist()
+        codes = [_SINGLE_PAULIS[code] for code in ir.codes.tolist()]
+        labels = [
+            PauliLabel(zip(qubits[start:stop], codes[start:stop]))
+            if stop - start > 2 or self.max_size == 0
+            else None
+            for start, stop in zip(indptr[:-1], indptr[1:])
+        ]
+        if self.max_size == 0 or ir.num_qubits >= 1 << 28:
+            return labels
+
+        # A single-qubit Pauli is 4 * qubit + code (< 2^30), and a term is the pair of its Paulis
+        # whose weights are 2^31 and 1, where an absent Pauli is 0. The key of the identity is 0.
+        weights = np.diff(ir.indptr)
+        small = np.flatnonzero(weights <= 2)
+        start, weights = ir.indptr[small], weights[small]
+        paulis = np.r_[4 * ir.qubits.astype(np.int64) + ir.codes, 0, 0]
+        first = np.where(weights >= 1, paulis[start], 0)
+        second = np.where(weights == 2, paulis[start + 1], 0)
+        keys = (first << 31 | second).tolist()
+        for term, key in zip(small.tolist(), keys):
+            label = self._labels.get(key)
+            if label is None:
+                start, stop = indptr[term], indptr[term + 1]
+                label = PauliLabel(zip(qubits[start:stop], codes[start:stop]))
+                if len(self._labels) >= self.max_size:
+                    self._labels.clear()
+                self._labels[key] = label
+            labels[term] = label
+        return labels
+
+
+default_label_cache = PauliLabelCache()
+
+
+def pauli_ir_to_operator(
+    ir: PauliIR, label_cache: typ.Optional[PauliLabelCache] = None
+) -> Operator:
+    """Export a `PauliIR` to quri-parts.
+
+    The codes of `PauliIR` are the Pauli IDs of quri-parts, so that each term is a `PauliLabel`
+    without formatting and parsing a string, and the terms are not merged again.
+
+    Args:
+        ir (PauliIR): operator.
+        label_cache (typ.Optional[PauliLabelCache], optional): cache of the labels. Defaults to `default_label_cache`.
+
+    Returns:
+        Operator: operator. If there is no term, the identity whose coefficient is 0.
+
+    Examples:
+        >>> from jijmodeling_transpiler_quantum.core.ising_qubo import IsingModel
+        >>> from jijmodeling_transpiler_quantum.core.pauli import ising_to_pauli_ir
+        >>> ir, _ = ising_to_pauli_ir(IsingModel(quad={(0, 1): 2.0}, linear={1: -1.0}, constant=0.0), 2)
+        >>> pauli_ir_to_operator(ir)
+        {PauliLabel({(1, <SinglePauli.Z: 3>)}): -1.0, PauliLabel({(0, <SinglePauli.Z: 3>), (1, <SinglePauli.Z: 3>)}): 2.0}
+
+    """
+    if len(ir) == 0:
+        return Operator({PAULI_IDENTITY: 0})
+    if label_cache is None:
+        label_cache = default_label_cache
+    return Operator(zip(label_cache.labels(ir), ir.coeffs.tolist()))
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-import numpy as np
-from quri_parts.core.operator import PAULI_IDENTITY, Operator, pauli_label
+from quri_parts.core.operator import Operator
 
 from jijmodeling_transpiler_quantum.core import qubo_to_ising
+from jijmodeling_transpiler_quantum.core.pauli import ising_to_pauli_ir
+
+from ..pauli_ir import pauli_ir_to_operator
 
 
 def to_ising_operator_from_qubo(
@@ -25,20 +27,9 @@ def to_ising_operator_from_qubo(
         tuple[Operator, float]: The Ising operator and the constant offset.
     """
     ising = qubo_to_ising(qubo)
-    offset = ising.constant
-    quri_operator = Operator()
-
-    # convert linear parts of the objective function into Operator.
-    for idx, coeff in ising.linear.items():
-        if coeff != 0.0:
-            quri_operator += Operator({pauli_label(f"Z{idx}"): coeff})
-
-    # convert quadratic parts of the objective function into Operator.
-    for (i, j), coeff in ising.quad.items():
-        if coeff != 0.0:
-            quri_operator += Operator({pauli_label(f"Z{i} Z{j}"): coeff})
-    quri_operator.constant = offset
+    ir, offset = ising_to_pauli_ir(ising, n_qubit)
+    quri_operator = pauli_ir_to_operator(ir)
     # Add the constant part to the operator.
-    # op += Operator({pauli_label(''): ising.offset})
+    quri_operator.constant = offset
 
     return quri_operator, offset
@@ -3,9 +3,12 @@ from __future__ import annotations
 import enum
 
 import numpy as np
-from quri_parts.core.operator import PAULI_IDENTITY, Operator, pauli_label
+from quri_parts.core.operator import Operator
 
 from jijmodeling_transpiler_quantum.core.ising_qubo import IsingModel
+from jijmodeling_transpiler_quantum.core.pauli import encode_ising_pauli_ir
+
+from ..pauli_ir import pauli_ir_to_operator
 
 
 class Pauli(enum.Enum):
@@ -77,46 +80,6 @@ def qrac31_encode_ising(
         the offset of the Ising model, and the encoded operation as a dictionary.
     """
     encoded_ope = color_group_to_qrac_encode(color_group)
-
-    pauli_terms: list[Operator] = []
-
-    offset = ising.constant
     n_qubit = len(color_group)
-
-    for idx, coeff in ising.linear.items():
-        if coeff == 0.0:
-            continue
-
-        color, pauli_kind = encoded_ope[idx]
-        pauli_operator = create_pauli_term([pauli_kind], [color], n_qubit)
-
-        pauli_terms.append(
-            Operator({pauli_label(pauli_operator): np.sqrt(3) * coeff})
-        )
-
-    for (i, j), coeff in ising.quad.items():
-        if coeff == 0.0:
-            continue
-
-        if i == j:
-            offset += coeff
-            continue
-
-        color_i, pauli_kind_i = encoded_ope[i]
-
-        color_j, pauli_kind_j = encoded_ope[j]
-
-        pauli_ope = create_pauli_term(
-            [pauli_kind_i, pauli_kind_j], [color_i, color_j], n_qubit
-        )
-        pauli_terms.append(Operator({pauli_label(pauli_ope): 3 * coeff}))
-
-    if pauli_terms:
-        qubit_op = Operator()
-        for term in pauli_terms:
-            qubit_op += term
-    else:
-        n_qubit = max(1, n_qubit)
-        qubit_op = Operator({PAULI_IDENTITY * n_qubit: 0})
-
-    return qubit_op, offset, encoded_ope
+    ir, offset = encode_ising_pauli_ir(ising, encoded_ope, n_qubit, np.sqrt(3), 3)
+    return pauli_ir_to_operator(ir), offset, encoded_ope
@@ -5,6 +5,8 @@ import qiskit as qk
 from qiskit.algorithms.eigensolvers import NumPyEigensolver
 
 import jijmodeling_transpiler_quantum.qiskit as jmt_qk
+from jijmodeling_transpiler_quantum.core.cache import HamiltonianCache
+from jijmodeling_transpiler_quantum.core.ising_qubo import calc_qubo_energy
 
 
 def test_qaoa_onehot():
@@ -57,3 +59,319 @@ def test_qaoa_H_eigenvalue():
     assert len(sampleset.feasible().record.solution["x"]) == 1
     assert ising_optimal == 0.0
     assert sampleset.record.num_occurrences == [num_shots]
+
+
+def test_qaoa_decode_with_local_search():
+    n = jm.Placeholder("n")
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, x[i])
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 3})
+    qaoa_builder = jmt_qk.transpile_to_qaoa_ansatz(compiled_instance)
+
+    counts = {"000": 5, "111": 3}
+    sampleset = qaoa_builder.decode_from_counts(counts)
+    assert len(sampleset.feasible().record.num_occurrences) == 0
+
+    multipliers = {"onehot": 2.0}
+    sampleset = qaoa_builder.decode_from_counts(
+        counts, local_search=True, multipliers=multipliers
+    )
+    assert sampleset.feasible().record.num_occurrences == [5, 3]
+
+
+def test_qaoa_parametric_hamiltonian():
+    n = jm.Placeholder("n")
+    c = jm.Placeholder("c", ndim=1)
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, c[i] * x[i]) + x[0] * x[1]
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+    problem += jm.Constraint("le", x[0] + x[2] <= 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 4, "c": [1, -2, 3, 0.5]})
+    qaoa_builder = jmt_qk.transpile_to_qaoa_ansatz(compiled_instance)
+    parametric = qaoa_builder.get_parametric_hamiltonian()
+    assert sorted(parametric.labels) == ["le", "onehot"]
+
+    for multipliers in [None, {"onehot": 2.0}, {"onehot": 0.5, "le": 3.0}]:
+        expected, expected_constant = qaoa_builder.get_hamiltonian(multipliers)
+        hamiltonian, constant = parametric.with_multipliers(multipliers)
+        assert np.isclose(constant, expected_constant)
+        assert len((hamiltonian - expected).simplify(atol=1e-10)) == 1
+        assert np.allclose(hamiltonian.to_matrix(), expected.to_matrix())
+
+
+def test_qaoa_hamiltonian_cache():
+    n = jm.Placeholder("n")
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, x[i])
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 3})
+    qaoa_builder = jmt_qk.transpile_to_qaoa_ansatz(compiled_instance)
+    # The cache is opt-in, so that the callers do not share the operators by default.
+    assert qaoa_builder.get_hamiltonian({"onehot": 2.0})[0] is not (
+        qaoa_builder.get_hamiltonian({"onehot": 2.0})[0]
+    )
+
+    qaoa_builder.hamiltonian_cache = HamiltonianCache()
+    hamiltonian, constant = qaoa_builder.get_hamiltonian({"onehot": 2.0})
+    cached, cached_constant = qaoa_builder.get_hamiltonian(
+        multipliers={"onehot": 2}
+    )
+    assert cached is hamiltonian and cached_constant == constant
+    qaoa_builder.get_qaoa_ansatz(p=1, multipliers={"onehot": 2.0})
+    other, _ = qaoa_builder.get_hamiltonian({"onehot": 3.0})
+    assert other != hamiltonian
+    info = qaoa_builder.hamiltonian_cache.cache_info()
+    assert (info.hits, info.misses, info.size) == (2, 2, 2)
+
+    qaoa_builder.hamiltonian_cache = None
+    assert qaoa_builder.get_hamiltonian({"onehot": 2.0})[0] is not hamiltonian
+
+
+def test_qaoa_simulator():
+    n = jm.Placeholder("n")
+    c = jm.Placeholder("c", ndim=1)
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, c[i] * x[i]) + x[0] * x[1]
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 4, "c": [1, -2, 3, 0.5]})
+    qaoa_builder = jmt_qk.transpile_to_qaoa_ansatz(compiled_instance)
+    multipliers = {"onehot": 2.0}
+    qaoa_ansatz, hamiltonian, constant = qaoa_builder.get_qaoa_ansatz(
+        p=2, multipliers=multipliers
+    )
+    parameters = np.array([0.3, -0.7, 0.2, 0.5])
+    state = qk.quantum_info.Statevector(qaoa_ansatz.assign_parameters(parameters))
+
+    for dtype, atol in [(np.complex128, 1e-10), (np.complex64, 1e-5)]:
+        simulator = qaoa_builder.get_qaoa_simulator(multipliers, dtype=dtype)
+        gammas, betas = parameters[2:], parameters[:2]
+        assert np.allclose(
+            simulator.probabilities(gammas, betas), state.probabilities(), atol=atol
+        )
+        assert np.isclose(
+            simulator.expectation(gammas, betas),
+            state.expectation_value(hamiltonian).real + constant,
+            atol=atol,
+        )
+
+    probabilities = state.probabilities_dict()
+    for bits, probability in simulator.top_k(gammas, betas, 3):
+        # The keys of qiskit are in the reverse order of the qubits.
+        assert np.isclose(probabilities[bits[::-1]], probability, atol=1e-5)
+
+
+def test_qaoa_value_and_grad():
+    n = jm.Placeholder("n")
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, (i + 1) * x[i]) - 2 * x[0] * x[2]
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 3})
+    qaoa_builder = jmt_qk.transpile_to_qaoa_ansatz(compiled_instance)
+    simulator = qaoa_builder.get_qaoa_simulator()
+    value_and_grad = qaoa_builder.get_qaoa_value_and_grad()
+
+    # [beta_0, beta_1, gamma_0, gamma_1]
+    parameters = np.array([0.4, -0.2, 0.1, 0.3])
+    value, grad = value_and_grad(parameters)
+    assert np.isclose(value, simulator.expectation(parameters[2:], parameters[:2]))
+    eps = 1e-6
+    for k in range(len(parameters)):
+        shift = eps * np.eye(len(parameters))[k]
+        upper, _ = value_and_grad(parameters + shift)
+        lower, _ = value_and_grad(parameters - shift)
+        assert np.isclose(grad[k], (upper - lower) / (2 * eps), atol=1e-6)
+
+
+def test_qaoa_p1_evaluator():
+    n = jm.Placeholder("n")
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, (i + 1) * x[i]) - 2 * x[0] * x[2]
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 3})
+    qaoa_builder = jmt_qk.transpile_to_qaoa_ansatz(compiled_instance)
+    evaluator = qaoa_builder.get_qaoa_p1_evaluator()
+    gamma, beta, value = evaluator.grid_search()
+
+    qaoa_ansatz, hamiltonian, constant = qaoa_builder.get_qaoa_ansatz(p=1)
+    state = qk.quantum_info.Statevector(qaoa_ansatz.assign_parameters([beta, gamma]))
+    assert np.isclose(state.expectation_value(hamiltonian).real + constant, value)
+
+
+def test_qaoa_lightcone_engine():
+    n = jm.Placeholder("n")
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, (i + 1) * x[i]) + jm.sum(i, x[i] * x[(i + 1) % n])
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 8})
+    qaoa_builder = jmt_qk.transpile_to_qaoa_ansatz(compiled_instance)
+    engine = qaoa_builder.get_qaoa_lightcone_engine(p=2)
+    assert max(lightcone.num_spins for lightcone in engine.lightcones) == 6
+
+    qaoa_ansatz, hamiltonian, constant = qaoa_builder.get_qaoa_ansatz(p=2)
+    parameters = np.array([0.4, -0.2, 0.1, 0.3])
+    state = qk.quantum_info.Statevector(qaoa_ansatz.assign_parameters(parameters))
+    assert np.isclose(
+        engine.expectation(parameters[2:], parameters[:2]),
+        state.expectation_value(hamiltonian).real + constant,
+    )
+
+
+def test_qaoa_run_rqaoa():
+    n = jm.Placeholder("n")
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, (i + 1) * x[i])
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 6})
+    qaoa_builder = jmt_qk.transpile_to_qaoa_ansatz(compiled_instance)
+    sampleset = qaoa_builder.run_rqaoa(multipliers={"onehot": 10.0}, cutoff=3)
+
+    assert sampleset.record.num_occurrences == [1]
+    assert len(sampleset.feasible().record.num_occurrences) == 1
+    assert sampleset.evaluation.objective == [1.0]
+
+
+def test_qaoa_decode_integer_counts():
+    n = jm.Placeholder("n")
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, (i + 1) * x[i])
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 3})
+    qaoa_builder = jmt_qk.transpile_to_qaoa_ansatz(compiled_instance)
+
+    # The bit k of an integer key is x[k], and "11" is padded to "110".
+    sampleset = qaoa_builder.decode_from_counts({4: 4, "001": 2, 6: 3, "11": 1})
+    assert sampleset.record.num_occurrences == [6, 3, 1]
+    assert list(sampleset.evaluation.objective) == [3.0, 5.0, 3.0]
+    assert len(sampleset.feasible().record.num_occurrences) == 1
+
+    string_counts = {"001": 6, "011": 3, "110": 1}
+    expected = qaoa_builder.decode_from_counts(string_counts)
+    assert list(expected.evaluation.objective) == [3.0, 5.0, 3.0]
+
+
+def test_qaoa_decode_from_probs():
+    n = jm.Placeholder("n")
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, (i + 1) * x[i])
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 3})
+    qaoa_builder = jmt_qk.transpile_to_qaoa_ansatz(compiled_instance)
+
+    # The bit k of an index is x[k].
+    probs = np.array([0.0, 0.5, 0.2, 0.0, 0.25, 0.05, 0.0, 0.0])
+    sampleset = qaoa_builder.decode_from_probs(probs, top_k=3)
+    assert sampleset.record.num_occurrences == [1, 1, 1]
+    assert sampleset.metadata["probabilities"] == [0.5, 0.25, 0.2]
+    assert list(sampleset.evaluation.objective) == [1.0, 3.0, 2.0]
+
+    # Filtering keeps the assignment of the default decoding.
+    quasi_dist = qk.result.QuasiDistribution({1: 0.6, 6: 0.4})
+    default = qaoa_builder.decode_from_quasi_dist(quasi_dist)
+    filtered = qaoa_builder.decode_from_quasi_dist(quasi_dist, top_k=2)
+    assert list(default.evaluation.objective) == [1.0, 5.0]
+    assert default.record.num_occurrences == [60, 40]
+    assert list(filtered.evaluation.objective) == [1.0, 5.0]
+    assert filtered.metadata["probabilities"] == [0.6, 0.4]
+    assert filtered.record.solution == default.record.solution
+
+
+def test_qaoa_energy_statistics():
+    n = jm.Placeholder("n")
+    c = jm.Placeholder("c", ndim=1)
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, c[i] * x[i]) + x[0] * x[1]
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 4, "c": [1, -2, 3, 0.5]})
+    qaoa_builder = jmt_qk.transpile_to_qaoa_ansatz(compiled_instance)
+    multipliers = {"onehot": 2.0}
+
+    counts = {"0100": 6, "1100": 1, "0000": 3}
+    statistics = qaoa_builder.get_energy_statistics(counts, multipliers)
+    qubo, constant = qaoa_builder.pubo_builder.get_qubo_dict(multipliers=multipliers)
+    energies = [
+        sum(value * int(key[i]) * int(key[j]) for (i, j), value in qubo.items())
+        + constant
+        for key in counts
+    ]
+    assert np.allclose(statistics.energies, sorted(energies))
+    assert statistics.weights.tolist() == [6, 3, 1]
+    assert np.isclose(statistics.cvar(0.5), energies[0])
+
+    # The bit k of an integer key is x[k].
+    int_statistics = qaoa_builder.get_energy_statistics({2: 6, 3: 1, 0: 3}, multipliers)
+    assert np.array_equal(int_statistics.energies, statistics.energies)
+    assert np.array_equal(int_statistics.weights, statistics.weights)
+    # 1 is x[0] = 1 and 8 is x[3] = 1, whose energies differ.
+    int_statistics = qaoa_builder.get_energy_statistics({1: 1, 8: 3}, multipliers)
+    expected = sorted(
+        [
+            (calc_qubo_energy(qubo, [1, 0, 0, 0]) + constant, 1),
+            (calc_qubo_energy(qubo, [0, 0, 0, 1]) + constant, 3),
+        ]
+    )
+    assert np.allclose(int_statistics.energies, [energy for energy, _ in expected])
+    assert int_statistics.weights.tolist() == [weight for _, weight in expected]
+    quasi_dist = qk.result.QuasiDistribution({2: 0.6, 3: 0.1, 0: 0.3})
+    quasi_statistics = qaoa_builder.get_energy_statistics(quasi_dist, multipliers)
+    # `binary_probabilities` puts the qubit 0 at the end of a bitstring.
+    binary_statistics = qaoa_builder.get_energy_statistics(
+        {key[::-1]: prob for key, prob in quasi_dist.binary_probabilities(4).items()},
+        multipliers,
+    )
+    assert np.array_equal(quasi_statistics.energies, statistics.energies)
+    assert np.array_equal(binary_statistics.energies, statistics.energies)
+    assert np.allclose(quasi_statistics.weights, [0.6, 0.3, 0.1])
+
+    simulator = qaoa_builder.get_qaoa_simulator(multipliers)
+    gammas, betas = [0.3, -0.2], [0.4, 0.1]
+    probs = simulator.probabilities(gammas, betas)
+
+    # The probabilities of the simulator are passed as they are.
+    # The mean over the exact probabilities is the expectation of the ansatz.
+    statistics = qaoa_builder.get_energy_statistics(probs, multipliers)
+    assert np.isclose(statistics.mean(), simulator.expectation(gammas, betas))
+    assert np.allclose(statistics.energies, np.sort(simulator.energies[probs > 0]))
+
+    sampleset = qaoa_builder.decode_from_probs(probs, top_k=3)
+    top_k = simulator.top_k(gammas, betas, 3)
+    expected = qaoa_builder.decode_from_counts({bits: 1 for bits, _ in top_k})
+    assert sampleset.record.solution == expected.record.solution
+    assert np.allclose(sampleset.metadata["probabilities"], [p for _, p in top_k])
+    indices = np.argsort(-probs, kind="stable")[:3]
+    decoded_energies = [
+        calc_qubo_energy(qubo, [int(b) for b in bits]) + constant for bits, _ in top_k
+    ]
+    assert np.allclose(decoded_energies, simulator.energies[indices])
@@ -2,10 +2,15 @@ import numpy as np
 import qiskit as qk
 import qiskit.quantum_info as qk_ope
 
+from jijmodeling_transpiler_quantum.core.ising_qubo import IsingModel
+from jijmodeling_transpiler_quantum.qiskit.qrao.qrao31 import Pauli
 from jijmodeling_transpiler_quantum.qiskit.qrao.qrao32 import (
+    create_pauli_linear_term,
+    create_pauli_quad_term,
     create_pauli_x_prime_term,
     create_pauli_y_prime_term,
     create_pauli_z_prime_term,
+    qrac32_encode_ising,
 )
 
 
@@ -109,3 +114,30 @@ def test_create_pauli_z_prime_term():
     ]
 
     assert _pauli_terms == answer
+
+
+def test_qrac32_encode_ising_table():
+    ising = IsingModel(
+        quad={(0, 1): 1.0, (1, 3): -2.0, (0, 2): 0.5, (2, 3): 1.0, (4, 4): 2.0},
+        linear={0: 1.0, 3: 0.0, 4: -1.0},
+        constant=0.5,
+    )
+    # 0 and 2 share a color, so the product of their prime operators is on the same qubits
+    color_group = {0: [0, 1, 2], 1: [3, 4]}
+    operator, offset, encoding = qrac32_encode_ising(ising, color_group)
+
+    n_qubit = 4
+    terms = []
+    for i, coeff in ising.linear.items():
+        if coeff != 0.0:
+            color, kind = encoding[i]
+            terms += create_pauli_linear_term(kind, color, n_qubit)
+    for (i, j), coeff in ising.quad.items():
+        if i != j:
+            (color_i, kind_i), (color_j, kind_j) = encoding[i], encoding[j]
+            terms += create_pauli_quad_term(
+                [kind_i, kind_j], [color_i, color_j], n_qubit
+            )
+    assert operator == sum(terms).simplify(atol=0)
+    assert offset == 2.5
+    assert encoding[2] == (0, Pauli.Y)
@@ -7,7 +7,9 @@ from qiskit.algorithms.minimum_eigensolvers import NumPyMinimumEigensolver
 from qiskit.primitives import Estimator, Sampler
 from scipy.optimize import minimize
 
+import jijmodeling_transpiler_quantum.core as jmt_qc
 import jijmodeling_transpiler_quantum.qiskit as jtq
+from jijmodeling_transpiler_quantum.core.cache import ColoringCache
 from jijmodeling_transpiler_quantum.qiskit import (
     transpile_to_qrac21_hamiltonian,
     transpile_to_qrac31_hamiltonian,
@@ -191,4 +193,165 @@ def test_check_linear_term_from_qubo():
     qrac_hamiltonian, offset, encoding = qrac_builder.get_hamiltonian()
 
     qrac_builder = transpile_to_qrac_space_efficient_hamiltonian(compiled_model)
-    qrac_hamiltonian, offset, encoding = qrac_builder.get_hamiltonian()
\ No newline at end of file
+    qrac_hamiltonian, offset, encoding = qrac_builder.get_hamiltonian()
+
+def test_transpile_to_qrac31_decode_with_local_search():
+    n = jm.Placeholder("n")
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, x[i])
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 3})
+    qrac_builder = transpile_to_qrac31_hamiltonian(compiled_instance)
+
+    multipliers = {"onehot": 2.0}
+    sampleset = qrac_builder.decode_from_binary_values(
+        [[1, 1, 1], [0, 0, 0]], local_search=True, multipliers=multipliers
+    )
+    assert len(sampleset.feasible().record.num_occurrences) == 2
+
+
+def test_transpile_to_qrac_parametric_hamiltonian():
+    n = jm.Placeholder("n")
+    c = jm.Placeholder("c", ndim=1)
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, c[i] * x[i]) + x[0] * x[1] + x[2] * x[3]
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(
+        problem, {"n": 5, "c": [1, -2, 3, 0.5, 1]}
+    )
+    encoders = [
+        (transpile_to_qrac31_hamiltonian, jtq.qrao.qrao31.qrac31_encode_ising),
+        (transpile_to_qrac21_hamiltonian, jtq.qrao.qrao21.qrac21_encode_ising),
+    ]
+    for transpile, encode in encoders:
+        qrac_builder = transpile(compiled_instance)
+        parametric, encoding_cache = qrac_builder.get_parametric_hamiltonian()
+        for multipliers in [None, {"onehot": 0.0}, {"onehot": 2.5}]:
+            qubo, constant = qrac_builder.pubo_builder.get_qubo_dict(
+                multipliers=multipliers
+            )
+            expected, offset, _ = encode(
+                jmt_qc.qubo_to_ising(qubo), encoding_cache.color_group
+            )
+            hamiltonian, hamiltonian_constant = parametric.with_multipliers(
+                multipliers
+            )
+            assert np.isclose(hamiltonian_constant, offset + constant)
+            assert np.allclose(hamiltonian.to_matrix(), expected.to_matrix())
+
+    qrac_builder = transpile_to_qrac_space_efficient_hamiltonian(compiled_instance)
+    parametric, encoding_cache = qrac_builder.get_parametric_hamiltonian()
+    for multipliers in [None, {"onehot": 2.5}]:
+        expected, expected_constant, _ = qrac_builder.get_hamiltonian(multipliers)
+        hamiltonian, constant = parametric.with_multipliers(multipliers)
+        assert np.isclose(constant, expected_constant)
+        assert np.allclose(hamiltonian.to_matrix(), expected.to_matrix())
+
+    # (3,2,p)-QRAC depends only on which terms are nonzero, so it is not affine in the multipliers.
+    qrac_builder = transpile_to_qrac32_hamiltonian(compiled_instance)
+    assert not hasattr(qrac_builder, "get_parametric_hamiltonian")
+
+
+def test_transpile_to_qrac31_coloring_cache():
+    n = jm.Placeholder("n")
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum((i, i < n - 1), x[i] * x[i + 1])
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 5})
+    qrac_builder = transpile_to_qrac31_hamiltonian(compiled_instance)
+    assert qrac_builder.coloring_cache is None
+    qrac_builder.coloring_cache = ColoringCache()
+    _, _, encoding_cache = qrac_builder.get_hamiltonian({"onehot": 1.0})
+    _, _, other = qrac_builder.get_hamiltonian({"onehot": 2.0})
+    assert other.color_group == encoding_cache.color_group
+    assert other.encoding == encoding_cache.encoding
+    info = qrac_builder.coloring_cache.cache_info()
+    assert (info.hits, info.misses, info.size) == (1, 1, 1)
+
+    # a coloring cached by another builder is reused
+    shared = transpile_to_qrac31_hamiltonian(compiled_instance)
+    shared.coloring_cache = qrac_builder.coloring_cache
+    shared.get_hamiltonian({"onehot": 3.0})
+    assert qrac_builder.coloring_cache.hits == 2
+
+    qrac_builder.coloring_cache = None
+    _, _, uncached = qrac_builder.get_hamiltonian({"onehot": 4.0})
+    assert uncached.color_group == encoding_cache.color_group
+
+
+def test_transpile_to_qrac31_incremental_coloring():
+    n = jm.Placeholder("n")
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum((i, i < n - 1), x[i] * x[i + 1])
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 5})
+    qrac_builder = transpile_to_qrac31_hamiltonian(compiled_instance)
+    qrac_builder.coloring_cache = ColoringCache()
+    # by default, every graph is colored from scratch regardless of the graphs seen before
+    qrac_builder.get_hamiltonian({"onehot": 1.0})
+    _, _, path = qrac_builder.get_hamiltonian({"onehot": 0.0})
+    assert len(path.color_group) == 2
+    assert qrac_builder.graph_coloring is None
+
+    qrac_builder.incremental_coloring = True
+    _, _, encoding_cache = qrac_builder.get_hamiltonian({"onehot": 1.0})
+    # the penalty vanishes and only the path remains, but the qubits of the spins are kept
+    _, _, repaired = qrac_builder.get_hamiltonian({"onehot": 0.0})
+    assert repaired.encoding == encoding_cache.encoding
+    assert len(repaired.color_group) > len(path.color_group)
+    # the repaired colorings are not cached
+    assert qrac_builder.coloring_cache.cache_info().misses == 2
+
+    qrac_builder.incremental_coloring = False
+    _, _, fresh = qrac_builder.get_hamiltonian({"onehot": 0.0})
+    assert fresh.color_group == path.color_group
+
+
+def test_create_pauli_operator():
+    Pauli = jtq.qrao.qrao31.Pauli
+    create_pauli_term = jtq.qrao.qrao31.create_pauli_term
+    paulis = [
+        ([Pauli.Z], [0]),
+        ([Pauli.X, Pauli.Y], [0, 2]),
+        ([Pauli.Z], [0]),
+        ([Pauli.Y, Pauli.X], [1, 0]),
+        ([Pauli.X, Pauli.Y], [0, 2]),
+        ([Pauli.Z, Pauli.X], [1, 1]),
+    ]
+    coeffs = [1.0, 2.0, 0.5, -1.5, -2.0, 3.0]
+    expected = sum(
+        qk_ope.SparsePauliOp(create_pauli_term(kinds, qubits, 3), coeff)
+        for (kinds, qubits), coeff in zip(paulis, coeffs)
+    ).simplify(atol=0)
+
+    operator = jtq.qrao.qrao31.create_pauli_operator(
+        np.repeat(np.arange(len(paulis)), [len(kinds) for kinds, _ in paulis]),
+        np.array([q for _, qubits in paulis for q in qubits]),
+        np.array([kind.value for kinds, _ in paulis for kind in kinds]),
+        np.array(coeffs),
+        3,
+    )
+    assert operator == expected
+    # the terms which cancel out are removed
+    assert len(operator) == 3
+
+    empty = jtq.qrao.qrao31.create_pauli_operator(
+        np.zeros(0, dtype=int),
+        np.zeros(0, dtype=int),
+        np.zeros(0, dtype=int),
+        np.zeros(0),
+        0,
+    )
+    assert empty == qk_ope.SparsePauliOp("I", 0)
@@ -13,6 +13,7 @@ from quri_parts.qulacs.sampler import create_qulacs_vector_sampler
 from scipy.optimize import OptimizeResult, minimize
 
 import jijmodeling_transpiler_quantum.quri_parts as jmt_qp
+from jijmodeling_transpiler_quantum.core.ising_qubo import calc_qubo_energy
 
 
 def run_qaoa(
@@ -49,17 +50,12 @@ def sample_result(
     result: OptimizeResult,
     ansatz: LinearMappedUnboundParametricQuantumCircuit,
     qaoa_builder: jmt_qp.QAOAAnsatzBuilder,
-    num_qubits: int,
     num_shots: int = 1000,
 ) -> jm.SampleSet:
     bind_ansatz_opt = ansatz.bind_parameters(result.x)
     sampler = create_qulacs_vector_sampler()
     sampling_result = sampler(bind_ansatz_opt, num_shots)
-    result_bits = {
-        bin(key)[2:].zfill(num_qubits)[::-1]: val
-        for key, val in sampling_result.items()
-    }
-    sampleset = qaoa_builder.decode_from_counts(result_bits)
+    sampleset = qaoa_builder.decode_from_counts(sampling_result)
     return sampleset
 
 
@@ -123,7 +119,6 @@ def test_qaoa_H_eigenvalue():
         result,
         qaoa_ansatz,
         qaoa_builder,
-        qaoa_ansatz.qubit_count,
         num_shots=num_shots,
     )
 
@@ -138,3 +133,269 @@ def test_qaoa_H_eigenvalue():
         ]
     ).all()
     assert len(sampleset.feasible().record.solution) != 0
+
+
+def test_qaoa_parametric_hamiltonian():
+    n = jm.Placeholder("n")
+    c = jm.Placeholder("c", ndim=1)
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, c[i] * x[i]) + x[0] * x[1]
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 3, "c": [1, -2, 3]})
+    qaoa_builder = jmt_qp.transpile_to_qaoa_ansatz(compiled_instance)
+    parametric = qaoa_builder.get_parametric_hamiltonian()
+
+    for multipliers in [None, {"onehot": 0.0}, {"onehot": 2.5}]:
+        expected, expected_constant = qaoa_builder.get_hamiltonian(multipliers)
+        hamiltonian, constant = parametric.with_multipliers(multipliers)
+        assert np.isclose(constant, expected_constant)
+        assert hamiltonian.keys() == expected.keys()
+        for label, coeff in expected.items():
+            assert np.isclose(hamiltonian[label], coeff)
+
+
+def test_to_ising_operator_from_qubo_label_cache():
+    from jijmodeling_transpiler_quantum.quri_parts.pauli_ir import (
+        PauliLabelCache,
+        pauli_ir_to_operator,
+    )
+    from jijmodeling_transpiler_quantum.core.pauli import PauliCode, PauliIR
+
+    qubo = {(0, 0): 1.0, (0, 1): -2.0, (1, 2): 3.0, (2, 2): -1.0}
+    operator, offset = jmt_qp.qaoa.ising_hamiltonian.to_ising_operator_from_qubo(
+        qubo, 3
+    )
+    # the linear term of the spin 0 vanishes
+    assert operator == Operator(
+        {
+            pauli_label("Z1"): -0.25,
+            pauli_label("Z2"): -0.25,
+            pauli_label("Z0 Z1"): -0.5,
+            pauli_label("Z1 Z2"): 0.75,
+            PAULI_IDENTITY: 0.25,
+        }
+    )
+    assert list(operator)[-1] == PAULI_IDENTITY and offset == 0.25
+
+    cache = PauliLabelCache(max_size=2)
+    X, Y, Z = PauliCode.X, PauliCode.Y, PauliCode.Z
+    ir = PauliIR.from_terms(
+        [0, 1, 1, 2, 2, 2],
+        [4, 1, 0, 0, 1, 2],
+        [Y, Z, X, Z, Z, X],
+        [1.0, 2.0, 3.0],
+        5,
+    )
+    expected = Operator(
+        {
+            pauli_label("Y4"): 1.0,
+            pauli_label("X0 Z1"): 2.0,
+            pauli_label("Z0 Z1 X2"): 3.0,
+        }
+    )
+    assert pauli_ir_to_operator(ir, cache) == expected
+    # the terms on three qubits are not cached
+    assert len(cache) == 2
+    assert pauli_ir_to_operator(ir, cache) == expected
+    assert pauli_ir_to_operator(ir, PauliLabelCache(max_size=0)) == expected
+
+
+def test_qaoa_simulator():
+    n = jm.Placeholder("n")
+    c = jm.Placeholder("c", ndim=1)
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, c[i] * x[i]) + x[0] * x[1]
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 4, "c": [1, -2, 3, 0.5]})
+    qaoa_builder = jmt_qp.transpile_to_qaoa_ansatz(compiled_instance)
+    multipliers = {"onehot": 2.0}
+    qaoa_ansatz, hamiltonian, _ = qaoa_builder.get_qaoa_ansatz(
+        p=2, multipliers=multipliers
+    )
+    parameters = [0.3, -0.7, 0.2, 0.5]
+    estimator = create_qulacs_vector_parametric_estimator()
+    state = ParametricCircuitQuantumState(qaoa_ansatz.qubit_count, qaoa_ansatz)
+    expected = estimator(hamiltonian, state, parameters).value.real
+
+    simulator = qaoa_builder.get_qaoa_simulator(multipliers, num_workers=2)
+    qubo, constant = qaoa_builder.pubo_builder.get_qubo_dict(multipliers=multipliers)
+    # The operator includes the constant of the Ising model but not that of the QUBO.
+    assert np.isclose(
+        simulator.expectation(parameters[0::2], parameters[1::2]), expected + constant
+    )
+
+
+def test_qaoa_value_and_grad():
+    n = jm.Placeholder("n")
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, (i + 1) * x[i]) - 2 * x[0] * x[2]
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 3})
+    qaoa_builder = jmt_qp.transpile_to_qaoa_ansatz(compiled_instance)
+    qaoa_ansatz, hamiltonian, _ = qaoa_builder.get_qaoa_ansatz(p=2)
+    _, constant = qaoa_builder.pubo_builder.get_qubo_dict()
+    estimator = create_qulacs_vector_parametric_estimator()
+    state = ParametricCircuitQuantumState(qaoa_ansatz.qubit_count, qaoa_ansatz)
+
+    def energy(parameters):
+        return estimator(hamiltonian, state, list(parameters)).value.real + constant
+
+    value_and_grad = qaoa_builder.get_qaoa_value_and_grad()
+    # [gamma0, beta0, gamma1, beta1]
+    parameters = np.array([0.1, 0.4, 0.3, -0.2])
+    value, grad = value_and_grad(parameters)
+    assert np.isclose(value, energy(parameters))
+    eps = 1e-6
+    for k in range(len(parameters)):
+        shift = eps * np.eye(len(parameters))[k]
+        diff = energy(parameters + shift) - energy(parameters - shift)
+        assert np.isclose(grad[k], diff / (2 * eps), atol=1e-6)
+
+    result = minimize(value_and_grad, parameters, jac=True, method="BFGS")
+    assert result.fun <= value
+
+
+def test_qaoa_run_rqaoa():
+    n = jm.Placeholder("n")
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, (i + 1) * x[i])
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 6})
+    qaoa_builder = jmt_qp.transpile_to_qaoa_ansatz(compiled_instance)
+    sampleset = qaoa_builder.run_rqaoa(multipliers={"onehot": 10.0}, cutoff=3)
+
+    assert sampleset.record.num_occurrences == [1]
+    assert len(sampleset.feasible().record.num_occurrences) == 1
+    assert sampleset.evaluation.objective == [1.0]
+
+
+def test_qaoa_decode_integer_counts():
+    n = jm.Placeholder("n")
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, (i + 1) * x[i])
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 3})
+    qaoa_builder = jmt_qp.transpile_to_qaoa_ansatz(compiled_instance)
+
+    # The bit k of an integer key is x[k], and "11" is padded to "110".
+    sampleset = qaoa_builder.decode_from_counts({4: 4, "001": 2, 6: 3, "11": 1})
+    assert sampleset.record.num_occurrences == [6, 3, 1]
+    assert list(sampleset.evaluation.objective) == [3.0, 5.0, 3.0]
+    assert len(sampleset.feasible().record.num_occurrences) == 1
+
+    string_counts = {"001": 6, "011": 3, "110": 1}
+    expected = qaoa_builder.decode_from_counts(string_counts)
+    assert list(expected.evaluation.objective) == [3.0, 5.0, 3.0]
+
+
+def test_qaoa_decode_from_probs():
+    n = jm.Placeholder("n")
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, (i + 1) * x[i])
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 3})
+    qaoa_builder = jmt_qp.transpile_to_qaoa_ansatz(compiled_instance)
+
+    # The bit k of an index is x[k].
+    probs = np.array([0.0, 0.5, 0.2, 0.0, 0.25, 0.05, 0.0, 0.0])
+    sampleset = qaoa_builder.decode_from_probs(probs, top_k=3)
+    assert sampleset.record.num_occurrences == [1, 1, 1]
+    assert sampleset.metadata["probabilities"] == [0.5, 0.25, 0.2]
+    assert list(sampleset.evaluation.objective) == [1.0, 3.0, 2.0]
+
+    # Filtering keeps the assignment of the default decoding.
+    default = qaoa_builder.decode_from_probs(probs)
+    filtered = qaoa_builder.decode_from_probs(probs, threshold=0.0)
+    default_pairs = [
+        (objective, count)
+        for objective, count in zip(
+            default.evaluation.objective, default.record.num_occurrences
+        )
+        if count > 0
+    ]
+    assert sorted(default_pairs) == sorted(
+        zip(
+            filtered.evaluation.objective,
+            [int(prob * 10000) for prob in filtered.metadata["probabilities"]],
+        )
+    )
+
+
+def test_qaoa_energy_statistics():
+    n = jm.Placeholder("n")
+    c = jm.Placeholder("c", ndim=1)
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.sum(i, c[i] * x[i]) + x[0] * x[1]
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 4, "c": [1, -2, 3, 0.5]})
+    qaoa_builder = jmt_qp.transpile_to_qaoa_ansatz(compiled_instance)
+    multipliers = {"onehot": 2.0}
+
+    counts = {"0100": 6, "1100": 1, "0000": 3}
+    statistics = qaoa_builder.get_energy_statistics(counts, multipliers)
+    qubo, constant = qaoa_builder.pubo_builder.get_qubo_dict(multipliers=multipliers)
+    energies = [
+        sum(value * int(key[i]) * int(key[j]) for (i, j), value in qubo.items())
+        + constant
+        for key in counts
+    ]
+    assert np.allclose(statistics.energies, sorted(energies))
+    assert statistics.weights.tolist() == [6, 3, 1]
+    assert np.isclose(statistics.cvar(0.5), energies[0])
+
+    # The bit k of an integer key is x[k].
+    int_statistics = qaoa_builder.get_energy_statistics({2: 6, 3: 1, 0: 3}, multipliers)
+    assert np.array_equal(int_statistics.energies, statistics.energies)
+    assert np.array_equal(int_statistics.weights, statistics.weights)
+    # 1 is x[0] = 1 and 8 is x[3] = 1, whose energies differ.
+    int_statistics = qaoa_builder.get_energy_statistics({1: 1, 8: 3}, multipliers)
+    expected = sorted(
+        [
+            (calc_qubo_energy(qubo, [1, 0, 0, 0]) + constant, 1),
+            (calc_qubo_energy(qubo, [0, 0, 0, 1]) + constant, 3),
+        ]
+    )
+    assert np.allclose(int_statistics.energies, [energy for energy, _ in expected])
+    assert int_statistics.weights.tolist() == [weight for _, weight in expected]
+
+    simulator = qaoa_builder.get_qaoa_simulator(multipliers)
+    gammas, betas = [0.3, -0.2], [0.4, 0.1]
+    probs = simulator.probabilities(gammas, betas)
+
+    # The probabilities of the simulator are passed as they are.
+    # The mean over the exact probabilities is the expectation of the ansatz.
+    statistics = qaoa_builder.get_energy_statistics(probs, multipliers)
+    assert np.isclose(statistics.mean(), simulator.expectation(gammas, betas))
+    assert np.allclose(statistics.energies, np.sort(simulator.energies[probs > 0]))
+
+    sampleset = qaoa_builder.decode_from_probs(probs, top_k=3)
+    top_k = simulator.top_k(gammas, betas, 3)
+    expected = qaoa_builder.decode_from_counts({bits: 1 for bits, _ in top_k})
+    assert sampleset.record.solution == expected.record.solution
+    assert np.allclose(sampleset.metadata["probabilities"], [p for _, p in top_k])
+    indices = np.argsort(-probs, kind="stable")[:3]
+    decoded_energies = [
+        calc_qubo_energy(qubo, [int(b) for b in bits]) + constant for bits, _ in top_k
+    ]
+    assert np.allclose(decoded_energies, simulator.energies[indices])
@@ -78,4 +78,61 @@ def test_check_linear_term_from_qubo():
     qrac_hamiltonian, offset, encoding = qrac_builder.get_hamiltonian()
 
     qrac_builder = transpile_to_qrac32_hamiltonian(compiled_model)
-    qrac_hamiltonian, offset, encoding = qrac_builder.get_hamiltonian()
\ No newline at end of file
+    qrac_hamiltonian, offset, encoding = qrac_builder.get_hamiltonian()
+
+def test_transpile_to_qrac_parametric_hamiltonian():
+    n = jm.Placeholder("n")
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("sample")
+    problem += jm.Constraint("onehot", jm.sum(i, x[i]) == 1)
+
+    compiled_instance = jmt.core.compile_model(problem, {"n": 4})
+    for transpile in [
+        transpile_to_qrac31_hamiltonian,
+        transpile_to_qrac21_hamiltonian,
+    ]:
+        qrac_builder = transpile(compiled_instance)
+        parametric, encoding_cache = qrac_builder.get_parametric_hamiltonian()
+        for multipliers in [None, {"onehot": 2.5}]:
+            expected, expected_constant, expected_cache = (
+                qrac_builder.get_hamiltonian(multipliers)
+            )
+            hamiltonian, constant = parametric.with_multipliers(multipliers)
+            assert encoding_cache == expected_cache
+            assert np.isclose(constant, expected_constant)
+            for label, coeff in expected.items():
+                assert np.isclose(hamiltonian[label], coeff)
+
+
+def test_qrac32_encode_ising_same_as_qiskit():
+    import jijmodeling_transpiler_quantum.qiskit as jmt_qk
+    from quri_parts.core.operator import PauliLabel
+
+    from jijmodeling_transpiler_quantum.core.ising_qubo import IsingModel
+    from jijmodeling_transpiler_quantum.quri_parts.qrao.qrao32 import (
+        qrac32_encode_ising,
+    )
+
+    ising = IsingModel(
+        quad={(0, 1): 1.0, (1, 3): -2.0, (0, 2): 0.5, (2, 3): 1.0},
+        linear={0: 1.0, 4: -1.0},
+        constant=0.5,
+    )
+    color_group = {0: [0, 1, 2], 1: [3, 4]}
+    operator, offset, _ = qrac32_encode_ising(ising, color_group)
+    qiskit_operator, qiskit_offset, _ = jmt_qk.qrao.qrao32.qrac32_encode_ising(
+        ising, color_group
+    )
+
+    # The qubit k is the k-th bit from the right of a Pauli string of qiskit.
+    expected = {
+        PauliLabel(
+            (k, "IXYZ".index(p))
+            for k, p in enumerate(reversed(label))
+            if p != "I"
+        ): coeff
+        for label, coeff in qiskit_operator.to_list()
+    }
+    assert operator == expected
+    assert offset == qiskit_offset
@@ -0,0 +1,116 @@
+import numpy as np
+
+from jijmodeling_transpiler_quantum.core.cache import (
+    ColoringCache,
+    HamiltonianCache,
+    LRUCache,
+    cached_hamiltonian,
+    canonical_key,
+    estimate_nbytes,
+    graph_fingerprint,
+)
+from jijmodeling_transpiler_quantum.core.qrac import ColoringStrategy
+
+
+def test_canonical_key():
+    detail = {"onehot": {(0,): (1.0, 2.0), (1,): (0.5, 1.0)}}
+    reordered = {"onehot": {(1,): (0.5, 1), (0,): (1, 2.0)}}
+    assert canonical_key({"a": 1, "b": 2.0}, detail) == canonical_key(
+        {"b": np.float64(2.0), "a": 1.0}, reordered
+    )
+    assert canonical_key({"a": 1.0}) != canonical_key({"a": 1.0}, detail)
+    assert canonical_key(None) != canonical_key({})
+
+
+def test_hamiltonian_cache_lru():
+    cache = HamiltonianCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    # "b" is the least recently used
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    assert cache.invalidate("a")
+    assert not cache.invalidate("a")
+    assert len(cache) == 1
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_hamiltonian_cache_max_bytes():
+    array = np.zeros(1000)
+    nbytes = estimate_nbytes((array, 1.0))
+    assert nbytes >= array.nbytes
+
+    cache = HamiltonianCache(max_size=None, max_bytes=int(2.5 * nbytes))
+    for key in ["a", "b", "c"]:
+        cache.put(key, (np.zeros(1000), 1.0))
+    assert len(cache) == 2
+    assert "a" not in cache
+    assert cache.nbytes <= cache.max_bytes
+
+    # a value larger than the limit is not stored
+    cache.put("d", (np.zeros(10000), 1.0))
+    assert "d" not in cache
+    assert cache.cache_info().size == 2
+
+
+def test_cached_hamiltonian_arguments():
+    class Builder:
+        def __init__(self):
+            self.hamiltonian_cache = HamiltonianCache()
+            self.calls = 0
+
+        @cached_hamiltonian
+        def get_hamiltonian(self, multipliers=None, detail_parameters=None, scale=1.0):
+            """Scaled multipliers."""
+            self.calls += 1
+            return {name: scale * value for name, value in (multipliers or {}).items()}
+
+    builder = Builder()
+    assert builder.get_hamiltonian.__doc__ == "Scaled multipliers."
+    assert builder.get_hamiltonian({"a": 1.0}) == {"a": 1.0}
+    assert builder.get_hamiltonian({"a": 1.0}, scale=2.0) == {"a": 2.0}
+    assert builder.calls == 2
+    # the same arguments written in another way hit the cache
+    assert builder.get_hamiltonian({"a": 1}, None, 2) == {"a": 2.0}
+    assert builder.get_hamiltonian(multipliers={"a": 1.0}, scale=1.0) == {"a": 1.0}
+    assert builder.calls == 2
+
+    builder.hamiltonian_cache = None
+    assert builder.get_hamiltonian({"a": 1.0}, scale=3.0) == {"a": 3.0}
+    assert builder.calls == 3
+
+
+def test_graph_fingerprint():
+    graph = [(0, 1), (2, 1), (3, 3)]
+    assert graph_fingerprint(graph, 3) == graph_fingerprint(
+        np.array([[1, 2], [1, 0], [0, 1]]), 3
+    )
+    assert graph_fingerprint(graph, 3) == graph_fingerprint(
+        graph, 3, ColoringStrategy.GREEDY
+    )
+    assert graph_fingerprint(graph, 3) != graph_fingerprint(graph, 2)
+    assert graph_fingerprint(graph, 3) != graph_fingerprint(graph, 3, "dsatur")
+    assert graph_fingerprint(graph, 3) != graph_fingerprint([(0, 1), (2, 0)], 3)
+    assert graph_fingerprint([], 3) != graph_fingerprint([(0, 1)], 3)
+
+
+def test_coloring_cache_on_disk(tmp_path):
+    assert issubclass(ColoringCache, LRUCache)
+    assert not issubclass(ColoringCache, HamiltonianCache)
+
+    key = graph_fingerprint([(0, 1), (1, 2)], 2)
+    color_group = {1: [1], 0: [0, 2]}
+    ColoringCache(path=tmp_path).put(key, color_group)
+
+    cache = ColoringCache(path=tmp_path)
+    loaded = cache.get(key)
+    assert loaded == color_group and list(loaded) == [1, 0]
+    assert (cache.hits, cache.misses) == (1, 0)
+    assert key in cache
+    assert cache.get(graph_fingerprint([(0, 1)], 2)) is None
+    assert cache.misses == 1
@@ -1,4 +1,19 @@
-from jijmodeling_transpiler_quantum.core.ising_qubo import qubo_to_ising
+import itertools
+
+import numpy as np
+import scipy.sparse as sp
+
+from jijmodeling_transpiler_quantum.core.ising_qubo import (
+    IsingModel,
+    LocalFieldCache,
+    ParametricIsingModel,
+    calc_qubo_energies,
+    calc_qubo_energy,
+    enumerate_ground_states,
+    qubo_to_ising,
+    qubo_to_ising_arrays,
+    steepest_descent,
+)
 
 
 def test_onehot_conversion():
@@ -7,3 +22,155 @@ def test_onehot_conversion():
     assert ising.constant == -0.5
     assert ising.linear == {}
     assert ising.quad == {(0, 1): 0.5}
+
+
+def random_qubo(num_vars: int, seed: int) -> dict[tuple[int, int], float]:
+    rng = np.random.default_rng(seed)
+    qubo = {}
+    for i in range(num_vars):
+        for j in range(i, num_vars):
+            if rng.random() < 0.5:
+                qubo[(i, j)] = float(rng.normal())
+    return qubo
+
+
+def test_calc_energies():
+    num_vars = 8
+    qubo = random_qubo(num_vars, seed=0)
+    ising = qubo_to_ising(qubo)
+    rng = np.random.default_rng(1)
+    binaries = rng.integers(0, 2, size=(50, num_vars))
+    spins = 1 - 2 * binaries
+
+    energies = ising.calc_energies(spins)
+    expected = [ising.calc_energy(spin) for spin in spins.tolist()]
+    assert np.allclose(energies, expected)
+
+    qubo_energies = calc_qubo_energies(qubo, binaries)
+    expected = [calc_qubo_energy(qubo, b) for b in binaries.tolist()]
+    assert np.allclose(qubo_energies, expected)
+    assert np.allclose(qubo_energies, energies)
+
+
+def test_ising_arrays_round_trip():
+    ising = IsingModel({(0, 1): 2.0, (1, 2): -1.0, (2, 2): 0.5}, {0: 1.0}, 3.0)
+    arrays = ising.to_arrays()
+    assert arrays.num_spins == 3
+    assert arrays.to_ising_model() == ising
+
+    indptr, indices, data = arrays.to_csr()
+    assert indptr.tolist() == [0, 1, 3, 4]
+    assert indices.tolist() == [1, 0, 2, 1]
+    assert data.tolist() == [2.0, 2.0, -1.0, -1.0]
+
+
+def test_qubo_to_ising_arrays():
+    num_vars = 6
+    qubo = random_qubo(num_vars, seed=2)
+    row = np.array([i for i, _ in qubo.keys()])
+    col = np.array([j for _, j in qubo.keys()])
+    value = np.array(list(qubo.values()))
+
+    ising = qubo_to_ising(qubo)
+    from_triplets = qubo_to_ising_arrays((row, col, value))
+    from_sparse = qubo_to_ising_arrays(
+        sp.coo_matrix((value, (row, col)), shape=(num_vars, num_vars)).tocsr()
+    )
+    assert from_triplets.to_ising_model() == ising
+
+    spins = 1 - 2 * np.random.default_rng(3).integers(0, 2, size=(20, num_vars))
+    assert np.allclose(from_sparse.calc_energies(spins), ising.calc_energies(spins))
+
+
+def test_qubo_to_ising_arrays_symmetrize():
+    # Q_{01} and Q_{10} are merged into one term
+    ising = qubo_to_ising_arrays({(0, 1): 1.0, (1, 0): 1.0, (0, 0): -1.0})
+    assert ising.quad_row.tolist() == [0]
+    assert ising.quad_col.tolist() == [1]
+    assert ising.quad_coeff.tolist() == [0.5]
+
+
+def test_local_field_cache():
+    num_vars = 10
+    ising = qubo_to_ising(random_qubo(num_vars, seed=4))
+    rng = np.random.default_rng(5)
+    state = (1 - 2 * rng.integers(0, 2, size=num_vars)).tolist()
+    cache = LocalFieldCache(ising, state)
+    assert np.isclose(cache.energy, ising.calc_energy(state))
+
+    for i in rng.integers(0, num_vars, size=30).tolist():
+        flipped = list(state)
+        flipped[i] = -flipped[i]
+        expected = ising.calc_energy(flipped) - ising.calc_energy(state)
+        assert np.isclose(cache.delta_energy(i), expected)
+        assert np.isclose(cache.flip(i), expected)
+        state = flipped
+        assert cache.state.tolist() == state
+        assert np.isclose(cache.energy, ising.calc_energy(state))
+
+
+def test_steepest_descent():
+    num_vars = 10
+    ising = qubo_to_ising(random_qubo(num_vars, seed=6))
+    spins = 1 - 2 * np.random.default_rng(7).integers(0, 2, size=(40, num_vars))
+
+    refined = steepest_descent(ising, spins)
+    assert np.all(ising.calc_energies(refined) <= ising.calc_energies(spins))
+
+    # no single flip improves a refined state
+    for state in refined:
+        cache = LocalFieldCache(ising, state)
+        assert np.all(cache.delta_energies() > -1e-9)
+
+    parallel = steepest_descent(ising, spins, n_jobs=2, chunk_size=16)
+    assert np.array_equal(parallel, refined)
+
+
+def test_enumerate_ground_states():
+    num_vars = 9
+    ising = qubo_to_ising(random_qubo(num_vars, seed=8))
+    all_states = np.array(list(itertools.product([1, -1], repeat=num_vars)))
+    expected = np.sort(ising.calc_energies(all_states))[:4]
+
+    for block_bits, num_shards in [(16, None), (3, 1), (3, 8)]:
+        energies, states = enumerate_ground_states(
+            ising, top_k=4, block_bits=block_bits, num_shards=num_shards
+        )
+        assert np.allclose(energies, expected)
+        assert np.allclose(ising.calc_energies(states), energies)
+
+    energies, _ = enumerate_ground_states(ising, top_k=4, block_bits=3, n_jobs=2)
+    assert np.allclose(energies, expected)
+
+
+def test_parametric_ising_model():
+    objective, penalty_a, penalty_b = (random_qubo(6, seed) for seed in range(3))
+    penalty_b = {key: value for key, value in penalty_b.items() if key[0] < 3}
+    model = ParametricIsingModel.from_qubos(
+        ["a", "b"], [objective, penalty_a, penalty_b], [0.5, 1.0, 2.0], 6
+    )
+    states = np.array(list(itertools.product([-1, 1], repeat=6)))
+    for multipliers in [{"a": 0.0, "b": 0.0}, {"a": 2.0}, {"a": 0.3, "b": 5.0}]:
+        m_a, m_b = multipliers.get("a", 1.0), multipliers.get("b", 1.0)
+        qubo = {key: objective.get(key, 0.0) for key in objective}
+        for penalty, m in [(penalty_a, m_a), (penalty_b, m_b)]:
+            for key, value in penalty.items():
+                qubo[key] = qubo.get(key, 0.0) + m * value
+        expected = qubo_to_ising_arrays(qubo, num_spins=6).calc_energies(states)
+        energies = model.with_multipliers(multipliers).calc_energies(states)
+        assert np.allclose(energies, expected)
+
+
+def test_ising_arrays_substitute():
+    ising = IsingModel(
+        {(0, 2): 1.5, (2, 4): -2.0, (1, 2): 0.5, (3, 4): 1.0}, {2: 0.7, 4: -0.2}, 1.0
+    )
+    arrays = ising.to_arrays()
+    states = np.array(list(itertools.product([1, -1], repeat=5)))
+    # z_2 = -z_4
+    states = states[states[:, 2] == -states[:, 4]]
+    expected = arrays.calc_energies(states)
+    arrays.substitute(2, 4, -1)
+    assert 2 not in arrays.quad_row and 2 not in arrays.quad_col
+    assert 2 not in arrays.linear_index
+    assert np.allclose(arrays.calc_energies(states), expected)
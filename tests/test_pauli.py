@@ -0,0 +1,58 @@
+import numpy as np
+
+from jijmodeling_transpiler_quantum.core.ising_qubo import IsingModel
+from jijmodeling_transpiler_quantum.core.pauli import (
+    PauliCode,
+    PauliIR,
+    ising_to_pauli_ir,
+    qrac32_encode_ising_ir,
+)
+
+
+def test_pauli_ir_from_terms():
+    X, Y, Z = PauliCode.X, PauliCode.Y, PauliCode.Z
+    # Z1 X0, X0 Z1 (same term), X0 Z0 (= Y0), Y0 with the opposite sign, X2
+    ir = PauliIR.from_terms(
+        np.array([0, 0, 1, 1, 2, 2, 3, 4]),
+        np.array([1, 0, 0, 1, 0, 0, 0, 2]),
+        np.array([Z, X, X, Z, X, Z, Y, X]),
+        np.array([1.0, 2.0, 3.0, -3.0, 0.5]),
+        3,
+    )
+    assert ir.indptr.tolist() == [0, 2, 3]
+    assert ir.qubits.tolist() == [0, 1, 2]
+    assert ir.codes.tolist() == [X, Z, X]
+    assert ir.coeffs.tolist() == [3.0, 0.5]
+    assert ir.qubits.dtype == np.int32 and ir.codes.dtype == np.int8
+
+    z, x = ir.to_symplectic()
+    assert z.tolist() == [[False, True, False], [False, False, False]]
+    assert x.tolist() == [[True, False, False], [False, False, True]]
+
+    assert len(PauliIR.from_terms([0], [0], [Z], [0.0], 1)) == 0
+
+
+def test_ising_to_pauli_ir():
+    ising = IsingModel(
+        quad={(0, 1): 1.0, (2, 2): 2.0, (1, 2): 0.0}, linear={0: -1.0}, constant=0.5
+    )
+    ir, offset = ising_to_pauli_ir(ising, 3)
+    assert offset == 2.5
+    assert ir.indptr.tolist() == [0, 1, 3]
+    assert ir.qubits.tolist() == [0, 0, 1]
+    assert set(ir.codes.tolist()) == {PauliCode.Z}
+    assert ir.coeffs.tolist() == [-1.0, 1.0]
+
+
+def test_qrac32_encode_ising_ir():
+    ising = IsingModel(quad={(0, 1): 1.0}, linear={0: 1.0}, constant=0.0)
+    ir, _, encoding = qrac32_encode_ising_ir(ising, {0: [0], 1: [1]})
+    assert ir.num_qubits == 4
+    assert encoding == {0: (0, PauliCode.Z), 1: (1, PauliCode.Z)}
+    # the qubits of each term are increasing and on the qubits of the colors
+    for start, stop in zip(ir.indptr[:-1], ir.indptr[1:]):
+        qubits = ir.qubits[start:stop]
+        assert np.all(np.diff(qubits) > 0)
+        assert set(qubits.tolist()) <= {0, 1, 2, 3}
+    # Z' = ZZ - 1/2 XI - 1/2 ZX on the qubits 0 and 1, and the 9 products of Z' Z'
+    assert len(ir) == 3 + 9
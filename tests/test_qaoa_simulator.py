@@ -0,0 +1,109 @@
+import itertools
+
+import numpy as np
+
+from jijmodeling_transpiler_quantum.core.ising_qubo import IsingModel
+from jijmodeling_transpiler_quantum.core.qaoa import (
+    DiagonalQAOASimulator,
+    LightconeQAOAEngine,
+    P1ExpectationEvaluator,
+    ising_energy_diagonal,
+    rqaoa,
+)
+
+
+def random_ising(num_spins: int, seed: int) -> IsingModel:
+    rng = np.random.default_rng(seed)
+    quad = {
+        (i, j): rng.normal()
+        for i, j in itertools.combinations_with_replacement(range(num_spins), 2)
+        if rng.random() < 0.5
+    }
+    linear = {i: rng.normal() for i in range(num_spins) if rng.random() < 0.7}
+    return IsingModel(quad, linear, rng.normal())
+
+
+def test_ising_energy_diagonal():
+    ising = random_ising(6, 0)
+    states = 1 - 2 * ((np.arange(1 << 6)[:, None] >> np.arange(6)) & 1)
+    assert np.allclose(ising_energy_diagonal(ising, 6), ising.calc_energies(states))
+
+
+def test_diagonal_qaoa_simulator_chunks():
+    ising = random_ising(8, 1)
+    gammas, betas = [0.4, -0.1, 0.3], [0.2, 0.6, -0.5]
+    expected = DiagonalQAOASimulator(ising, 8, num_workers=1)
+    simulator = DiagonalQAOASimulator(ising, 8, num_workers=3, chunk_size=16)
+    state = simulator.statevector(gammas, betas)
+    assert np.isclose(np.linalg.norm(state), 1.0)
+    assert np.allclose(state, expected.statevector(gammas, betas))
+    assert np.isclose(
+        simulator.expectation(gammas, betas), expected.expectation(gammas, betas)
+    )
+
+    top = simulator.top_k(gammas, betas, 4)
+    probabilities = simulator.probabilities(gammas, betas)
+    assert [p for _, p in top] == sorted(probabilities, reverse=True)[:4]
+    for bits, p in top:
+        assert probabilities[int(bits[::-1], 2)] == p
+
+
+def test_p1_expectation_evaluator():
+    for seed in range(3):
+        ising = random_ising(7, seed)
+        simulator = DiagonalQAOASimulator(ising, 7)
+        evaluator = P1ExpectationEvaluator(ising, 7)
+        for gamma, beta in [(0.3, -0.2), (-1.1, 0.7)]:
+            value, grad_gamma, grad_beta = evaluator.value_and_grad(gamma, beta)
+            expected, grad_gammas, grad_betas = simulator.value_and_grad(
+                [gamma], [beta]
+            )
+            assert np.isclose(value, expected)
+            assert np.isclose(grad_gamma, grad_gammas[0])
+            assert np.isclose(grad_beta, grad_betas[0])
+
+    gammas, betas = np.linspace(-1, 1, 5), np.linspace(-0.5, 0.5, 4)
+    energies = evaluator.energy_grid(gammas, betas)
+    assert np.allclose(
+        energies,
+        [[evaluator.expectation(gamma, beta) for beta in betas] for gamma in gammas],
+    )
+    gamma, beta, value = evaluator.grid_search(gammas, betas)
+    assert value == energies.min()
+    assert evaluator.expectation(gamma, beta) == value
+
+
+def test_lightcone_qaoa_engine():
+    ising = random_ising(9, 3)
+    # Keep the graph sparse so that the lightcones are smaller than the graph.
+    ising.quad = {
+        (i, j): value for (i, j), value in ising.quad.items() if abs(i - j) <= 2
+    }
+    simulator = DiagonalQAOASimulator(ising, 9)
+    for p in [1, 2]:
+        engine = LightconeQAOAEngine(ising, p, 9, n_jobs=2)
+        gammas, betas = np.linspace(0.1, 0.5, p), np.linspace(-0.3, 0.4, p)
+        assert np.isclose(
+            engine.expectation(gammas, betas), simulator.expectation(gammas, betas)
+        )
+
+    ring = IsingModel({(k, (k + 1) % 30): 1.0 for k in range(30)}, {}, 0.0)
+    engine = LightconeQAOAEngine(ring, 2)
+    assert len(engine.lightcones) == 1
+    assert engine.weights.tolist() == [30.0]
+
+
+def test_rqaoa():
+    for seed in range(3):
+        ising = random_ising(10, seed)
+        result = rqaoa(ising, 10, cutoff=4)
+        assert len(result.eliminations) >= 6
+        assert np.isclose(result.energy, ising.calc_energy(result.spins.tolist()))
+        eliminated = [spin for spin, _, _ in result.eliminations]
+        assert len(set(eliminated)) == len(eliminated)
+        for spin, target, sign in result.eliminations:
+            assert result.spins[spin] == sign * result.spins[target]
+
+    ring = IsingModel({(k, (k + 1) % 12): 1.0 for k in range(12)}, {}, 0.0)
+    assert rqaoa(ring, cutoff=4).energy == -12.0
+
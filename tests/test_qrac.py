@@ -1,11 +1,15 @@
 import jijmodeling as jm
+import numpy as np
 import jijmodeling_transpiler.core as jtc
 import jijmodeling_transpiler_quantum.qiskit as jtqk
 import jijmodeling_transpiler_quantum.quri_parts as jtqp
 from jijmodeling_transpiler_quantum.core.ising_qubo import IsingModel, qubo_to_ising
 from jijmodeling_transpiler_quantum.core.qrac import (
+    ColoringStrategy,
+    IncrementalGraphColoring,
     check_linear_term,
     greedy_graph_coloring,
+    jones_plassmann_coloring,
 )
 
 
@@ -150,4 +154,127 @@ def test_check_no_quad_term_quri():
     qrac_hamiltonian, offset, encoding = jtqp.qrao.qrac21_encode_ising(
         ising, color_group
     )
-    
\ No newline at end of file
+    
+
+def test_check_linear_term_array():
+    color_group = check_linear_term(
+        {0: [0, 1], 2: [2]}, np.array([5, 1, 3, 5, 4, 2, 6]), 2
+    )
+    assert color_group == {0: [0, 1], 2: [2], 3: [5, 3], 4: [4, 6]}
+    assert all(type(i) is int for group in color_group.values() for i in group)
+
+    assert check_linear_term({}, np.arange(3), 3) == {0: [0, 1, 2]}
+    assert check_linear_term({0: [0]}, np.array([], dtype=np.int64), 3) == {0: [0]}
+
+
+def test_greedy_graph_coloring():
+    graph = [(0, 1), (1, 0), (1, 2), (2, 0), (0, 4), (3, 3), (4, 0)]
+    coloring, color_group = greedy_graph_coloring(graph, 2)
+    assert coloring == {0: 0, 1: 1, 2: 2, 4: 1}
+    assert color_group == {0: [0], 1: [1, 4], 2: [2]}
+
+    coloring, color_group = greedy_graph_coloring(
+        [(0, 1), (1, 2), (2, 3)], 3, init_coloring={5: 1, 6: 1, 1: 0}
+    )
+    # color 1 is full after 0 joins it
+    assert coloring == {5: 1, 6: 1, 1: 0, 0: 1, 2: 2, 3: 0}
+    assert color_group == {1: [5, 6, 0], 0: [1, 3], 2: [2]}
+
+
+def test_coloring_strategy():
+    # first-fit in the order 2, 4, 1, 5 needs 3 colors for this path
+    graph = [(2, 4), (1, 5), (4, 5)]
+    _, color_group = greedy_graph_coloring(graph, 4)
+    assert len(color_group) == 3
+    for strategy in [
+        ColoringStrategy.DSATUR,
+        ColoringStrategy.LARGEST_FIRST,
+        ColoringStrategy.RANDOM,
+    ]:
+        _, color_group = greedy_graph_coloring(graph, 4, coloring_strategy=strategy)
+        assert len(color_group) == 2
+    _, color_group = greedy_graph_coloring(graph, 1, coloring_strategy="dsatur")
+    assert color_group == {0: [4], 1: [5], 2: [2], 3: [1]}
+
+    n = 6
+    crown = [(2 * i, 2 * j + 1) for i in range(n) for j in range(n) if i != j]
+    for strategy in ColoringStrategy:
+        for max_color_group_size in [2, 3, n]:
+            coloring, color_group = greedy_graph_coloring(
+                crown, max_color_group_size, coloring_strategy=strategy
+            )
+            assert all(coloring[i] != coloring[j] for i, j in crown)
+            assert all(
+                len(group) <= max_color_group_size for group in color_group.values()
+            )
+            assert sorted(color_group) == list(range(len(color_group)))
+
+
+def test_jones_plassmann_coloring():
+    rng = np.random.default_rng(0)
+    graph = [tuple(edge) for edge in rng.integers(0, 300, size=(1200, 2)).tolist()]
+    init_coloring = {1000: 0, 1001: 0, 1002: 1}
+    coloring, color_group = jones_plassmann_coloring(
+        graph, 3, init_coloring=init_coloring
+    )
+    # the coloring does not depend on the chunks and the processes
+    assert (coloring, color_group) == jones_plassmann_coloring(
+        graph, 3, init_coloring=init_coloring, chunk_size=100
+    )
+    assert (coloring, color_group) == jones_plassmann_coloring(
+        graph, 3, init_coloring=init_coloring, n_jobs=2, chunk_size=100
+    )
+    assert all(coloring[i] != coloring[j] for i, j in graph if i != j)
+    assert all(len(group) <= 3 for group in color_group.values())
+    assert all(coloring[i] == color for i, color in init_coloring.items())
+    assert sorted(color_group) == list(range(len(color_group)))
+
+    color_group = check_linear_term(color_group, np.arange(310), 3)
+    assert sorted(i for group in color_group.values() for i in group) == sorted(
+        set(range(310)) | set(coloring)
+    )
+
+
+def test_incremental_graph_coloring():
+    graph = [(0, 1), (1, 2), (2, 3), (3, 0)]
+    coloring = IncrementalGraphColoring(graph, 2)
+    assert coloring.color_group == {0: [0, 2], 1: [1, 3]}
+
+    # removing edges keeps all the colors
+    assert coloring.update(removed_edges=[(1, 2), (5, 6)]) == {}
+    assert coloring.color_group == {0: [0, 2], 1: [1, 3]}
+
+    # only one end of the conflicting edge and the new vertex are colored
+    changes = coloring.update(added_edges=[(0, 2), (2, 4), (0, 1)])
+    assert changes == {4: 0, 2: 2}
+    assert coloring.color_group == {0: [0, 4], 1: [1, 3], 2: [2]}
+    assert all(coloring.coloring[i] != coloring.coloring[j] for i, j in coloring.edges)
+
+    changes = coloring.update_graph([(0, 1), (0, 2), (2, 4), (2, 3), (1, 4)])
+    assert changes == {}
+    # color 0 is full
+    assert coloring.update_graph([(0, 1), (1, 2), (2, 0), (1, 5)]) == {5: 2}
+    assert all(len(group) <= 2 for group in coloring.color_group.values())
+
+    # an unused color is filled by the largest color, so that the colors stay 0, 1, ...
+    coloring = IncrementalGraphColoring([(0, 1)], 2, init_coloring={5: 3})
+    assert coloring.update() == {5: 2}
+    assert coloring.color_group == {0: [0], 1: [1], 2: [5]}
+
+
+def test_transpile_to_qrac31_coloring_strategy():
+    n = jm.Placeholder("n")
+    x = jm.BinaryVar("x", shape=(n,))
+    i = jm.Element("i", belong_to=n)
+    problem = jm.Problem("path")
+    problem += jm.sum((i, i < n - 1), x[i] * x[i + 1])
+
+    compiled_instance = jtc.compile_model(problem, {"n": 8})
+    for strategy in ColoringStrategy:
+        builder = jtqk.transpile_to_qrac31_hamiltonian(
+            compiled_instance, coloring_strategy=strategy
+        )
+        hamiltonian, _, encoding_cache = builder.get_hamiltonian()
+        assert hamiltonian.num_qubits == len(encoding_cache.color_group)
+        qubits = {i: qubit for i, (qubit, _) in encoding_cache.encoding.items()}
+        assert all(qubits[i] != qubits[i + 1] for i in range(7))
@@ -0,0 +1,120 @@
+import numpy as np
+
+from jijmodeling_transpiler_quantum.core.ising_qubo import (
+    IsingModel,
+    calc_qubo_energy,
+    qubo_to_ising_arrays,
+)
+from jijmodeling_transpiler_quantum.core.sampling import (
+    counts_to_binaries,
+    energy_statistics,
+    merge_binaries,
+    select_probabilities,
+)
+
+
+def test_counts_to_binaries():
+    rng = np.random.default_rng(0)
+    num_bits = 70
+    rows = rng.integers(0, 2, size=(200, num_bits))
+    counts = {"".join(map(str, row)): k + 1 for k, row in enumerate(rows.tolist())}
+    binaries, num_occurrences = counts_to_binaries(counts, num_bits)
+    expected_rows = np.array([[int(b) for b in key] for key in counts])
+    assert binaries.dtype == np.uint8
+    assert np.array_equal(binaries, expected_rows)
+    assert num_occurrences.tolist() == list(counts.values())
+
+    # The bit k of an integer key is the k-th bit.
+    int_counts = {int(key[::-1], 2): value for key, value in counts.items()}
+    int_binaries, int_occurrences = counts_to_binaries(int_counts, num_bits)
+    assert np.array_equal(int_binaries, binaries)
+    assert np.array_equal(int_occurrences, num_occurrences)
+
+    small_binaries, _ = counts_to_binaries({key[:10]: 1 for key in counts}, 10)
+    small_counts = {int(key[:10][::-1], 2): 1 for key in counts}
+    assert np.array_equal(counts_to_binaries(small_counts, 10)[0], small_binaries)
+
+
+def test_merge_binaries():
+    binaries = np.array([[1, 0, 1], [0, 0, 0], [1, 0, 1], [0, 0, 0], [1, 1, 1]])
+    merged, weights = merge_binaries(binaries, np.array([0.5, 1.0, 0.25, 2.0, 1.0]))
+    assert merged.tolist() == [[1, 0, 1], [0, 0, 0], [1, 1, 1]]
+    assert weights.tolist() == [0.75, 3.0, 1.0]
+
+    binaries, num_occurrences = counts_to_binaries({"10": 2, "1": 3, "01": 1}, 2)
+    assert binaries.tolist() == [[1, 0], [0, 1]]
+    assert num_occurrences.tolist() == [5, 1]
+
+    binaries, num_occurrences = counts_to_binaries({}, 4)
+    assert binaries.shape == (0, 4)
+    assert len(num_occurrences) == 0
+
+
+def test_select_probabilities():
+    rng = np.random.default_rng(1)
+    num_bits = 12
+    probabilities = rng.random(1 << num_bits) ** 4
+    probabilities[rng.random(1 << num_bits) < 0.5] = 0.0
+    probabilities /= probabilities.sum()
+
+    binaries, values = select_probabilities(probabilities, top_k=50)
+    order = np.argsort(-probabilities, kind="stable")[:50]
+    assert np.array_equal(values, probabilities[order])
+    assert np.array_equal(binaries @ (1 << np.arange(num_bits)), order)
+
+    binaries, values = select_probabilities(probabilities, threshold=1e-4)
+    assert len(values) == np.count_nonzero(probabilities > 1e-4)
+    assert np.all(np.diff(values) <= 0)
+
+    binaries, values = select_probabilities(probabilities)
+    assert len(values) == np.count_nonzero(probabilities)
+
+    quasi = {int(k): float(probabilities[k]) for k in order}
+    quasi[7] = -0.01
+    binaries, values = select_probabilities(quasi, num_bits=num_bits, top_k=100)
+    assert np.array_equal(values, probabilities[order])
+    assert np.array_equal(binaries @ (1 << np.arange(num_bits)), order)
+
+
+def test_energy_statistics():
+    rng = np.random.default_rng(2)
+    num_vars = 8
+    qubo = {
+        (i, j): rng.normal()
+        for i in range(num_vars)
+        for j in range(i, num_vars)
+        if rng.random() < 0.5
+    }
+    rows = rng.integers(0, 2, size=(300, num_vars))
+    counts: dict = {}
+    for row in rows.tolist():
+        key = "".join(map(str, row))
+        counts[key] = counts.get(key, 0) + int(rng.integers(1, 5))
+
+    statistics = energy_statistics(qubo_to_ising_arrays(qubo, num_vars), counts)
+    energies = np.array([calc_qubo_energy(qubo, list(map(int, k))) for k in counts])
+    weights = np.array(list(counts.values()))
+    assert np.all(np.diff(statistics.energies) >= 0)
+    assert np.allclose(statistics.energies, np.sort(energies))
+    assert statistics.weights.sum() == weights.sum()
+    assert np.isclose(statistics.mean(), np.dot(energies, weights) / weights.sum())
+    assert np.isclose(statistics.cvar(1.0), statistics.mean())
+
+    # CVaR from the samples repeated by their counts.
+    samples = np.repeat(statistics.energies, statistics.weights)
+    for num_lowest in [1, 10, 57, len(samples)]:
+        alpha = num_lowest / len(samples)
+        assert np.isclose(statistics.cvar(alpha), samples[:num_lowest].mean())
+
+    hist, edges = statistics.histogram(bins=5)
+    assert np.array_equal(hist, np.histogram(samples, bins=edges)[0])
+
+    # 1 is x = (1, 0, 0): z = (-1, 1, 1), and 4 is x = (0, 0, 1): z = (1, 1, -1).
+    ising = IsingModel({(0, 1): 1.0, (1, 2): -2.0}, {0: 0.5, 1: 0.25}, 0.0)
+    statistics = energy_statistics(ising, {1: 2, 4: 1})
+    assert statistics.energies.tolist() == [-3.25, 3.75]
+    assert statistics.weights.tolist() == [2, 1]
+    probabilities = np.zeros(8)
+    probabilities[[1, 4]] = [0.5, 0.5]
+    statistics = energy_statistics(ising, probabilities)
+    assert statistics.energies.tolist() == [-3.25, 3.75]